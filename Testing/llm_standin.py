@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Local Stand-In LLM Server
+
+Serves the OpenAI chat-completions wire format on localhost so concurrency,
+hedging, caching and rate-limit handling can be benchmarked reproducibly
+without network access or API spend. Findings come from the same
+RuleBasedDetector that run_review.py uses, so the content is realistic for
+the module in the prompt. Prompts carry only the module text, not its XML
+structure, so rules that need the enclosing elements (hints, definitions)
+find nothing here.
+
+Prompt shapes understood:
+- run_review.py agent prompts ("# MODULE TO REVIEW (line-numbered)"):
+  reply is the JSON array of findings that simulate_agent_review returns
+- CODE reviewer prompts ("MODULE CONTENT:"): reply is {"issues": [...]}
+
+Fault injection (all drawn per request, reproducible for a given --seed):
+- latency from a configurable distribution
+- HTTP 429 (with Retry-After) and HTTP 500 at configurable rates
+- truncated JSON bodies (finish_reason "length")
+- HTTP 429 once more than --max-concurrency requests are in flight
+
+Requests with "stream": true are answered as server-sent events in
+chat.completion.chunk format, ending with "data: [DONE]".
+
+Usage:
+  python llm_standin.py [--port 8765] [--seed 7] [--latency lognormal:median=1.5,sigma=0.6]
+                        [--rate-429 0.05] [--rate-500 0.02] [--truncate-rate 0.01]
+                        [--max-concurrency 8]
+
+Example:
+  python llm_standin.py --latency pareto:scale=0.8,alpha=2.5 --rate-429 0.1
+  OPENAI_API_BASE=http://127.0.0.1:8765/v1 python ../archive/archive/_system/scripts/example_usage.py
+
+Endpoints:
+  POST /v1/chat/completions   chat completion (JSON or SSE stream)
+  GET  /v1/models             model list
+  GET  /stats                 request counters since start
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from run_review import (HitTable, agent_probabilities, detect_module_hits, load_detection_rules,
+                        simulate_agent_review)
+
+
+RUN_REVIEW_MODULE_MARKER = "# MODULE TO REVIEW (line-numbered)"
+CODE_MODULE_MARKER = "MODULE CONTENT:\n"
+CODE_MODULE_END = "\nFOCUS AREA:"
+
+# Focus words that route a CODE reviewer prompt to the authoring detectors
+AUTHORING_FOCUS_WORDS = ["authoring", "pedagog", "structur", "conceptual", "assessment",
+                         "flow", "definition", "example"]
+
+STREAM_CHUNK_CHARS = 40
+
+
+class LatencyModel:
+    """Response latency distribution, parsed from "kind:param=value,...".
+
+    Kinds:
+        fixed:seconds=1.0
+        uniform:low=0.5,high=2.0
+        normal:mean=1.0,sd=0.3             (clipped at 0)
+        lognormal:median=1.0,sigma=0.5     (long right tail, typical of LLM APIs)
+        pareto:scale=0.5,alpha=2.0         (heavy tail for hedging experiments)
+    """
+
+    DEFAULTS = {
+        "fixed": {"seconds": 0.0},
+        "uniform": {"low": 0.0, "high": 1.0},
+        "normal": {"mean": 1.0, "sd": 0.3},
+        "lognormal": {"median": 1.0, "sigma": 0.5},
+        "pareto": {"scale": 0.5, "alpha": 2.0}
+    }
+
+    def __init__(self, kind: str = "fixed", **params: float):
+        if kind not in self.DEFAULTS:
+            raise ValueError(f"Unknown latency distribution '{kind}' "
+                             f"(expected one of {', '.join(self.DEFAULTS)})")
+        unknown = set(params) - set(self.DEFAULTS[kind])
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) for {kind}: {', '.join(sorted(unknown))}")
+        self.kind = kind
+        self.params = {**self.DEFAULTS[kind], **params}
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse a spec such as "lognormal:median=1.5,sigma=0.6" (a bare number means fixed)."""
+        try:
+            return cls("fixed", seconds=float(spec))
+        except ValueError:
+            pass
+
+        kind, _, arg_text = spec.partition(":")
+        params = {}
+        for part in filter(None, arg_text.split(",")):
+            name, _, value = part.partition("=")
+            params[name.strip()] = float(value)
+        return cls(kind.strip(), **params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        p = self.params
+        if self.kind == "fixed":
+            return p["seconds"]
+        if self.kind == "uniform":
+            return rng.uniform(p["low"], p["high"])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(p["mean"], p["sd"]))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(p["median"]), p["sigma"])
+        return p["scale"] * rng.paretovariate(p["alpha"])
+
+    def __str__(self) -> str:
+        args = ",".join(f"{name}={value:g}" for name, value in self.params.items())
+        return f"{self.kind}:{args}"
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server."""
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    truncate_rate: float = 0.0
+    max_concurrency: Optional[int] = None
+    retry_after_seconds: float = 1.0
+    stream_chunk_delay: float = 0.01
+    seed: int = 0
+
+
+class StandInLLM:
+    """Request handling independent of HTTP: fault draws, findings and counters."""
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._seen = defaultdict(int)
+        self._in_flight = 0
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "streamed": 0,
+            "rate_limited": 0,
+            "concurrency_limited": 0,
+            "server_errors": 0,
+            "truncated": 0,
+            "peak_in_flight": 0,
+            "total_latency_seconds": 0.0
+        }
+
+    def request_rng(self, body: Dict[str, Any]) -> random.Random:
+        """RNG for one request.
+
+        Seeded by the request body and how many times that body has been
+        seen, so a run gets the same faults and latencies whatever order
+        concurrent requests arrive in, and a retry gets a fresh draw.
+        """
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+        with self._lock:
+            occurrence = self._seen[digest]
+            self._seen[digest] += 1
+        return random.Random(f"{self.config.seed}:{digest}:{occurrence}")
+
+    def enter(self) -> bool:
+        """Claim an in-flight slot; False when over max_concurrency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            limit = self.config.max_concurrency
+            if limit is not None and self._in_flight >= limit:
+                self.stats["concurrency_limited"] += 1
+                return False
+            self._in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+            return True
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def count(self, stat: str, amount: float = 1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": self._in_flight, **self.stats}
+
+    def draw_fault(self, rng: random.Random) -> Optional[int]:
+        """HTTP status to fail with (429 or 500), or None for a normal reply."""
+        roll = rng.random()
+        if roll < self.config.rate_429:
+            return 429
+        if roll < self.config.rate_429 + self.config.rate_500:
+            return 500
+        return None
+
+    def complete(self, body: Dict[str, Any], rng: random.Random) -> Tuple[str, str]:
+        """Reply text and finish_reason for a chat request."""
+        messages = body.get("messages") or []
+        system_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+
+        if RUN_REVIEW_MODULE_MARKER in prompt:
+            content = json.dumps(simulate_agent_review(run_review_agent_id(prompt), prompt), indent=2)
+        else:
+            content = json.dumps({"issues": code_reviewer_issues(system_prompt, prompt)}, indent=2)
+
+        if rng.random() < self.config.truncate_rate:
+            self.count("truncated")
+            return content[:rng.randint(1, max(1, len(content) - 1))], "length"
+        return content, "stop"
+
+
+def run_review_agent_id(prompt: str) -> str:
+    """Agent id from the "You are Agent ... in a ... review team." line of a run_review prompt."""
+    for line in prompt.split("\n"):
+        if line.startswith("You are Agent "):
+            focus, _, team = line[len("You are Agent "):].partition(" in a ")
+            return f"{team.split(' ')[0]}-{focus}".replace(" ", "-")
+    return "style-generalist"
+
+
+def code_reviewer_issues(system_prompt: str, prompt: str) -> List[Dict[str, Any]]:
+    """Rule-based findings for a CODE reviewer prompt, in the reviewers' issue format."""
+    start = prompt.find(CODE_MODULE_MARKER)
+    if start == -1:
+        return []
+    start += len(CODE_MODULE_MARKER)
+    end = prompt.find(CODE_MODULE_END, start)
+    module_text = prompt[start:end if end != -1 else len(prompt)].strip()
+
+    focus_start = prompt.find(CODE_MODULE_END)
+    focus = prompt[focus_start:].split("\n", 2)[1] if focus_start != -1 else ""
+    descriptor = f"{system_prompt}\n{focus}".lower()
+    agent_type = "authoring" if any(word in descriptor for word in AUTHORING_FOCUS_WORDS) else "style"
+
+    numbered = "\n".join(f"{i:04d}| {line}" for i, line in enumerate(module_text.split("\n"), 1))
+    agent_id = f"{agent_type}-" + hashlib.md5(descriptor.encode("utf-8")).hexdigest()[:8]
+
+    # The rules this agent's role runs (weight > 0 in <detection_rules>), sampled like a
+    # run_review generalist of that role
+    weights = {rule.detector: rule.weight(agent_type, None) for rule in load_detection_rules()}
+    probabilities = agent_probabilities(numbered, agent_type, None)
+    tables, table_probabilities = [], [np.empty(0)]
+    start = 0
+    for name, table in detect_module_hits(numbered).items():
+        if weights[name] > 0:
+            tables.append(table)
+            table_probabilities.append(probabilities[start:start + len(table)])
+        start += len(table)
+    findings = HitTable.concat(tables).sample([agent_id], np.concatenate(table_probabilities))[0]
+
+    return [
+        {
+            "type": finding["category"].lower().replace(" ", "_"),
+            "severity": finding["severity"],
+            "location": f"Line {finding['line_numbers'][0]}" if finding["line_numbers"] else "Module",
+            "issue": finding["issue_description"],
+            "suggestion": finding["suggested_fix"]
+        }
+        for finding in findings
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP front end for a StandInLLM (set as the server's `llm` attribute)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def llm(self) -> StandInLLM:
+        return self.server.llm
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "stand-in", "object": "model"}]})
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.llm.snapshot())
+        else:
+            self._send_error(404, "not_found", f"No route for GET {self.path}")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_error(404, "not_found", f"No route for POST {self.path}")
+            return
+
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "invalid_request_error", "Request body is not valid JSON")
+            return
+
+        if not self.llm.enter():
+            self._send_error(429, "rate_limit_error", "Too many concurrent requests",
+                             retry_after=self.llm.config.retry_after_seconds)
+            return
+        try:
+            self._complete(body)
+        finally:
+            self.llm.leave()
+
+    def _complete(self, body: Dict[str, Any]):
+        rng = self.llm.request_rng(body)
+        fault = self.llm.draw_fault(rng)
+        if fault == 429:
+            self.llm.count("rate_limited")
+            self._send_error(429, "rate_limit_error", "Rate limit reached for requests",
+                             retry_after=self.llm.config.retry_after_seconds)
+            return
+        if fault == 500:
+            self.llm.count("server_errors")
+            self._send_error(500, "server_error", "The server had an error processing the request")
+            return
+
+        latency = self.llm.config.latency.sample(rng)
+        content, finish_reason = self.llm.complete(body, rng)
+        prompt_text = "".join(m.get("content", "") for m in body.get("messages") or [])
+        completion_id = f"chatcmpl-standin-{rng.getrandbits(48):012x}"
+        model = body.get("model", "stand-in")
+
+        time.sleep(latency)
+        self.llm.count("total_latency_seconds", latency)
+        self.llm.count("completed")
+
+        if body.get("stream"):
+            self.llm.count("streamed")
+            self._stream(completion_id, model, content, finish_reason)
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": {
+                "prompt_tokens": estimate_tokens(prompt_text),
+                "completion_tokens": estimate_tokens(content),
+                "total_tokens": estimate_tokens(prompt_text) + estimate_tokens(content)
+            }
+        })
+
+    def _stream(self, completion_id: str, model: str, content: str, finish_reason: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> bytes:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+            }
+            return f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+        try:
+            self.wfile.write(chunk({"role": "assistant"}))
+            for start in range(0, len(content), STREAM_CHUNK_CHARS):
+                self.wfile.write(chunk({"content": content[start:start + STREAM_CHUNK_CHARS]}))
+                self.wfile.flush()
+                time.sleep(self.llm.config.stream_chunk_delay)
+            self.wfile.write(chunk({}, finish_reason))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (e.g. a hedge that lost the race)
+            pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any],
+                   headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_error(self, status: int, error_type: str, message: str,
+                    retry_after: Optional[float] = None):
+        headers = {"Retry-After": f"{retry_after:g}"} if retry_after is not None else None
+        self._send_json(status, {"error": {"message": message, "type": error_type,
+                                           "code": None, "param": None}}, headers)
+
+
+def start_server(config: StandInConfig, host: str = "127.0.0.1",
+                 port: int = 0) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """Start the stand-in on a background thread (port 0 picks a free port).
+
+    Returns:
+        The server (its StandInLLM is server.llm, its port server.server_address[1])
+        and the serving thread; call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.llm = StandInLLM(config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the chat-completions API.",
+        epilog="Example: python llm_standin.py --latency lognormal:median=1.5,sigma=0.6 --rate-429 0.05"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind, 0 for any (default: 8765)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for all random draws (default: 0)")
+    parser.add_argument("--latency", type=LatencyModel.parse, default=LatencyModel("fixed", seconds=0.0),
+                        help="Latency distribution, e.g. 1.5, uniform:low=0.5,high=2 or "
+                             "lognormal:median=1.5,sigma=0.6 (default: 0)")
+    parser.add_argument("--rate-429", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 429 (default: 0)")
+    parser.add_argument("--rate-500", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 500 (default: 0)")
+    parser.add_argument("--truncate-rate", type=float, default=0.0,
+                        help="Fraction of replies cut off mid-JSON (default: 0)")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Answer HTTP 429 beyond this many requests in flight (default: unlimited)")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429 replies (default: 1)")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.01,
+                        help="Seconds between streamed chunks (default: 0.01)")
+    args = parser.parse_args()
+
+    if args.rate_429 + args.rate_500 > 1:
+        parser.error("--rate-429 and --rate-500 must add up to at most 1")
+
+    config = StandInConfig(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_500=args.rate_500,
+        truncate_rate=args.truncate_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after_seconds=args.retry_after,
+        stream_chunk_delay=args.stream_chunk_delay,
+        seed=args.seed
+    )
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    server.daemon_threads = True
+    server.llm = StandInLLM(config)
+    host, port = server.server_address[:2]
+
+    print("=" * 80)
+    print("Stand-in LLM server")
+    print("=" * 80)
+    print(f"Endpoint: http://{host}:{port}/v1/chat/completions")
+    print(f"Latency: {config.latency}")
+    print(f"Faults: 429 {config.rate_429:.0%}, 500 {config.rate_500:.0%}, "
+          f"truncated {config.truncate_rate:.0%}")
+    if config.max_concurrency:
+        print(f"Concurrency limit: {config.max_concurrency}")
+    print(f"Seed: {config.seed}")
+    print(f"Point clients at it with OPENAI_API_BASE=http://{host}:{port}/v1")
+    print("=" * 80)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print(json.dumps(server.llm.snapshot(), indent=2))
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,26 +12,44 @@ based on the style and authoring guides.
 - The "Original Input" tab in HTML reports MUST show the source faithfully
 - Any text extraction is for ANALYSIS only, never for replacement
 
+Requires numpy (agents sample detector hits as Bernoulli draws). Extra detectors are
+loaded from Testing/detectors/*.py (see detector()).
+
 Usage:
-  python run_review.py <module_folder> <xml_file>
+  python run_review.py <module_folder> <xml_file> [--early-stop] [--wave-size N] [--confidence C]
+                       [--rule-first] [--map-reduce] [--context-chars N]
 
 Example:
   python run_review.py Power_Series power_series_original.xml
   python run_review.py Fund_Thm_of_Calculus module_5_6.xml
+  python run_review.py Power_Series power_series_original.xml --early-stop --confidence 0.9
+  python run_review.py Power_Series power_series_original.xml --rule-first
+  python run_review.py Module_5_6_Exemplary module_5_6_exemplary.xml --context-chars 128000
 """
 
 import xml.etree.ElementTree as ET
+import argparse
 import json
 import re
 import math
 import html as html_module
-import random
 import hashlib
+import importlib.util
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-from typing import List, Dict, Any, Tuple
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+import itertools
+from statistics import NormalDist
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 # Base configuration paths (config is shared across all reviews)
 LEARNVIA_PATH = Path("/Users/michaeljoyce/Desktop/LEARNVIA")
@@ -39,10 +57,14 @@ CONFIG_PATH = LEARNVIA_PATH / "config"
 PROMPTS_PATH = CONFIG_PATH / "prompts"
 RUBRICS_PATH = CONFIG_PATH / "rubrics"
 TESTING_PATH = LEARNVIA_PATH / "Testing"
+DETECTOR_PLUGIN_PATH = TESTING_PATH / "detectors"   # Extra @detector rules, one module per file
+COURSE_MODULES_PATH = LEARNVIA_PATH / "modules"     # Every module XML of the course
+GLOSSARY_INDEX_PATH = TESTING_PATH / "output" / "course_glossary.json"
 
 # Module-specific paths set by command-line arguments
 TEST_MODULE_PATH = None
 OUTPUT_PATH = None
+MODULE_ORDER = None   # Course position of the module under review (see module_order)
 
 # Agent configuration based on agent_configuration.xml
 AGENT_CONFIG = {
@@ -72,6 +94,54 @@ AGENT_CONFIG = {
     }
 }
 
+# Scheduling priority for progressive reviews: specialists in competencies whose findings
+# are most often critical run first, then the remaining specialists, then generalists
+SCHEDULING_PRIORITY = [
+    "Structural Integrity",
+    "Mechanical Compliance",
+    "Conceptual Clarity",
+    "Mathematical Formatting",
+    "Pedagogical Flow",
+    "Accessibility",
+    "Assessment Quality",
+    "Punctuation & Grammar",
+    "Student Engagement",
+    "Consistency"
+]
+
+# Partial report rewrites per progressive run (each re-aggregates every finding so far),
+# unless --update-every sets the number of agents between rewrites
+PROGRESSIVE_UPDATES = 10
+
+# Deterministic detectors run once before the agents in --rule-first mode. Their hits are
+# listed in every agent prompt as known issues, so agents only report what is new.
+TRIAGE_RULES = [
+    "detect_todo_placeholders",
+    "detect_contractions",
+    "detect_missing_latex",
+    "detect_passive_voice"
+]
+
+RULE_DETECTOR_ID = "Rule-Detector"
+KNOWN_ISSUES_HEADER = "# KNOWN ISSUES (already reported by deterministic checks)"
+
+# Prompt budget for one agent call. Modules whose full prompt (layers + module + room for
+# the findings) does not fit are reviewed in overlapping windows (map-reduce mode).
+MODEL_CONTEXT_CHARS = 128_000   # ~32k tokens at ~4 chars per token
+OUTPUT_RESERVE_CHARS = 16_000   # Left free for the agent's JSON findings
+WINDOW_OVERLAP_LINES = 20       # Lines shared by neighbouring windows so seam issues keep context
+MIN_WINDOW_CHARS = 8_000
+
+# Categories accepted from agents: the OUTPUT FORMAT list in build_agent_prompt plus the
+# competencies and markers the detectors also use. Findings in any other category are dropped.
+FINDING_CATEGORIES = [
+    "Pedagogical Flow", "Structural Integrity", "Conceptual Clarity", "Assessment Quality",
+    "Mechanical Compliance", "Mathematical Formatting", "Punctuation & Grammar", "Accessibility",
+    "Consistency", "Other", "Student Engagement", "UNFINISHED"
+]
+SEVERITY_WORDS = {"critical": 5, "major": 4, "high": 4, "moderate": 3, "medium": 3,
+                  "minor": 2, "low": 2, "trivial": 1}
+
 
 def load_prompt_file(filename: str) -> str:
     """Load a prompt file from the prompts directory."""
@@ -93,34 +163,90 @@ def load_module_content(filepath: Path) -> str:
         return f.read()
 
 
-def extract_text_from_module(xml_content: str) -> str:
-    """Extract human-readable text from module XML for line-based review, PRESERVING <m> and <me> LaTeX tags."""
+class ModuleStructure:
+    """
+    Enclosing XML elements of each line of an extracted module: (tag, element ID) pairs from
+    the root to the element holding the line's first character. Element IDs are unique
+    within the module.
+
+    extract_text_from_module returns it with the text; it is passed along with the text
+    (agents only carry the text in their prompts). Hashing is O(1), so cached analyses are
+    keyed by (module text, structure).
+    """
+
+    __slots__ = ("line_elements", "_hash")
+
+    def __init__(self, line_elements):
+        self.line_elements = tuple(line_elements)
+        self._hash = hash(self.line_elements)
+
+    def __len__(self) -> int:
+        return len(self.line_elements)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        return self is other or (isinstance(other, ModuleStructure) and self._hash == other._hash
+                                 and self.line_elements == other.line_elements)
+
+    def window(self, start: int, end: int) -> 'ModuleStructure':
+        """Structure of lines start to end - 1 (a map-reduce window)."""
+        return ModuleStructure(self.line_elements[start:end])
+
+
+def line_structure(module_text: str, structure: Optional[ModuleStructure]) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    """Elements of each line of module_text; none if structure is missing or for other text."""
+    line_count = module_text.count('\n') + 1
+    if structure is None or len(structure) != line_count:
+        return ((),) * line_count
+    return structure.line_elements
+
+
+def extract_text_from_module(xml_content: str) -> Tuple[str, ModuleStructure]:
+    """
+    Extract human-readable text from module XML for line-based review, PRESERVING <m> and <me> LaTeX tags.
+
+    Returns:
+        (numbered text, ModuleStructure of its lines)
+    """
     lines = []
+    line_elements = []
+    element_ids = itertools.count()
     try:
         root = ET.fromstring(xml_content)
 
+        parts = []
+        segments = []   # (offset in the text, enclosing elements) where each run of text starts
+        length = 0
+
+        def emit(text, elements):
+            nonlocal length
+            if text:
+                segments.append((length, elements))
+                parts.append(text)
+                length += len(text)
+
         # Extract text recursively, preserving <m>, <me>, and <b> tags
-        def extract_text_with_latex(element):
+        def extract_text_with_latex(element, parents=()):
             """Recursively extract text, preserving <m>, <me>, and <b> tags as strings."""
-            result = element.text or ''
+            elements = parents + ((element.tag, next(element_ids)),)
+            emit(element.text, elements)
 
             for child in element:
                 # Preserve LaTeX tags and bold tags (needed for definition detection)
                 if child.tag in ['m', 'me', 'b']:
-                    result += f'<{child.tag}>'
-                    result += (child.text or '')
-                    result += f'</{child.tag}>'
+                    emit(f'<{child.tag}>' + (child.text or '') + f'</{child.tag}>', elements)
                 else:
                     # Recursively process other elements
-                    result += extract_text_with_latex(child)
+                    extract_text_with_latex(child, elements)
 
                 # Add tail text
-                result += (child.tail or '')
-
-            return result
+                emit(child.tail, elements)
 
         # Extract all text content
-        full_text = extract_text_with_latex(root)
+        extract_text_with_latex(root)
+        full_text = ''.join(parts)
 
         # Normalize whitespace WITHIN LaTeX tags (keep them on one line)
         # Replace newlines inside <m> and <me> tags with spaces
@@ -134,10 +260,17 @@ def extract_text_from_module(xml_content: str) -> str:
             text = re.sub(r'<me>.*?</me>', replace_newlines, text, flags=re.DOTALL)
             return text
 
-        full_text = normalize_latex_tags(full_text)
+        full_text = normalize_latex_tags(full_text)   # Keeps offsets (newlines become spaces)
 
-        # Split into lines
-        lines = [line.strip() for line in full_text.split('\n') if line.strip()]
+        # Split into lines, each attributed to the element holding its first character
+        segment_starts = [start for start, _ in segments]
+        offset = 0
+        for line in full_text.split('\n'):
+            if line.strip():
+                first_char = offset + len(line) - len(line.lstrip())
+                lines.append(line.strip())
+                line_elements.append(segments[bisect_right(segment_starts, first_char) - 1][1])
+            offset += len(line) + 1
 
     except ET.ParseError as e:
         print(f"Warning: XML parsing error: {e}")
@@ -162,16 +295,23 @@ def extract_text_from_module(xml_content: str) -> str:
         # Normalize excessive blank lines
         cleaned = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned)
         lines = [line.strip() for line in cleaned.split('\n') if line.strip()]
+        line_elements = [()] * len(lines)
 
     # Prefix each line with a 1-indexed line number to make agent references precise
     numbered_lines = [f"{i+1:04d}| {line}" for i, line in enumerate(lines)]
-    return '\n'.join(numbered_lines)
+    return '\n'.join(numbered_lines), ModuleStructure(line_elements)
 
 
 def build_agent_prompt(agent_type: str, agent_focus: str, exemplar_anchors: str,
                        master_prompt: str, domain_prompt: str, rubric_content: str,
-                       module_content: str) -> str:
-    """Build the complete prompt for a single agent."""
+                       module_content: str, known_issues: str = "",
+                       window_scope: str = "") -> str:
+    """Build the complete prompt for a single agent.
+
+    known_issues (from format_known_issues) is inserted ahead of the module so the agent
+    skips issues the rule-based detectors already reported. window_scope (from
+    format_window_scope) tells a map-reduce agent which part of the module it is seeing.
+    """
 
     prompt = f"""# AGENT IDENTITY
 You are Agent {agent_focus} in a {agent_type} review team.
@@ -207,6 +347,18 @@ Your PRIMARY focus is evaluating against this rubric, but you may flag other iss
 ## Layer 3: Generalist Role
 As a generalist, you review holistically across all competencies. Look for cross-cutting issues,
 patterns that span categories, and problems that specialist reviewers might miss by being too focused.
+"""
+
+    if known_issues:
+        prompt += f"""
+
+{known_issues}
+"""
+
+    if window_scope:
+        prompt += f"""
+
+{window_scope}
 """
 
     prompt += f"""
@@ -243,186 +395,985 @@ CRITICAL REQUIREMENTS:
     return prompt
 
 
-class RuleBasedDetector:
-    """Generic rule-based issue detector that works on any module."""
+# Line-level detector patterns. All of them are matched by one LineRuleScanner pass per line
+# (see LINE_RULES); the detectors only decide what to report.
+CONTRACTIONS = [
+    (r"\bwhat's\b", "what is"),
+    (r"\blet's\b", "let us"),
+    (r"\bdon't\b", "do not"),
+    (r"\bdoesn't\b", "does not"),
+    (r"\bwon't\b", "will not"),
+    (r"\bcan't\b", "cannot"),
+    (r"\bisn't\b", "is not"),
+    (r"\baren't\b", "are not"),
+    (r"\bwasn't\b", "was not"),
+    (r"\bweren't\b", "were not"),
+    (r"\bhasn't\b", "has not"),
+    (r"\bhaven't\b", "have not"),
+    (r"\bhadn't\b", "had not"),
+    (r"\bwouldn't\b", "would not"),
+    (r"\bcouldn't\b", "could not"),
+    (r"\bshouldn't\b", "should not"),
+    (r"\bit's\b", "it is"),  # But need to distinguish from possessive "its"
+    (r"\bthat's\b", "that is"),
+    (r"\bthere's\b", "there is"),
+    (r"\bhere's\b", "here is"),
+]
 
-    def __init__(self, module_text: str, agent_type: str, agent_id: str):
-        self.lines = module_text.split('\n')
-        self.agent_type = agent_type
-        self.agent_id = agent_id
-
-        # Per-agent deterministic variability
-        seed = int(hashlib.md5(agent_id.encode("utf-8")).hexdigest()[:8], 16)
-        self.rng = random.Random(seed)
-
-    def should_flag(self, severity: int) -> bool:
-        """Determine if agent should flag issue based on severity."""
-        probability_map = {
-            5: 0.90,  # 90% of agents catch critical issues
-            4: 0.80,  # 80% of agents catch major issues
-            3: 0.60,  # 60% of agents catch moderate issues
-            2: 0.40,  # 40% of agents catch minor issues
-            1: 0.20   # 20% of agents catch trivial issues
+PASSIVE_PATTERNS = [
+    # "is/are/was/were + past participle"
+    r'\b(is|are|was|were)\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
+    # "has/have/had been + past participle"
+    r'\b(has|have|had)\s+been\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
+    # "being + past participle"
+    r'\bbeing\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
+    # Common passive constructions
+    r'\bit\s+is\s+(\w+ed|found|essential|important|necessary|required)\b',
+]
+
+INEQUALITY_PATTERNS = [
+    # "a < x < b" or "a ≤ x ≤ b" patterns
+    r'(-?\d+\.?\d*)\s*(<|≤|<=)\s*\w+\s*(<|≤|<=)\s*(-?\d+\.?\d*)',
+    # "x > a and x < b" patterns
+    r'\w+\s*[<>]=?\s*(-?\d+\.?\d*)\s+and\s+\w+\s*[<>]=?\s*(-?\d+\.?\d*)',
+]
+
+VAGUE_PRONOUN_PATTERNS = [
+    (r'^(It|This)\s+', "Sentence starts with vague pronoun"),
+    (r'\.\s+(It|This)\s+', "Sentence starts with vague pronoun after period"),
+    (r'\bthey\b', "Use of 'they' pronoun"),
+    (r'\bit\s+(is|was|has|can|will|should|could|would|may|might)\b', "Vague 'it' reference"),
+]
+
+# HIGH PRIORITY: Display-context math patterns (Severity 3)
+# These should definitely use LaTeX for proper formatting
+DISPLAY_MATH_PATTERNS = [
+    (r'\b[a-zA-Z]\s*=\s*[-+]?\d+', "Variable assignment without LaTeX"),
+    (r'\b(lim|sin|cos|tan|log|ln|exp)\s*\(', "Mathematical function without LaTeX"),
+    (r'[a-zA-Z]_\d+', "Subscript notation without LaTeX"),
+    (r'\^\{?[0-9n+\-]+\}?', "Superscript notation without LaTeX"),
+    (r'\d+\s*/\s*\d+', "Fraction without LaTeX"),
+    (r'∑|∏|∫', "Summation/product/integral symbol without LaTeX"),
+]
+
+# LOW PRIORITY: Inline symbols (Severity 1)
+# These are often acceptable in prose but could be improved
+INLINE_SYMBOL_PATTERNS = [
+    (r'[≈≤≥≠±∓√∞]', "Mathematical symbol in prose"),
+]
+
+LAZY_START_PATTERNS = [
+    r'^There\s+(is|are|was|were)\s+',
+    r'\.\s+There\s+(is|are|was|were)\s+',
+]
+
+# (rule family, pattern, case-insensitive) for every line-level pattern; a rule's matches
+# are reported under (family, index of the pattern in its list)
+LINE_RULES = (
+    [("contraction", pattern, True) for pattern, _ in CONTRACTIONS] +
+    [("passive", pattern, True) for pattern in PASSIVE_PATTERNS] +
+    [("inequality", pattern, False) for pattern in INEQUALITY_PATTERNS] +
+    [("vague_pronoun", pattern, True) for pattern, _ in VAGUE_PRONOUN_PATTERNS] +
+    [("display_math", pattern, False) for pattern, _ in DISPLAY_MATH_PATTERNS] +
+    [("inline_symbol", pattern, False) for pattern, _ in INLINE_SYMBOL_PATTERNS] +
+    [("lazy_start", pattern, True) for pattern in LAZY_START_PATTERNS]
+)
+
+
+class LineRuleScanner:
+    """
+    Matches many regex rules against a line in a single scan.
+
+    Each rule becomes a capturing lookahead, so at every position the regex engine records
+    which rules match there and where their match ends, and a final conditional rejects
+    positions where no rule matches. Keeping only matches that start at or after the end of
+    the rule's previous match reproduces re.finditer for each rule exactly, including rules
+    whose matches overlap other rules' matches.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, bool]]):
+        parts = []
+        for index, (_, pattern, ignore_case) in enumerate(rules):
+            parts.append(f"(?:(?=(?P<r{index}>(?{'i' if ignore_case else ''}:{pattern}))))?")
+        guard = "(?!)"
+        for index in reversed(range(len(rules))):
+            guard = f"(?(r{index})|{guard})"
+        self.regex = re.compile("".join(parts) + guard)
+
+        family_counts = defaultdict(int)
+        self.keys = []
+        for family, _, _ in rules:
+            self.keys.append((family, family_counts[family]))
+            family_counts[family] += 1
+        self.groups = [self.regex.groupindex[f"r{index}"] for index in range(len(rules))]
+
+    def scan(self, text: str) -> Dict[Tuple[str, int], List[Tuple[int, int, str]]]:
+        """Matches per rule key, as (start, end, matched text) in re.finditer order."""
+        matches = defaultdict(list)
+        next_start = [0] * len(self.groups)
+        for match in self.regex.finditer(text):
+            spans = match.regs
+            for rule, group in enumerate(self.groups):
+                start, end = spans[group]
+                if start != -1 and start >= next_start[rule]:
+                    matches[self.keys[rule]].append((start, end, text[start:end]))
+                    next_start[rule] = end
+        return matches
+
+
+LINE_SCANNER = LineRuleScanner(LINE_RULES)
+
+MATH_SPAN_PATTERN = re.compile(r'<m[e]?>.*?</m[e]?>', re.DOTALL)
+
+
+class MathSpans:
+    """
+    The <m>/<me> spans of one line, as sorted start/end lists for bisect lookups, plus a
+    copy of the line with every span blanked out (same length, so offsets carry over).
+    """
+
+    def __init__(self, content: str):
+        self.starts = []
+        self.ends = []
+        masked = []
+        last_end = 0
+        for match in MATH_SPAN_PATTERN.finditer(content):
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+            masked.append(content[last_end:match.start()])
+            masked.append(' ' * (match.end() - match.start()))
+            last_end = match.end()
+        masked.append(content[last_end:])
+        self.masked = ''.join(masked)
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def contains(self, position: int) -> bool:
+        """Check if a position is inside a math span (tags included, end inclusive)."""
+        index = bisect_right(self.starts, position) - 1
+        return index >= 0 and position <= self.ends[index]
+
+
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'\.\s+(?=[A-Z]|$)')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Bracketed notation (intervals, coordinates, function arguments, tags, set braces), blanked
+# in this order after math so commas inside them do not count as clause separators
+NOTATION_PATTERNS = [
+    re.compile(r'\([^)]*\)'),
+    re.compile(r'\[[^\]]*\]'),
+    re.compile(r'<[^>]*>'),
+    re.compile(r'\{[^}]*\}'),
+]
+
+
+def blank_matches(pattern: re.Pattern, text: str) -> str:
+    """Replace every match of pattern with spaces of the same length."""
+    return pattern.sub(lambda match: ' ' * len(match.group()), text)
+
+
+class LineAnalysis:
+    """
+    One line of a numbered module as the detectors see it.
+
+    Offsets (sentence bounds, token starts, rule matches) index content; math.masked and
+    notation_masked keep content's length, so the same offsets apply to them.
+    """
+
+    __slots__ = ("content", "line_num", "elements", "lower", "math", "notation_masked",
+                 "sentence_bounds", "tokens", "token_starts", "matches")
+
+    def __init__(self, line: str, elements: Tuple[Tuple[str, int], ...] = ()):
+        self.content = line.split('|', 1)[1].strip() if '|' in line else ""
+        self.elements = elements
+        try:
+            self.line_num = int(line.split('|')[0].strip()) if '|' in line else 0
+        except ValueError:
+            self.line_num = 0
+        self.lower = self.content.lower()
+
+        # Math spans and the line with math blanked; then with bracketed notation blanked too
+        self.math = MathSpans(self.content)
+        notation_masked = self.math.masked
+        for pattern in NOTATION_PATTERNS:
+            notation_masked = blank_matches(pattern, notation_masked)
+        self.notation_masked = notation_masked
+
+        # Sentences as start/end pairs: split on ". " followed by a capital letter or line end
+        bounds = [0]
+        for separator in SENTENCE_BOUNDARY_PATTERN.finditer(self.content):
+            bounds.extend((separator.start(), separator.end()))
+        bounds.append(len(self.content))
+        self.sentence_bounds = array('i', bounds)
+
+        # Word tokens and their start offsets
+        self.tokens = []
+        self.token_starts = array('i')
+        for match in WORD_PATTERN.finditer(self.content):
+            self.tokens.append(match.group())
+            self.token_starts.append(match.start())
+
+        # LINE_RULES matches, on the math-masked line so rules never fire inside <m>/<me>
+        self.matches = LINE_SCANNER.scan(self.math.masked)
+
+    @property
+    def element_path(self) -> str:
+        """Enclosing elements below the module root, e.g. "Activities/.../Hints/hint"."""
+        return '/'.join(tag for tag, _ in self.elements[1:])
+
+    def within(self, tag: str) -> bool:
+        """Whether the line is inside an element with this tag."""
+        return any(element_tag == tag for element_tag, _ in self.elements)
+
+    def sentences(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each sentence."""
+        return list(zip(self.sentence_bounds[::2], self.sentence_bounds[1::2]))
+
+    def has_word(self, word: str, ignore_case: bool = False) -> bool:
+        """Whether word appears as a whole token (same as a \\b-delimited regex search)."""
+        if ignore_case:
+            word = word.lower()
+            return any(token.lower() == word for token in self.tokens)
+        return word in self.tokens
+
+
+@lru_cache(maxsize=8)
+def analyze_module(module_text: str, structure: Optional[ModuleStructure] = None) -> Tuple[LineAnalysis, ...]:
+    """
+    LineAnalysis of every line of a numbered module (with its elements, if structure is given).
+
+    Cached per module text and structure, so segmentation, masking, tokenizing and rule
+    matching happen once per module however many detectors and agents use them.
+    """
+    return tuple(LineAnalysis(line, elements) for line, elements
+                 in zip(module_text.split('\n'), line_structure(module_text, structure)))
+
+
+@lru_cache(maxsize=8)
+def index_elements(module_text: str, structure: Optional[ModuleStructure] = None) -> Dict[str, Dict[int, List[int]]]:
+    """
+    Element-kind index of a numbered module: tag -> element ID -> indices of the lines inside
+    that element, in document order (e.g. index["hint"] lists every hint and its lines).
+    """
+    index = defaultdict(dict)
+    for line_index, elements in enumerate(line_structure(module_text, structure)):
+        for tag, element_id in elements:
+            index[tag].setdefault(element_id, []).append(line_index)
+    return dict(index)
+
+
+# Readability outliers for the Accessibility rubric (reading level). Per-sentence grades
+# are noisy (the exemplar median is about 10.5), so sentences are flagged against the 95th
+# percentiles of the exemplar modules' sentences rather than the rubric's 10th-grade
+# passage level; recompute with readability_thresholds. Sentences shorter than
+# READABILITY_MIN_WORDS are too short for a stable grade and are not scored, nor is
+# non-prose (animation source code).
+READABILITY_MIN_WORDS = 8
+READABILITY_SKIP_ELEMENTS = ("Code",)
+READABILITY_THRESHOLDS = {"grade": 17.37, "words": 34.0, "long_word_ratio": 0.45}
+VOWELS = np.array([ord(c) for c in "aeiouy"], dtype=np.uint32)
+
+
+@lru_cache(maxsize=8)
+def sentence_readability(module_text: str, structure: Optional[ModuleStructure] = None) -> Dict[str, np.ndarray]:
+    """
+    Readability metrics of every sentence in a numbered module, as parallel arrays.
+
+    Words are runs of ASCII letters (apostrophes inside a word included) in the
+    notation-masked lines, so math, tags and bracketed notation do not count, and lines
+    inside READABILITY_SKIP_ELEMENTS have no words. Syllables
+    are vowel groups, less a silent final "e", at least one per word; long words have more
+    than six letters. grade is the Flesch-Kincaid grade level of the sentence.
+
+    Returns:
+        line (index into analyze_module), start/end (offsets into the line's content),
+        words, syllables, long_words, long_word_ratio and grade, one entry per sentence
+    """
+    analysis = analyze_module(module_text, structure)
+
+    # One string for the whole module; sentence offsets shifted to match
+    line_offsets = np.cumsum([0] + [len(line.content) + 1 for line in analysis[:-1]])
+    bounds = [np.frombuffer(line.sentence_bounds, dtype=np.int32) for line in analysis]
+    sentence_line = np.repeat(np.arange(len(analysis)), [len(b) // 2 for b in bounds])
+    local_bounds = np.concatenate(bounds)
+    starts, ends = local_bounds[0::2], local_bounds[1::2]
+    text = '\n'.join(' ' * len(line.content)
+                     if any(line.within(tag) for tag in READABILITY_SKIP_ELEMENTS)
+                     else line.notation_masked
+                     for line in analysis)
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    lower = codes | 0x20
+    letter = (lower >= ord('a')) & (lower <= ord('z'))
+    apostrophe = (codes == ord("'")) | (codes == ord("\u2019"))
+    inner_apostrophe = apostrophe & np.r_[False, letter[:-1]] & np.r_[letter[1:], False]
+    word_char = np.r_[False, letter | inner_apostrophe, False]
+    word_starts = np.flatnonzero(word_char[1:] & ~word_char[:-1])
+    word_ends = np.flatnonzero(word_char[:-1] & ~word_char[1:])
+
+    # Syllables: vowel groups per word; a final "e" after a consonant other than "l" is silent
+    vowel = letter & np.isin(lower, VOWELS)
+    groups = np.r_[0, np.cumsum(vowel & ~np.r_[False, vowel[:-1]])]
+    syllables = groups[word_ends] - groups[word_starts]
+    last = word_ends - 1
+    before_last = np.maximum(last - 1, 0)
+    silent_e = ((lower[last] == ord('e')) & (word_ends - word_starts > 2)
+                & letter[before_last] & ~vowel[before_last] & (lower[before_last] != ord('l')))
+    syllables = np.maximum(syllables - silent_e, 1)
+    long_word = (word_ends - word_starts) > 6
+
+    # Sentence of each word (separators between sentences hold no letters)
+    sentence_starts = line_offsets[sentence_line] + starts
+    sentence = np.searchsorted(sentence_starts, word_starts, side='right') - 1
+    sentence_count = len(starts)
+
+    words = np.bincount(sentence, minlength=sentence_count)
+    syllable_counts = np.bincount(sentence, weights=syllables, minlength=sentence_count)
+    long_words = np.bincount(sentence, weights=long_word, minlength=sentence_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_word = np.where(words > 0, syllable_counts / words, 0.0)
+        long_word_ratio = np.where(words > 0, long_words / words, 0.0)
+    grade = np.where(words > 0, 0.39 * words + 11.8 * per_word - 15.59, 0.0)
+
+    return {
+        "line": sentence_line,
+        "start": starts,
+        "end": ends,
+        "words": words,
+        "syllables": syllable_counts.astype(int),
+        "long_words": long_words.astype(int),
+        "long_word_ratio": long_word_ratio,
+        "grade": grade
+    }
+
+
+def readability_thresholds(modules: List[Tuple[str, ModuleStructure]],
+                           percentile: float = 95) -> Dict[str, float]:
+    """
+    Outlier thresholds for READABILITY_THRESHOLDS: percentiles over the sentences of modules
+    given as extract_text_from_module results.
+    """
+    metrics = [sentence_readability(text, structure) for text, structure in modules]
+    scored = [m["words"] >= READABILITY_MIN_WORDS for m in metrics]
+    return {name: round(float(np.percentile(np.concatenate(
+                [m[name][mask] for m, mask in zip(metrics, scored)]), percentile)), 2)
+            for name in READABILITY_THRESHOLDS}
+
+# Chance that a simulated agent reports a detected issue, by severity
+FLAG_PROBABILITY = {
+    5: 0.90,  # 90% of agents catch critical issues
+    4: 0.80,  # 80% of agents catch major issues
+    3: 0.60,  # 60% of agents catch moderate issues
+    2: 0.40,  # 40% of agents catch minor issues
+    1: 0.20   # 20% of agents catch trivial issues
+}
+
+
+def agent_rng(agent_id: str) -> np.random.Generator:
+    """Per-agent deterministic random generator (same agent ID, same draws)."""
+    seed = int(hashlib.md5(agent_id.encode("utf-8")).hexdigest()[:8], 16)
+    return np.random.default_rng(seed)
+
+
+class HitTable:
+    """
+    Every issue a detector finds in a module, before agents sample from it.
+
+    Each hit carries the probability that an agent reports it, set by the finding's
+    severity. Hits added with the same group key one after another form a group, of which
+    an agent reports only the first hit it samples (e.g. one passive-voice finding per line
+    and pattern); a hit without a group key is sampled on its own.
+    """
+
+    def __init__(self):
+        self.findings = []
+        self.rates = []
+        self.group_starts = []   # Index of the first hit of each hit's group
+        self._last_group = None
+
+    def __len__(self) -> int:
+        return len(self.findings)
+
+    def add(self, finding: Dict[str, Any], group: Any = None, rate: float = 1.0):
+        """
+        Add a hit.
+
+        Args:
+            finding: The finding an agent reports for this hit; category and severity
+                     default to the detection rule's (see load_detection_rules)
+            group: Group key, or None for a hit sampled on its own
+            rate: Extra factor on the report probability
+        """
+        if group is not None and group == self._last_group:
+            self.group_starts.append(self.group_starts[-1])
+        else:
+            self.group_starts.append(len(self.findings))
+        self._last_group = group
+        self.findings.append(finding)
+        self.rates.append(rate)
+
+    @classmethod
+    def concat(cls, tables: List['HitTable']) -> 'HitTable':
+        """One table holding the hits of several tables in order."""
+        combined = cls()
+        for table in tables:
+            offset = len(combined)
+            combined.findings.extend(table.findings)
+            combined.rates.extend(table.rates)
+            combined.group_starts.extend(start + offset for start in table.group_starts)
+        return combined
+
+    def probabilities(self) -> np.ndarray:
+        """Chance that an agent with weight 1 reports each hit."""
+        return np.array([FLAG_PROBABILITY.get(finding["severity"], 0.5) * rate
+                         for finding, rate in zip(self.findings, self.rates)], dtype=float)
+
+    def flag_matrix(self, agent_ids: List[str], probabilities: np.ndarray) -> np.ndarray:
+        """
+        Bernoulli draws (agents x hits); each agent's row comes from its own seed.
+
+        Args:
+            agent_ids: Agents to draw for
+            probabilities: Report probability per hit, or per agent and hit (agents x hits)
+        """
+        probabilities = np.broadcast_to(probabilities, (len(agent_ids), len(self)))
+        flags = np.empty((len(agent_ids), len(self)), dtype=bool)
+        for row, agent_id in enumerate(agent_ids):
+            flags[row] = agent_rng(agent_id).random(len(self)) < probabilities[row]
+        return flags
+
+    def reported(self, flags: np.ndarray) -> np.ndarray:
+        """Reported hits for flag rows: each flagged hit that is the first flagged hit of its group."""
+        group_starts = np.array(self.group_starts, dtype=np.int64)
+        flagged_so_far = np.cumsum(flags, axis=-1)
+        before_group = np.where(group_starts > 0, flagged_so_far[..., group_starts - 1], 0)
+        return flags & (flagged_so_far - before_group == 1)
+
+    def sample(self, agent_ids: List[str], probabilities: np.ndarray) -> List[List[Dict[str, Any]]]:
+        """
+        Findings each agent reports.
+
+        Args:
+            agent_ids: Agents to sample for
+            probabilities: Report probability per hit, or per agent and hit (agents x hits)
+
+        Returns:
+            One list of findings per agent (copies, safe to modify)
+        """
+        if not self.findings:
+            return [[] for _ in agent_ids]
+        reported = self.reported(self.flag_matrix(agent_ids, probabilities))
+        return [[self._copy_finding(index) for index in np.flatnonzero(row)] for row in reported]
+
+    def report_all(self) -> List[Dict[str, Any]]:
+        """Findings of an agent that flags every hit (the first hit of each group)."""
+        if not self.findings:
+            return []
+        reported = self.reported(np.ones(len(self), dtype=bool))
+        return [self._copy_finding(index) for index in np.flatnonzero(reported)]
+
+    def _copy_finding(self, index: int) -> Dict[str, Any]:
+        finding = self.findings[index]
+        return dict(finding, line_numbers=list(finding["line_numbers"]))
+
+
+# What a detector reads from the shared line analysis and how expensive it is declared to be.
+# "lines"/"sentences" scan every line of the module; "elements" scans only the lines of
+# the declared element kinds (e.g. hints).
+DETECTOR_INPUTS = ("lines", "sentences", "elements")
+DETECTOR_COSTS = ("cheap", "moderate", "expensive")
+
+
+class DetectorSpec:
+    """A registered detector: the function, its default category/severity, inputs and cost class."""
+
+    def __init__(self, function, category: str, severity: int, inputs: Tuple[str, ...],
+                 elements: Tuple[str, ...], cost: str, roles: Tuple[str, ...]):
+        self.function = function
+        self.name = function.__name__
+        self.category = category
+        self.severity = severity
+        self.inputs = inputs
+        self.elements = elements
+        self.cost = cost
+        self.roles = roles
+
+    def lines_scanned(self, module: 'RuleBasedDetector') -> int:
+        """Module lines this detector reads, by its declared inputs."""
+        if "lines" in self.inputs or "sentences" in self.inputs:
+            return len(module.analysis)
+        return len({i for tag in self.elements
+                    for line_indices in module.elements.get(tag, {}).values()
+                    for i in line_indices})
+
+
+DETECTORS: Dict[str, DetectorSpec] = {}
+
+
+def detector(category: str, severity: int, inputs: Tuple[str, ...] = ("lines",),
+             elements: Tuple[str, ...] = (), cost: str = "cheap",
+             roles: Tuple[str, ...] = ("style",)):
+    """
+    Register a detector under its function name.
+
+    Used on RuleBasedDetector methods and on functions in DETECTOR_PLUGIN_PATH modules;
+    either way the function takes the module's RuleBasedDetector and returns a HitTable.
+    category and severity are the defaults for its findings and roles the agent roles
+    that run it; a <rule> in agent_configuration.xml overrides all three.
+
+    Example plugin (Testing/detectors/exclamations.py):
+        from run_review import HitTable, detector
+
+        @detector(category="Consistency", severity=1)
+        def detect_exclamations(module):
+            hits = HitTable()
+            for line in module.analysis:
+                ...
+            return hits
+    """
+    unknown = set(inputs) - set(DETECTOR_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown detector inputs {sorted(unknown)} (expected {DETECTOR_INPUTS})")
+    if ("elements" in inputs) != bool(elements):
+        raise ValueError("Detectors declare element tags exactly when they read 'elements'")
+    if cost not in DETECTOR_COSTS:
+        raise ValueError(f"Unknown detector cost {cost!r} (expected one of {DETECTOR_COSTS})")
+
+    def register(function):
+        if function.__name__ in DETECTORS:
+            raise ValueError(f"Detector {function.__name__} is already registered")
+        DETECTORS[function.__name__] = DetectorSpec(function, category, severity, tuple(inputs),
+                                                    tuple(elements), cost, tuple(roles))
+        return function
+
+    return register
+
+
+@lru_cache(maxsize=4)
+def load_detector_plugins(plugin_dir: Path) -> Tuple[str, ...]:
+    """
+    Import every module in plugin_dir so its @detector functions register themselves.
+
+    Plugins import this script as `run_review`, also when it runs as __main__, so they
+    register into the same DETECTORS. Files starting with "_" are skipped.
+
+    Returns:
+        Names of the plugin modules loaded (empty if the directory does not exist)
+    """
+    if not plugin_dir.is_dir():
+        return ()
+    sys.modules.setdefault("run_review", sys.modules[__name__])
+
+    loaded = []
+    for path in sorted(plugin_dir.glob("*.py")):
+        if path.name.startswith("_"):
+            continue
+        spec = importlib.util.spec_from_file_location(f"run_review_detectors.{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        loaded.append(path.stem)
+    return tuple(loaded)
+
+
+class DetectorProfile:
+    """
+    Per-rule wall time, lines scanned and hits, summed over every module text detected.
+
+    Map-reduce windows are separate module texts, so a rule runs once per window. The
+    shared line analysis (LINE_SCANNER and friends) is timed separately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.modules = 0
+        self.analysis_seconds = 0.0
+        self.rules = {}
+
+    def record_analysis(self, seconds: float):
+        with self._lock:
+            self.modules += 1
+            self.analysis_seconds += seconds
+
+    def record(self, rule: str, seconds: float, lines_scanned: int, hits: int):
+        with self._lock:
+            totals = self.rules.setdefault(rule, {"runs": 0, "seconds": 0.0, "lines_scanned": 0, "hits": 0})
+            totals["runs"] += 1
+            totals["seconds"] += seconds
+            totals["lines_scanned"] += lines_scanned
+            totals["hits"] += hits
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals per rule, slowest first."""
+        rules = []
+        for rule, totals in sorted(self.rules.items(), key=lambda item: -item[1]["seconds"]):
+            spec = DETECTORS[rule]
+            rules.append({
+                "rule": rule,
+                "category": spec.category,
+                "cost": spec.cost,
+                "inputs": list(spec.inputs),
+                "runs": totals["runs"],
+                "seconds": round(totals["seconds"], 4),
+                "lines_scanned": totals["lines_scanned"],
+                "hits": totals["hits"],
+                "us_per_line": round(1e6 * totals["seconds"] / max(totals["lines_scanned"], 1), 2)
+            })
+        return {
+            "modules": self.modules,
+            "analysis_seconds": round(self.analysis_seconds, 4),
+            "rules": rules
         }
-        return self.rng.random() < probability_map.get(severity, 0.5)
 
-    def extract_line_content(self, line_index: int) -> str:
-        """Extract content from a line by index (removes line number prefix)."""
-        if 0 <= line_index < len(self.lines):
-            line = self.lines[line_index]
-            # Remove line number prefix (e.g., "0042| ")
-            if '|' in line:
-                return line.split('|', 1)[1].strip()
-        return ""
 
-    def get_line_number(self, line: str) -> int:
-        """Extract line number from numbered line."""
-        if '|' in line:
+DETECTOR_PROFILE = DetectorProfile()
+
+
+# Ways a module defines a term. Bold terms introduced by is/are/called and informal
+# definitions in prose only count as multi-word phrases (single bold letters are variables).
+BOLD_DEFINITION_PATTERNS = [
+    re.compile(r'(?:is|are)\s+(?:the\s+)?<b>([^<]+)</b>', re.IGNORECASE),  # "is the <b>term</b>"
+    re.compile(r'<b>([^<]+)</b>\s+(?:is|are)\s+', re.IGNORECASE),  # "<b>Term</b> is/are"
+    re.compile(r'called\s+(?:the\s+)?<b>([^<]+)</b>', re.IGNORECASE),  # "called the <b>term</b>"
+]
+# Run on the lowercased line
+INFORMAL_DEFINITION_PATTERNS = [
+    re.compile(r'([a-z\s]+)\s+is\s+defined\s+(?:as|to\s+be)'),  # "X is defined as/to be"
+    re.compile(r'([a-z\s]+),\s+defined\s+as'),  # "X, defined as"
+    re.compile(r'call(?:ed)?\s+(?:this|it)\s+the\s+([a-z\s]+)'),  # "we call this the X"
+    re.compile(r'(?:is|are)\s+called\s+the\s+([a-z\s]+)'),  # "is called the X"
+    re.compile(r'this\s+(?:is|defines|represents|denotes)\s+(?:the\s+)?([a-z\s]+)'),  # "this represents the X"
+    re.compile(r'it\s+(?:is|defines|represents|denotes)\s+(?:the\s+)?([a-z\s]+)'),  # "it represents the X"
+    re.compile(r'the\s+([a-z\s]+)\s+is\s+(?:then|simply|just|always|never)'),  # "the X is then..."
+]
+# Run on the original line: "the radius of convergence, R. This represents..."
+APPOSITIVE_DEFINITION_PATTERN = re.compile(r'the\s+([a-z\s]+),\s+[A-Z]')
+GENERIC_DEFINITION_PREFIXES = ('the distance', 'the center', 'the value')
+FORMAL_DEFINITION_TERM = re.compile(r'<b>([^<]+)</b>')
+
+
+def normalize_term(term: str) -> str:
+    """Glossary key of a term: lowercase, single spaces, no leading article."""
+    return re.sub(r'^(the|a|an)\s+', '', ' '.join(term.lower().split()))
+
+
+@lru_cache(maxsize=8)
+def find_defined_terms(module_text: str, structure: Optional[ModuleStructure] = None) -> Dict[str, int]:
+    """
+    Terms a numbered module defines, formally (the bold term of a <definition> element)
+    or informally ("<b>X</b> is", "is called the X", "X is defined as", ...).
+
+    Returns:
+        Lowercased term -> line number of its first definition. Bold terms are also
+        recorded without a leading article.
+    """
+    defined = {}
+    for line, elements in zip(module_text.split('\n'), line_structure(module_text, structure)):
+        if '|' not in line:
+            continue
+        number, content = line.split('|', 1)
+        content = content.strip()
+        try:
+            line_num = int(number.strip())
+        except ValueError:
+            line_num = 0
+
+        terms = []
+        if any(tag == 'definition' for tag, _ in elements):
+            match = FORMAL_DEFINITION_TERM.search(content)
+            if match:
+                terms.append(match.group(1).lower())
+
+        for pattern in BOLD_DEFINITION_PATTERNS:
+            for match in pattern.finditer(content):
+                term = match.group(1).strip().lower()
+                if len(term.split()) >= 2:
+                    terms.append(term)
+                    terms.append(re.sub(r'^(the|a|an)\s+', '', term))
+
+        content_lower = content.lower()
+        candidates = [match.group(1).strip()
+                      for pattern in INFORMAL_DEFINITION_PATTERNS
+                      for match in pattern.finditer(content_lower)]
+        candidates += [match.group(1).strip().lower()
+                       for match in APPOSITIVE_DEFINITION_PATTERN.finditer(content)]
+        terms += [term for term in candidates
+                  if len(term.split()) >= 2 and not term.startswith(GENERIC_DEFINITION_PREFIXES)]
+
+        for term in terms:
+            defined.setdefault(term, line_num)
+    return defined
+
+
+def module_order(xml_content: str, path: Path) -> Optional[Tuple[int, ...]]:
+    """
+    Position of a module in the course, e.g. (5, 6) for section 5.6.
+
+    Taken from the first numeric <LearningOutcomes ids="5.6.1,..."> (the module's own
+    outcomes come before its activities'), else from the file name ("module_5_6...").
+    None if neither gives a section number.
+    """
+    match = (re.search(r'<LearningOutcomes\s+ids="(\d+)\.(\d+)', xml_content)
+             or re.search(r'(\d+)[._](\d+)', path.stem))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+CURRICULUM_VOCABULARY_VERSION = "1"
+VOCABULARY_ACTIONS = ("ignore", "verify", "define")
+
+
+class VocabularyMatcher:
+    """
+    Finds every curriculum term of config/curriculum_vocabulary.xml in one pass over a line.
+
+    The terms are merged into a trie that is compiled to a single regex whose alternation
+    follows the trie, so each position is tried once per shared prefix however many terms
+    there are (the same idea as LINE_SCANNER). Matches are whole words, case-insensitive
+    and non-overlapping; where terms overlap the leftmost, then longest, wins (so "limit
+    comparison test" is not read as "limit").
+    """
+
+    def __init__(self, tiers: Dict[str, Dict[str, str]], terms: Dict[str, str]):
+        self.tiers = tiers   # tier name -> metadata (course, action)
+        self.terms = terms   # lowercased term -> tier name
+
+        trie = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self.pattern = re.compile(r'\b' + self._trie_pattern(trie) + r'\b', re.IGNORECASE)
+
+    @classmethod
+    def _trie_pattern(cls, node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + cls._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A term ending here: the longer terms are tried first (greedy), then this one
+        return '(?:' + pattern + ')?' if '' in node else pattern
+
+    def scan(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """(start, end, term, tier) of each term occurrence in text."""
+        return [(match.start(), match.end(), match.group().lower(), self.terms[match.group().lower()])
+                for match in self.pattern.finditer(text)]
+
+
+def load_curriculum_vocabulary() -> VocabularyMatcher:
+    """Matcher for config/curriculum_vocabulary.xml (built once per file)."""
+    return _load_curriculum_vocabulary(CONFIG_PATH / "curriculum_vocabulary.xml")
+
+
+@lru_cache(maxsize=4)
+def _load_curriculum_vocabulary(vocabulary_file: Path) -> VocabularyMatcher:
+    root = ET.parse(vocabulary_file).getroot()
+    if root.get('version') != CURRICULUM_VOCABULARY_VERSION:
+        raise ValueError(f"{vocabulary_file} has vocabulary version {root.get('version')!r}, "
+                         f"expected {CURRICULUM_VOCABULARY_VERSION!r}")
+
+    tiers = {}
+    terms = {}
+    for tier in root.findall('tier'):
+        name = tier.get('name')
+        if tier.get('action') not in VOCABULARY_ACTIONS:
+            raise ValueError(f"Unknown action in {vocabulary_file} tier {name}: {tier.get('action')}")
+        tiers[name] = {"course": tier.get('course', ""), "action": tier.get('action')}
+        for term in tier.findall('term'):
+            # A term listed in several tiers keeps its first tier
+            terms.setdefault(' '.join(term.text.lower().split()), name)
+    return VocabularyMatcher(tiers, terms)
+
+
+class CourseGlossary:
+    """
+    Terms defined by every module of the course, with each module's course position.
+
+    The index is kept in a JSON file and updated incrementally: refresh() only rescans
+    module files whose size or modification time changed and drops deleted ones. Each
+    term maps to the earliest module defining it, so defined_before is one dict lookup.
+    """
+
+    VERSION = 1
+
+    def __init__(self, modules_path: Path, index_path: Path):
+        self.modules_path = modules_path
+        self.index_path = index_path
+        self.modules = {}        # path relative to modules_path -> size, mtime, order, terms
+        self.first_defined = {}  # normalized term -> (order, module path)
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the module files and save it if anything changed.
+
+        Returns:
+            Number of modules (re)scanned
+        """
+        if not self.modules and self.index_path.exists():
             try:
-                return int(line.split('|')[0].strip())
-            except:
-                pass
-        return 0
+                saved = json.loads(self.index_path.read_text(encoding='utf-8'))
+            except ValueError:
+                saved = {}
+            if saved.get("version") == self.VERSION:
+                self.modules = saved["modules"]
+
+        files = {str(path.relative_to(self.modules_path)): path
+                 for path in sorted(self.modules_path.rglob("*.xml"))} if self.modules_path.is_dir() else {}
+        removed = self.modules.keys() - files.keys()
+        for name in removed:
+            del self.modules[name]
+
+        scanned = 0
+        for name, path in files.items():
+            stat = path.stat()
+            entry = self.modules.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            xml_content = path.read_text(encoding='utf-8')
+            order = module_order(xml_content, path)
+            self.modules[name] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "order": list(order) if order else None,
+                "terms": find_defined_terms(*extract_text_from_module(xml_content))
+            }
+            scanned += 1
+
+        self.first_defined = {}
+        for name, entry in self.modules.items():
+            if entry["order"] is None:
+                continue
+            order = tuple(entry["order"])
+            for term in entry["terms"]:
+                key = normalize_term(term)
+                if key not in self.first_defined or order < self.first_defined[key][0]:
+                    self.first_defined[key] = (order, name)
+
+        if scanned or removed:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.index_path, json.dumps({"version": self.VERSION, "modules": self.modules},
+                                                      indent=1, sort_keys=True))
+        return scanned
+
+    def defined_before(self, term: str, order: Optional[Tuple[int, ...]]) -> Optional[str]:
+        """Module (relative path) that defines term earlier in the course than order, or None."""
+        if order is None:
+            return None
+        entry = self.first_defined.get(normalize_term(term))
+        return entry[1] if entry and entry[0] < order else None
+
+
+COURSE_GLOSSARY = CourseGlossary(COURSE_MODULES_PATH, GLOSSARY_INDEX_PATH)
+
+
+class RuleBasedDetector:
+    """
+    Generic rule-based issue detector that works on any module.
 
-    def detect_todo_placeholders(self) -> List[Dict[str, Any]]:
+    Detectors return every issue they find as a HitTable; which of them a simulated agent
+    reports is sampled afterwards (see simulate_agent_review).
+    """
+
+    def __init__(self, module_text: str, structure: Optional[ModuleStructure] = None):
+        self.module_text = module_text
+        self.structure = structure
+        self.lines = module_text.split('\n')
+        self.analysis = analyze_module(module_text, structure)
+        self.elements = index_elements(module_text, structure)
+
+    def element_lines(self, tag: str) -> Dict[int, List[LineAnalysis]]:
+        """Lines of each element with this tag (e.g. "hint", "question") by element ID, in document order."""
+        return {element_id: [self.analysis[i] for i in line_indices]
+                for element_id, line_indices in self.elements.get(tag, {}).items()}
+
+    @detector(category="UNFINISHED", severity=3, roles=("authoring", "style"))
+    def detect_todo_placeholders(self) -> HitTable:
         """Detect Todo placeholders (UNFINISHED content markers)."""
-        findings = []
+        hits = HitTable()
 
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        for line in self.analysis:
+            content, line_num = line.content, line.line_num
 
             # Check for Todo/TODO/todo in various contexts
-            if re.search(r'\btodo\b', content, re.IGNORECASE):
-                if self.should_flag(3):  # Severity 3 for unfinished content
-                    # Determine what type of Todo it is
-                    if '<Title>' in content:
-                        suggested_fix = "Provide a descriptive title for the module"
-                    elif '<Description>' in content:
-                        suggested_fix = "Write a clear description of what students will learn"
-                    elif '<KSAs>' in content:
-                        suggested_fix = "List the Knowledge, Skills, and Abilities required"
-                    elif '<LearningOutcomes>' in content:
-                        suggested_fix = "Define specific, measurable learning outcomes"
-                    else:
-                        suggested_fix = "Replace placeholder with actual content"
-
-                    findings.append({
-                        "issue_description": f"UNFINISHED - Line {line_num}: Contains 'Todo' placeholder",
-                        "line_numbers": [line_num],
-                        "quoted_text": content,
-                        "category": "UNFINISHED",
-                        "severity": 3,
-                        "student_impact": "Placeholder indicates unfinished content that students will see",
-                        "suggested_fix": suggested_fix,
-                        "confidence": 1.0
-                    })
+            if line.has_word('todo', ignore_case=True):
+                # Determine what type of Todo it is
+                if line.within('title'):
+                    suggested_fix = "Provide a descriptive title for the module"
+                elif line.within('description'):
+                    suggested_fix = "Write a clear description of what students will learn"
+                elif line.within('KSAs'):
+                    suggested_fix = "List the Knowledge, Skills, and Abilities required"
+                elif line.within('LearningOutcomes'):
+                    suggested_fix = "Define specific, measurable learning outcomes"
+                else:
+                    suggested_fix = "Replace placeholder with actual content"
+
+                hits.add({
+                    "issue_description": f"UNFINISHED - Line {line_num}: Contains 'Todo' placeholder",
+                    "line_numbers": [line_num],
+                    "quoted_text": content,
+                    "student_impact": "Placeholder indicates unfinished content that students will see",
+                    "suggested_fix": suggested_fix,
+                    "confidence": 1.0
+                })
 
-        return findings
+        return hits
 
-    def detect_contractions(self) -> List[Dict[str, Any]]:
+    @detector(category="Mechanical Compliance", severity=2)
+    def detect_contractions(self) -> HitTable:
         """Detect contractions (what's, let's, don't, etc.)."""
-        findings = []
-
-        # Common contractions to detect
-        contractions = {
-            r"\bwhat's\b": "what is",
-            r"\blet's\b": "let us",
-            r"\bdon't\b": "do not",
-            r"\bdoesn't\b": "does not",
-            r"\bwon't\b": "will not",
-            r"\bcan't\b": "cannot",
-            r"\bisn't\b": "is not",
-            r"\baren't\b": "are not",
-            r"\bwasn't\b": "was not",
-            r"\bweren't\b": "were not",
-            r"\bhasn't\b": "has not",
-            r"\bhaven't\b": "have not",
-            r"\bhadn't\b": "had not",
-            r"\bwouldn't\b": "would not",
-            r"\bcouldn't\b": "could not",
-            r"\bshouldn't\b": "should not",
-            r"\bit's\b": "it is",  # But need to distinguish from possessive "its"
-            r"\bthat's\b": "that is",
-            r"\bthere's\b": "there is",
-            r"\bhere's\b": "here is",
-        }
-
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        hits = HitTable()
 
-            for pattern, replacement in contractions.items():
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
+        for line in self.analysis:
+            content, line_num = line.content, line.line_num
+            for index, (pattern, replacement) in enumerate(CONTRACTIONS):
+                for start, end, text in line.matches.get(("contraction", index), ()):
                     # Special case: "it's" vs "its" - only flag if followed by not a possessive context
                     if pattern == r"\bit's\b":
                         # Check if it's likely possessive (followed by a noun)
-                        after_text = content[match.end():].strip()
+                        after_text = content[end:].strip()
                         if after_text and after_text[0].islower():
                             continue  # Skip if likely possessive
 
-                    if self.should_flag(2):  # Severity 2 for style violations
-                        findings.append({
-                            "issue_description": f"Line {line_num}: Contraction '{match.group()}' should be avoided",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-20):min(len(content), match.end()+20)],
-                            "category": "Mechanical Compliance",
-                            "severity": 2,
-                            "student_impact": "Contractions reduce formality and may confuse ESL learners",
-                            "suggested_fix": f"Replace '{match.group()}' with '{replacement}'",
-                            "confidence": 0.85
-                        })
-
-        return findings
-
-    def detect_passive_voice(self) -> List[Dict[str, Any]]:
-        """Detect passive voice constructions (is/was/are/were + past participle)."""
-        findings = []
-
-        # Common passive voice patterns
-        passive_patterns = [
-            # "is/are/was/were + past participle"
-            r'\b(is|are|was|were)\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
-            # "has/have/had been + past participle"
-            r'\b(has|have|had)\s+been\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
-            # "being + past participle"
-            r'\bbeing\s+(\w+ed|found|given|known|shown|seen|made|done|written|taken)\b',
-            # Common passive constructions
-            r'\bit\s+is\s+(\w+ed|found|essential|important|necessary|required)\b',
-        ]
+                    hits.add({
+                        "issue_description": f"Line {line_num}: Contraction '{text}' should be avoided",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-20):min(len(content), end+20)],
+                        "student_impact": "Contractions reduce formality and may confuse ESL learners",
+                        "suggested_fix": f"Replace '{text}' with '{replacement}'",
+                        "confidence": 0.85
+                    })
 
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        return hits
 
-            for pattern in passive_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    passive_phrase = match.group()
+    @detector(category="Mechanical Compliance", severity=2)
+    def detect_passive_voice(self) -> HitTable:
+        """Detect passive voice constructions (is/was/are/were + past participle)."""
+        hits = HitTable()
+
+        for i, line in enumerate(self.analysis):
+            content, line_num = line.content, line.line_num
+            for index in range(len(PASSIVE_PATTERNS)):
+                for start, end, passive_phrase in line.matches.get(("passive", index), ()):
                     # Skip if inside LaTeX tags
-                    if self.is_in_math(content, match.start()):
+                    if line.math.contains(start):
                         continue
 
-                    severity = 2  # Moderate issue for style
-                    if self.should_flag(severity):
-                        findings.append({
-                            "issue_description": f"Passive voice construction: '{passive_phrase}'",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-20):min(len(content), match.end()+20)],
-                            "category": "Mechanical Compliance",
-                            "severity": severity,
-                            "student_impact": "Active voice is clearer and more direct for struggling readers",
-                            "suggested_fix": f"Rewrite in active voice. Instead of '{passive_phrase}', specify who/what performs the action",
-                            "confidence": 0.75
-                        })
-                        break  # One finding per line
-
-        return findings
-
-    def detect_imperative_in_hints(self) -> List[Dict[str, Any]]:
+                    hits.add({
+                        "issue_description": f"Passive voice construction: '{passive_phrase}'",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-20):min(len(content), end+20)],
+                        "student_impact": "Active voice is clearer and more direct for struggling readers",
+                        "suggested_fix": f"Rewrite in active voice. Instead of '{passive_phrase}', specify who/what performs the action",
+                        "confidence": 0.75
+                    }, group=(i, index))
+
+        return hits
+
+    @detector(category="Student Engagement", severity=3, inputs=("elements",), elements=("hint",))
+    def detect_imperative_in_hints(self) -> HitTable:
         """Detect imperative voice in hints (commands like 'Use', 'Try', 'Remember')."""
-        findings = []
+        hits = HitTable()
 
         # Imperative verbs commonly found at start of sentences
         imperative_verbs = [
@@ -432,270 +1383,165 @@ class RuleBasedDetector:
             'Begin', 'Write', 'Draw', 'Sketch', 'Plot', 'Solve', 'Substitute'
         ]
 
-        in_hint = False
-        hint_content = []
-        hint_start_line = None
-
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
-
-            # Check if we're entering or exiting a hint
-            if '<hint>' in line or '<Hint>' in line:
-                in_hint = True
-                hint_start_line = line_num
-                hint_content = []
-            elif '</hint>' in line or '</Hint>' in line:
-                in_hint = False
-                # Check the complete hint content
-                full_hint = ' '.join(hint_content)
-                for verb in imperative_verbs:
-                    if re.search(rf'\b{verb}\b', full_hint):
-                        severity = 3  # Higher severity for hint issues
-                        if self.should_flag(severity):
-                            findings.append({
-                                "issue_description": f"Hint uses imperative voice (command): starts with '{verb}'",
-                                "line_numbers": [hint_start_line],
-                                "quoted_text": full_hint[:100] + "..." if len(full_hint) > 100 else full_hint,
-                                "category": "Student Engagement",
-                                "severity": severity,
-                                "student_impact": "Hints should guide thinking, not give commands. Commands can feel patronizing",
-                                "suggested_fix": f"Rephrase as a question or observation. Instead of '{verb}...', try 'What happens if...' or 'Notice that...'",
-                                "confidence": 0.80
-                            })
-                            break
-            elif in_hint:
-                hint_content.append(content)
+        for hint_id, hint_lines in self.element_lines('hint').items():
+            # Check the complete hint content
+            full_hint = ' '.join(line.content for line in hint_lines)
+            for verb in imperative_verbs:
+                if any(line.has_word(verb) for line in hint_lines):
+                    hits.add({
+                        "issue_description": f"Hint uses imperative voice (command): starts with '{verb}'",
+                        "line_numbers": [hint_lines[0].line_num],
+                        "quoted_text": full_hint[:100] + "..." if len(full_hint) > 100 else full_hint,
+                        "student_impact": "Hints should guide thinking, not give commands. Commands can feel patronizing",
+                        "suggested_fix": f"Rephrase as a question or observation. Instead of '{verb}...', try 'What happens if...' or 'Notice that...'",
+                        "confidence": 0.80
+                    }, group=hint_id)
 
-        return findings
+        return hits
 
-    def detect_interval_notation_issues(self) -> List[Dict[str, Any]]:
+    @detector(category="Mathematical Formatting", severity=2)
+    def detect_interval_notation_issues(self) -> HitTable:
         """Detect inconsistent interval notation (using < > instead of interval notation)."""
-        findings = []
-
-        # Pattern for inequality chains that should be interval notation
-        inequality_patterns = [
-            # "a < x < b" or "a ≤ x ≤ b" patterns
-            r'(-?\d+\.?\d*)\s*(<|≤|<=)\s*\w+\s*(<|≤|<=)\s*(-?\d+\.?\d*)',
-            # "x > a and x < b" patterns
-            r'\w+\s*[<>]=?\s*(-?\d+\.?\d*)\s+and\s+\w+\s*[<>]=?\s*(-?\d+\.?\d*)',
-        ]
-
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
-
-            for pattern in inequality_patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    inequality = match.group()
+        hits = HitTable()
 
+        for i, line in enumerate(self.analysis):
+            content, line_num = line.content, line.line_num
+            for index in range(len(INEQUALITY_PATTERNS)):
+                for start, end, inequality in line.matches.get(("inequality", index), ()):
                     # Skip if already in LaTeX tags
-                    if '<m>' in line and '</m>' in line:
-                        # Check if this inequality is inside math tags
-                        math_start = content.find('<m>')
-                        math_end = content.find('</m>')
-                        if math_start < match.start() < math_end:
-                            continue
-
-                    severity = 2
-                    if self.should_flag(severity):
-                        # Determine appropriate interval notation
-                        if '<' in inequality and '≤' not in inequality and '<=' not in inequality:
-                            suggestion = "open interval notation like (a, b)"
-                        elif '≤' in inequality or '<=' in inequality:
-                            suggestion = "closed interval notation like [a, b]"
-                        else:
-                            suggestion = "appropriate interval notation"
-
-                        findings.append({
-                            "issue_description": f"Inequality chain should use interval notation: '{inequality}'",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-20):min(len(content), match.end()+20)],
-                            "category": "Mathematical Formatting",
-                            "severity": severity,
-                            "student_impact": "Interval notation is standard in calculus and clearer for expressing ranges",
-                            "suggested_fix": f"Replace '{inequality}' with {suggestion}",
-                            "confidence": 0.70
-                        })
-                        break
+                    if line.math.contains(start):
+                        continue
+
+                    # Determine appropriate interval notation
+                    if '<' in inequality and '≤' not in inequality and '<=' not in inequality:
+                        suggestion = "open interval notation like (a, b)"
+                    elif '≤' in inequality or '<=' in inequality:
+                        suggestion = "closed interval notation like [a, b]"
+                    else:
+                        suggestion = "appropriate interval notation"
 
-        return findings
+                    hits.add({
+                        "issue_description": f"Inequality chain should use interval notation: '{inequality}'",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-20):min(len(content), end+20)],
+                        "student_impact": "Interval notation is standard in calculus and clearer for expressing ranges",
+                        "suggested_fix": f"Replace '{inequality}' with {suggestion}",
+                        "confidence": 0.70
+                    }, group=(i, index))
 
-    def is_in_math(self, content: str, position: int) -> bool:
-        """Check if a position in content is inside LaTeX math tags."""
-        # Find all math tag positions
-        for match in re.finditer(r'<m[e]?>.*?</m[e]?>', content, re.DOTALL):
-            if match.start() <= position <= match.end():
-                return True
-        return False
+        return hits
 
-    def detect_vague_pronouns(self) -> List[Dict[str, Any]]:
+    @detector(category="Conceptual Clarity", severity=2, roles=("authoring",))
+    def detect_vague_pronouns(self) -> HitTable:
         """Detect vague pronoun usage (it, this, they without clear antecedent)."""
-        findings = []
+        hits = HitTable()
+
+        for line in self.analysis:
+            content, line_num = line.content, line.line_num
+            for index, (_, description) in enumerate(VAGUE_PRONOUN_PATTERNS):
+                for start, end, text in line.matches.get(("vague_pronoun", index), ()):
+                    hits.add({
+                        "issue_description": f"Line {line_num}: {description} - '{text}'",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-20):min(len(content), end+40)],
+                        "student_impact": "Vague pronouns increase cognitive load for struggling readers",
+                        "suggested_fix": "Replace with explicit noun reference",
+                        "confidence": 0.70
+                    })
 
-        vague_patterns = [
-            (r'^(It|This)\s+', "Sentence starts with vague pronoun"),
-            (r'\.\s+(It|This)\s+', "Sentence starts with vague pronoun after period"),
-            (r'\bthey\b', "Use of 'they' pronoun"),
-            (r'\bit\s+(is|was|has|can|will|should|could|would|may|might)\b', "Vague 'it' reference"),
-        ]
+        return hits
 
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
-
-            for pattern, description in vague_patterns:
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    if self.should_flag(2):  # Severity 2
-                        findings.append({
-                            "issue_description": f"Line {line_num}: {description} - '{match.group()}'",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-20):min(len(content), match.end()+40)],
-                            "category": "Conceptual Clarity",
-                            "severity": 2,
-                            "student_impact": "Vague pronouns increase cognitive load for struggling readers",
-                            "suggested_fix": "Replace with explicit noun reference",
-                            "confidence": 0.70
-                        })
-
-        return findings
-
-    def detect_missing_latex(self) -> List[Dict[str, Any]]:
+    @detector(category="Mathematical Formatting", severity=3)
+    def detect_missing_latex(self) -> HitTable:
         """
         Detect mathematical notation not wrapped in LaTeX tags.
 
         REFINED APPROACH (reduces false positives):
         - HIGH PRIORITY (Severity 3): Display-context math (equations, formulas, complex expressions)
+          from DISPLAY_MATH_PATTERNS
         - LOW PRIORITY (Severity 1): Inline symbols in prose (often acceptable without LaTeX)
+          from INLINE_SYMBOL_PATTERNS
         - SKIP: Arrows and simple symbols commonly used in narrative text
         """
-        findings = []
-
-        # HIGH PRIORITY: Display-context math patterns (Severity 3)
-        # These should definitely use LaTeX for proper formatting
-        display_math_patterns = [
-            (r'\b[a-zA-Z]\s*=\s*[-+]?\d+', "Variable assignment without LaTeX"),
-            (r'\b(lim|sin|cos|tan|log|ln|exp)\s*\(', "Mathematical function without LaTeX"),
-            (r'[a-zA-Z]_\d+', "Subscript notation without LaTeX"),
-            (r'\^\{?[0-9n+\-]+\}?', "Superscript notation without LaTeX"),
-            (r'\d+\s*/\s*\d+', "Fraction without LaTeX"),
-            (r'∑|∏|∫', "Summation/product/integral symbol without LaTeX"),
-        ]
-
-        # LOW PRIORITY: Inline symbols (Severity 1)
-        # These are often acceptable in prose but could be improved
-        inline_symbol_patterns = [
-            (r'[≈≤≥≠±∓√∞]', "Mathematical symbol in prose"),
-        ]
-
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        hits = HitTable()
 
+        for line in self.analysis:
+            content, line_num = line.content, line.line_num
             # Skip if line already has LaTeX tags (<m> or <me>)
             if '<m>' in content or '<me>' in content or '</m>' in content or '</me>' in content:
                 continue
 
             # Check display-context patterns (HIGH PRIORITY)
-            for pattern, description in display_math_patterns:
-                matches = list(re.finditer(pattern, content))
-                for match in matches:
-                    if self.should_flag(3):  # Severity 3 (was 2)
-                        findings.append({
-                            "issue_description": f"Line {line_num}: {description}",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-10):min(len(content), match.end()+10)],
-                            "category": "Mathematical Formatting",
-                            "severity": 3,
-                            "student_impact": "Mathematical expressions without LaTeX may not render consistently across devices",
-                            "suggested_fix": f"Wrap in <m>...</m> tags for consistent rendering",
-                            "confidence": 0.80
-                        })
+            for index, (_, description) in enumerate(DISPLAY_MATH_PATTERNS):
+                for start, end, _ in line.matches.get(("display_math", index), ()):
+                    hits.add({
+                        "issue_description": f"Line {line_num}: {description}",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-10):min(len(content), end+10)],
+                        "student_impact": "Mathematical expressions without LaTeX may not render consistently across devices",
+                        "suggested_fix": f"Wrap in <m>...</m> tags for consistent rendering",
+                        "confidence": 0.80
+                    })
 
             # Check inline symbols (LOW PRIORITY) - only flag occasionally
             # These are acceptable in prose, so we flag at low severity and low confidence
-            for pattern, description in inline_symbol_patterns:
-                matches = list(re.finditer(pattern, content))
-                for match in matches:
-                    # Only flag 30% of the time (reduce noise)
-                    if self.should_flag(1) and random.random() < 0.3:
-                        findings.append({
-                            "issue_description": f"Line {line_num}: {description}",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[max(0, match.start()-10):min(len(content), match.end()+10)],
-                            "category": "Mathematical Formatting",
-                            "severity": 1,
-                            "student_impact": "Inline symbols are generally acceptable but LaTeX improves consistency",
-                            "suggested_fix": f"Consider wrapping in <m>...</m> tags if symbol is central to the concept",
-                            "confidence": 0.50
-                        })
-
-        return findings
-
-    def detect_lazy_starts(self) -> List[Dict[str, Any]]:
+            for index, (_, description) in enumerate(INLINE_SYMBOL_PATTERNS):
+                for start, end, _ in line.matches.get(("inline_symbol", index), ()):
+                    # rate=0.3: agents report these at 30% of the usual probability (reduce noise)
+                    hits.add({
+                        "issue_description": f"Line {line_num}: {description}",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[max(0, start-10):min(len(content), end+10)],
+                        "severity": 1,
+                        "student_impact": "Inline symbols are generally acceptable but LaTeX improves consistency",
+                        "suggested_fix": f"Consider wrapping in <m>...</m> tags if symbol is central to the concept",
+                        "confidence": 0.50
+                    }, rate=0.3)
+
+        return hits
+
+    @detector(category="Conceptual Clarity", severity=1)
+    def detect_lazy_starts(self) -> HitTable:
         """Detect 'There is/are' lazy sentence starts."""
-        findings = []
+        hits = HitTable()
+
+        for line in self.analysis:
+            content, line_num = line.content, line.line_num
+            for index in range(len(LAZY_START_PATTERNS)):
+                for start, end, text in line.matches.get(("lazy_start", index), ()):
+                    hits.add({
+                        "issue_description": f"Line {line_num}: Lazy start with '{text.strip()}'",
+                        "line_numbers": [line_num],
+                        "quoted_text": content[start:min(len(content), end+30)],
+                        "student_impact": "Less direct phrasing adds cognitive load",
+                        "suggested_fix": "Start with the actual subject of the sentence",
+                        "confidence": 0.60
+                    })
 
-        lazy_patterns = [
-            r'^There\s+(is|are|was|were)\s+',
-            r'\.\s+There\s+(is|are|was|were)\s+',
-        ]
+        return hits
 
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
-
-            for pattern in lazy_patterns:
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    if self.should_flag(1):  # Severity 1 (low)
-                        findings.append({
-                            "issue_description": f"Line {line_num}: Lazy start with '{match.group().strip()}'",
-                            "line_numbers": [line_num],
-                            "quoted_text": content[match.start():min(len(content), match.end()+30)],
-                            "category": "Conceptual Clarity",
-                            "severity": 1,
-                            "student_impact": "Less direct phrasing adds cognitive load",
-                            "suggested_fix": "Start with the actual subject of the sentence",
-                            "confidence": 0.60
-                        })
-
-        return findings
-
-    def detect_complex_sentences(self) -> List[Dict[str, Any]]:
+    @detector(category="Conceptual Clarity", severity=1, inputs=("sentences",), cost="moderate")
+    def detect_complex_sentences(self) -> HitTable:
         """Detect overly complex sentence structures - ANALYZES SENTENCES, NOT LINES."""
-        findings = []
+        hits = HitTable()
 
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        for i, line in enumerate(self.analysis):
+            content, line_num = line.content, line.line_num
 
-            # CRITICAL: Split line into sentences first
-            # Be careful with periods in math notation (e.g., "2.5" or "<m>...</m>")
-            # Split on ". " followed by capital letter or end of string
-            sentences = re.split(r'\.\s+(?=[A-Z]|$)', content)
-
-            for sentence_idx, sentence in enumerate(sentences):
-                sentence = sentence.strip()
+            # CRITICAL: Analyze sentences, not lines (LineAnalysis splits on ". " followed
+            # by a capital letter or end of line, so periods in "2.5" or math do not split)
+            for sentence_start, sentence_end in line.sentences():
+                sentence = content[sentence_start:sentence_end].strip()
                 if not sentence or len(sentence) < 20:  # Skip very short fragments
                     continue
 
                 # Check for multiple clauses (indicated by multiple commas)
-                # IMPORTANT: Exclude commas inside mathematical expressions and mathematical objects
-                # 1. Remove LaTeX tags and their contents
-                text_without_math = re.sub(r'<m>.*?</m>', ' ', sentence, flags=re.DOTALL)
-                text_without_math = re.sub(r'<me>.*?</me>', ' ', text_without_math, flags=re.DOTALL)
-
-                # 2. Remove commas inside parentheses, brackets, and angle brackets (mathematical notation)
-                # These are intervals like (-2, 3), coordinates like (x, y), function args, etc.
-                text_without_math = re.sub(r'\([^)]*\)', ' ', text_without_math)  # Remove (...)
-                text_without_math = re.sub(r'\[[^\]]*\]', ' ', text_without_math)  # Remove [...]
-                text_without_math = re.sub(r'<[^>]*>', ' ', text_without_math)    # Remove <...>
-                text_without_math = re.sub(r'\{[^}]*\}', ' ', text_without_math)  # Remove {...}
-
-                # 3. Exclude serial comma patterns (lists like "A, B, and C" or "one, both, or neither")
+                # IMPORTANT: Exclude commas inside mathematical expressions and mathematical objects:
+                # the notation-masked line has LaTeX tags and contents blanked, as well as
+                # (...), [...], <...> and {...} (intervals like (-2, 3), coordinates, function args)
+                text_without_math = line.notation_masked[sentence_start:sentence_end]
+
+                # Exclude serial comma patterns (lists like "A, B, and C" or "one, both, or neither")
                 # These are normal lists, not complex sentences
                 # Pattern: word, word, (and|or) word
                 text_without_math = re.sub(r'\w+\s*,\s*\w+\s*,\s*(and|or)\s+\w+', ' ', text_without_math)
@@ -705,257 +1551,120 @@ class RuleBasedDetector:
                 comma_count = text_without_math.count(',')
                 # Flag INDIVIDUAL SENTENCES with 4+ commas (indicating multiple subordinate clauses)
                 if comma_count >= 4:
-                    if self.should_flag(1):
-                        findings.append({
-                            "issue_description": f"Line {line_num}: Complex sentence with {comma_count} commas",
-                            "line_numbers": [line_num],
-                            "quoted_text": sentence[:100] + "..." if len(sentence) > 100 else sentence,
-                            "category": "Conceptual Clarity",
-                            "severity": 1,
-                            "student_impact": "Complex sentences with multiple clauses are harder for struggling readers",
-                            "suggested_fix": "Break into simpler sentences with fewer subordinate clauses",
-                            "confidence": 0.65
-                        })
-                        break  # Only flag the line once, even if multiple sentences are complex
-
-            # Check for semicolons (discouraged)
-            if ';' in content:
-                if self.should_flag(1):
-                    findings.append({
-                        "issue_description": f"Line {line_num}: Semicolon usage discouraged",
+                    hits.add({
+                        "issue_description": f"Line {line_num}: Complex sentence with {comma_count} commas",
                         "line_numbers": [line_num],
-                        "quoted_text": content,
-                        "category": "Punctuation & Grammar",
-                        "severity": 1,
-                        "student_impact": "Semicolons increase complexity for mobile readers",
-                        "suggested_fix": "Split into two sentences or use comma with conjunction",
+                        "quoted_text": sentence[:100] + "..." if len(sentence) > 100 else sentence,
+                        "student_impact": "Complex sentences with multiple clauses are harder for struggling readers",
+                        "suggested_fix": "Break into simpler sentences with fewer subordinate clauses",
                         "confidence": 0.65
-                    })
+                    }, group=i)
 
-        return findings
+            # Check for semicolons (discouraged)
+            if ';' in content:
+                hits.add({
+                    "issue_description": f"Line {line_num}: Semicolon usage discouraged",
+                    "line_numbers": [line_num],
+                    "quoted_text": content,
+                    "category": "Punctuation & Grammar",
+                    "student_impact": "Semicolons increase complexity for mobile readers",
+                    "suggested_fix": "Split into two sentences or use comma with conjunction",
+                    "confidence": 0.65
+                })
 
-    def detect_missing_definitions(self) -> List[Dict[str, Any]]:
+        return hits
+
+    @detector(category="Accessibility", severity=3, inputs=("sentences",))
+    def detect_reading_level(self) -> HitTable:
+        """Detect sentences whose grade level, length or long-word ratio is an outlier
+        against the exemplar modules (READABILITY_THRESHOLDS)."""
+        hits = HitTable()
+
+        metrics = sentence_readability(self.module_text, self.structure)
+        scored = metrics["words"] >= READABILITY_MIN_WORDS
+        over = {name: scored & (metrics[name] > threshold)
+                for name, threshold in READABILITY_THRESHOLDS.items()}
+
+        for index in np.flatnonzero(np.logical_or.reduce(list(over.values()))):
+            line = self.analysis[metrics["line"][index]]
+            sentence = line.content[metrics["start"][index]:metrics["end"][index]].strip()
+            grade, words = metrics["grade"][index], int(metrics["words"][index])
+            long_word_percent = 100 * metrics["long_word_ratio"][index]
+
+            reasons = []
+            if over["grade"][index]:
+                reasons.append(f"reads at grade {grade:.1f}")
+            if over["words"][index]:
+                reasons.append(f"has {words} words")
+            if over["long_word_ratio"][index]:
+                reasons.append(f"{long_word_percent:.0f}% long words")
+
+            hits.add({
+                "issue_description": f"Line {line.line_num}: Hard-to-read sentence ({', '.join(reasons)})",
+                "line_numbers": [line.line_num],
+                "quoted_text": sentence[:100] + "..." if len(sentence) > 100 else sentence,
+                # Long but plain sentences are a minor issue; a high reading level is moderate
+                "severity": 3 if over["grade"][index] else 2,
+                "student_impact": (f"Grade {grade:.1f} reading level, {words} words, "
+                                   f"{long_word_percent:.0f}% words over six letters: "
+                                   "hard going for struggling readers and screen reader users"),
+                "suggested_fix": "Split the sentence and prefer shorter, more common words",
+                "confidence": 0.60
+            })
+
+        return hits
+
+    @detector(category="Structural Integrity", severity=2, cost="expensive", roles=("authoring",))
+    def detect_missing_definitions(self) -> HitTable:
         """
         Detect technical terms used without definition tags.
         Uses frequency-based heuristic: frequent terms are likely module-specific (Severity 4),
-        infrequent terms are likely prerequisites (Severity 2).
+        infrequent terms are likely prerequisites (Severity 2). Terms defined in this module
+        or in an earlier module of the course (COURSE_GLOSSARY) are not flagged.
         """
-        findings = []
-
-        # Infer module topic to avoid flagging the main subject
-        module_topic_terms = set()
-        early_content = ' '.join(self.lines[:10]).lower()
-
-        # Extract key terms from early content (likely the module's main topic)
-        if 'power series' in early_content:
-            module_topic_terms.update(['power series', 'series'])
-        if 'taylor series' in early_content or 'maclaurin' in early_content:
-            module_topic_terms.update(['taylor series', 'series'])
-        if 'convergence' in early_content:
-            module_topic_terms.add('convergence')
-        if 'integral' in early_content and 'improper' in early_content:
-            module_topic_terms.update(['improper integral', 'integral'])
-
-        # CALC 2 BASIC VOCABULARY: Fundamental concepts taught at start of Calc 2
-        # These are universal vocabulary terms, not tests or specific techniques
-        calc2_vocabulary = [
-            r'\bconvergence\b', r'\bconverges\b', r'\bconvergent\b',
-            r'\bdivergence\b', r'\bdiverges\b', r'\bdivergent\b',
-            r'\bsequence\b', r'\bsequences\b',
-            r'\bseries\b',  # General term (not specific types like "power series")
-            r'\bterm\b', r'\bterms\b',  # As in "terms of a series"
-            r'\bpartial sum\b', r'\bpartial sums\b',
-            r'\binfinite series\b',
-            r'\bfinite sum\b',
-        ]
+        hits = HitTable()
 
-        # EARLY CALC 2: Basic series concepts and first convergence tests (Chapters 1-3)
-        # These are typically covered BEFORE most modules - don't flag them
-        early_calc2_fundamentals = [
-            r'\balternating series test\b',
-            r'\bp-series\b',
-            r'\bgeometric series\b',
-            r'\bharmonic series\b',
-            r'\btelescoping series\b',
-            r'\bnth term test\b',
-            r'\bdivergence test\b',
-        ]
+        # Terms this module defines (formally or informally), and terms an earlier module of
+        # the course defines (COURSE_GLOSSARY; empty unless main() refreshed it)
+        defined_terms = find_defined_terms(self.module_text, self.structure)
 
-        # MID CALC 2: Advanced convergence tests and techniques (Chapters 3-5)
-        # Flag these ONLY if module is clearly about earlier topics
-        mid_calc2_terms = [
-            r'\b(ratio test|root test|integral test|comparison test|limit comparison test)\b',
-            r'\b(integration by parts|partial fractions|trigonometric substitution)\b',
-            r'\bimproper integral\b',
-        ]
+        def is_defined(term: str) -> bool:
+            return term in defined_terms or COURSE_GLOSSARY.defined_before(term, MODULE_ORDER) is not None
 
-        # LATE CALC 2: Power/Taylor series (Chapters 5-7)
-        # Flag these as module-specific if not defined
-        calc2_compound_terms = [
-            r'\b(radius of convergence|interval of convergence)\b',
-            r'\b(power series|taylor series|maclaurin series)\b',
-            r'\btaylor polynomial\b',
-        ]
-
-        # CALC 1 FUNDAMENTALS: Never flag these (universal prerequisites from Calculus 1)
-        calc1_fundamentals = [
-            r'\blimit\b', r'\bderivative\b', r'\bintegral\b', r'\bfunction\b',
-            r'\bcontinuous\b', r'\bdifferentiable\b', r'\bantiderivative\b',
-            r'\btangent line\b', r'\bsecant line\b', r'\brate of change\b',
-            r'\bcritical point\b', r'\bmaximum\b', r'\bminimum\b',
-            r'\bconcave up\b', r'\bconcave down\b', r'\binflection point\b',
-            r'\bdefinite integral\b', r'\bindefinite integral\b', r'\briemann sum\b',
-            r'\barea under.{0,10}curve\b', r'\bsubstitution\b',
-            r'\bchain rule\b', r'\bproduct rule\b', r'\bquotient rule\b', r'\bpower rule\b',
-        ]
+        # The module's subject is what its (module and activity) titles name: not flagged
+        vocabulary = load_curriculum_vocabulary()
+        module_topic_terms = {term for line in self.analysis if line.within('title')
+                              for _, _, term, _ in vocabulary.scan(line.content)}
 
-        # PRE-CALCULUS FUNDAMENTALS: Basic terms taught before Calculus - don't flag these
-        foundational_patterns = [
-            r'\bvariable\b', r'\bequation\b', r'\bexpression\b', r'\bgraph\b',
-            r'\breal number\b', r'\bcomplex number\b', r'\bpolynomial\b',
-            r'\bcoefficient\b', r'\bterm\b', r'\bnumber\b', r'\binterval\b',
-            r'\bdomain\b', r'\brange\b', r'\bslope\b', r'\bintercept\b',
-            r'\bexponential\b', r'\blogarithm\b', r'\btrigonometric\b',
-            r'\bsine\b', r'\bcosine\b', r'\btangent\b',
-        ]
+        # Collect occurrences of curriculum terms to define ("define" tier, e.g. late Calc 2)
+        # and to verify as prerequisites ("verify" tier, e.g. mid Calc 2) in one pass per line.
+        # Tracked separately to apply different severity levels
+        term_occurrences = {}  # "define": module-specific
+        mid_term_occurrences = {}  # "verify": possibly prerequisite
 
-        # Track defined terms (both formal and informal definitions)
-        defined_terms = set()
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-
-            # Formal definitions: <definition><b>Term</b> is...</definition>
-            if '<definition>' in content:
-                match = re.search(r'<b>([^<]+)</b>', content)
-                if match:
-                    defined_terms.add(match.group(1).lower())
-
-            # ENHANCED: Recognize <b>Term</b> is/are patterns (inline definitions with bold)
-            # Pattern: "is/are the <b>term</b>" or "is/are <b>term</b>"
-            bold_term_patterns = [
-                r'(?:is|are)\s+(?:the\s+)?<b>([^<]+)</b>',  # "is the <b>term</b>" or "is <b>term</b>"
-                r'<b>([^<]+)</b>\s+(?:is|are)\s+',  # "<b>Term</b> is/are"
-                r'called\s+(?:the\s+)?<b>([^<]+)</b>',  # "called the <b>term</b>"
-            ]
-
-            for pattern in bold_term_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    term = match.group(1).strip().lower()
-                    # Only capture multi-word technical phrases (helps avoid single-word variables)
-                    if len(term.split()) >= 2:
-                        defined_terms.add(term)
-                        # Also add without articles for flexible matching
-                        term_no_article = re.sub(r'^(the|a|an)\s+', '', term)
-                        if term_no_article != term:
-                            defined_terms.add(term_no_article)
-
-            # Informal definitions: Recognize natural ways of introducing/defining technical terms
-            # These patterns catch definitions that don't use formal <definition> tags
-            content_lower = content.lower()
-
-            # Patterns to run on lowercase content
-            lowercase_patterns = [
-                # Explicit definition statements
-                r'([a-z\s]+)\s+is\s+defined\s+(?:as|to\s+be)',  # "X is defined as/to be"
-                r'([a-z\s]+),\s+defined\s+as',  # "X, defined as"
-
-                # "Call/called" statements
-                r'call(?:ed)?\s+(?:this|it)\s+the\s+([a-z\s]+)',  # "we call this the X" or "called the X"
-                r'(?:is|are)\s+called\s+the\s+([a-z\s]+)',  # "is called the X"
-
-                # "This/It" referential definitions (after introducing a term)
-                r'this\s+(?:is|defines|represents|denotes)\s+(?:the\s+)?([a-z\s]+)',  # "this is/represents the X"
-                r'it\s+(?:is|defines|represents|denotes)\s+(?:the\s+)?([a-z\s]+)',  # "it represents the X"
-
-                # Direct "X is" statements (simple explanatory statements)
-                r'the\s+([a-z\s]+)\s+is\s+(?:then|simply|just|always|never)',  # "the X is then..."
-            ]
-
-            # Patterns to run on original content (case-sensitive)
-            original_patterns = [
-                # Appositive constructions: "the radius of convergence, R. This represents..."
-                r'the\s+([a-z\s]+),\s+[A-Z]',  # Capital letter after comma suggests explanation/definition
-            ]
-
-            # Process lowercase patterns
-            for pattern in lowercase_patterns:
-                matches = re.finditer(pattern, content_lower)
-                for match in matches:
-                    term = match.group(1).strip()
-                    # Only capture multi-word technical phrases (2+ words)
-                    # Exclude generic phrases
-                    if len(term.split()) >= 2 and not term.startswith(('the distance', 'the center', 'the value')):
-                        defined_terms.add(term)
-
-            # Process original content patterns (case-sensitive)
-            for pattern in original_patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    term = match.group(1).strip().lower()  # Normalize to lowercase for storage
-                    if len(term.split()) >= 2 and not term.startswith(('the distance', 'the center', 'the value')):
-                        defined_terms.add(term)
-
-        # Collect occurrences of Calc 2 compound terms (mid and late only)
-        # Track separately to apply different severity levels
-        term_occurrences = {}  # For late Calc 2 (module-specific)
-        mid_term_occurrences = {}  # For mid Calc 2 (possibly prerequisite)
-
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
-
-            # Check LATE Calc 2 terms (module-specific, severity 4)
-            for pattern in calc2_compound_terms:
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    term = match.group().lower()
-
-                    # Skip if already defined
-                    if term in defined_terms:
-                        continue
-
-                    # Skip if it's the module's main topic
-                    if term in module_topic_terms:
-                        continue
+        for i, line in enumerate(self.analysis):
+            content, line_num = line.content, line.line_num
 
-                    # Collect occurrence
-                    if term not in term_occurrences:
-                        term_occurrences[term] = []
-
-                    quote = content[max(0, match.start()-20):min(len(content), match.end()+20)]
-                    term_occurrences[term].append({
-                        'line_num': line_num,
-                        'quote': quote,
-                        'original_case': match.group(),
-                        'line_index': i
-                    })
-
-            # Check MID Calc 2 terms (possibly prerequisite, severity 2)
-            for pattern in mid_calc2_terms:
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    term = match.group().lower()
-
-                    # Skip if already defined
-                    if term in defined_terms:
-                        continue
+            for start, end, term, tier in vocabulary.scan(content):
+                action = vocabulary.tiers[tier]["action"]
+                if action == "ignore":
+                    continue
 
-                    # Skip if it's the module's main topic
-                    if term in module_topic_terms:
-                        continue
+                # Skip if already defined (here or earlier in the course)
+                if is_defined(term):
+                    continue
 
-                    # Collect occurrence (mid-level terms tracked separately)
-                    if term not in mid_term_occurrences:
-                        mid_term_occurrences[term] = []
+                # Skip if it's the module's main topic
+                if term in module_topic_terms:
+                    continue
 
-                    quote = content[max(0, match.start()-20):min(len(content), match.end()+20)]
-                    mid_term_occurrences[term].append({
-                        'line_num': line_num,
-                        'quote': quote,
-                        'original_case': match.group(),
-                        'line_index': i
-                    })
+                occurrences = term_occurrences if action == "define" else mid_term_occurrences
+                occurrences.setdefault(term, []).append({
+                    'line_num': line_num,
+                    'quote': content[max(0, start-20):min(len(content), end+20)],
+                    'original_case': content[start:end],
+                    'line_index': i
+                })
 
         # Process LATE Calc 2 terms (module-specific, higher severity)
         for term, occurrences in term_occurrences.items():
@@ -973,32 +1682,25 @@ class RuleBasedDetector:
 
             if word_count >= 2:
                 # Multi-word phrase → likely module-specific concept
-                severity = 4
-                if self.should_flag(severity):
-                    findings.append({
-                        "issue_description": f"Technical term '{original_case}' appears {frequency} times but may lack clear definition. Lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
-                        "line_numbers": line_numbers,
-                        "quoted_text": first_quote,
-                        "category": "Structural Integrity",
-                        "severity": 4,
-                        "student_impact": "Compound technical term is likely specific to this module. Students studying alone need explicit definitions to understand new concepts.",
-                        "suggested_fix": f"Has the term '{original_case}' been defined previously in this module or a prerequisite? If not, is the explanation provided here clear and straightforward? Consider adding formal definition: <definition><b>{original_case}</b> is ...</definition>",
-                        "confidence": 0.80
-                    })
+                hits.add({
+                    "issue_description": f"Technical term '{original_case}' appears {frequency} times but may lack clear definition. Lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
+                    "line_numbers": line_numbers,
+                    "quoted_text": first_quote,
+                    "severity": 4,
+                    "student_impact": "Compound technical term is likely specific to this module. Students studying alone need explicit definitions to understand new concepts.",
+                    "suggested_fix": f"Has the term '{original_case}' been defined previously in this module or a prerequisite? If not, is the explanation provided here clear and straightforward? Consider adding formal definition: <definition><b>{original_case}</b> is ...</definition>",
+                    "confidence": 0.80
+                })
             else:
                 # Single-word term → likely prerequisite (even if frequent)
-                severity = 2
-                if self.should_flag(severity):
-                    findings.append({
-                        "issue_description": f"Verify definition status: '{original_case}' appears {frequency} times. Used on lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
-                        "line_numbers": line_numbers,
-                        "quoted_text": first_quote,
-                        "category": "Structural Integrity",
-                        "severity": 2,
-                        "student_impact": "Single-word foundational term is likely prerequisite knowledge from standard Calc 2 progression, but should be verified to ensure accessibility for all students.",
-                        "suggested_fix": f"Verify: Has '{original_case}' been defined in this module or a prerequisite? If not, consider adding a brief definition or reminder of the concept.",
-                        "confidence": 0.60
-                    })
+                hits.add({
+                    "issue_description": f"Verify definition status: '{original_case}' appears {frequency} times. Used on lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
+                    "line_numbers": line_numbers,
+                    "quoted_text": first_quote,
+                    "student_impact": "Single-word foundational term is likely prerequisite knowledge from standard Calc 2 progression, but should be verified to ensure accessibility for all students.",
+                    "suggested_fix": f"Verify: Has '{original_case}' been defined in this module or a prerequisite? If not, consider adding a brief definition or reminder of the concept.",
+                    "confidence": 0.60
+                })
 
         # Process MID Calc 2 terms (possibly prerequisite, lower severity)
         for term, occurrences in mid_term_occurrences.items():
@@ -1009,42 +1711,38 @@ class RuleBasedDetector:
 
             # MID Calc 2 terms get severity 2 (verification) instead of 4 (missing definition)
             # These are tests and techniques that might be prerequisites
-            severity = 2
-            if self.should_flag(severity):
-                findings.append({
-                    "issue_description": f"Verify prerequisite: '{original_case}' appears {frequency} times. This is a mid-Calc 2 technique that may have been covered in an earlier module. Lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
-                    "line_numbers": line_numbers,
-                    "quoted_text": first_quote,
-                    "category": "Structural Integrity",
-                    "severity": 2,
-                    "student_impact": "If this technique hasn't been introduced in a prerequisite module, students may lack the necessary background knowledge.",
-                    "suggested_fix": f"Verify: Was '{original_case}' taught in an earlier Calc 2 module? If this is the first introduction, add explanation or definition. If it's a prerequisite, consider adding a brief reminder.",
-                    "confidence": 0.55
-                })
-
-        return findings
-
-    def detect_authoring_issues(self) -> List[Dict[str, Any]]:
+            hits.add({
+                "issue_description": f"Verify prerequisite: '{original_case}' appears {frequency} times. This is a mid-Calc 2 technique that may have been covered in an earlier module. Lines: {', '.join(map(str, line_numbers[:5]))}{'...' if len(line_numbers) > 5 else ''}",
+                "line_numbers": line_numbers,
+                "quoted_text": first_quote,
+                "student_impact": "If this technique hasn't been introduced in a prerequisite module, students may lack the necessary background knowledge.",
+                "suggested_fix": f"Verify: Was '{original_case}' taught in an earlier Calc 2 module? If this is the first introduction, add explanation or definition. If it's a prerequisite, consider adding a brief reminder.",
+                "confidence": 0.55
+            })
+
+        return hits
+
+    @detector(category="Pedagogical Flow", severity=2, roles=("authoring",))
+    def detect_authoring_issues(self) -> HitTable:
         """Detect authoring-specific issues."""
-        findings = []
+        hits = HitTable()
 
         # Check for abstract before concrete
-        for i in range(len(self.lines) - 1):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(self.lines[i])
+        for i, line in enumerate(self.analysis[:-1]):
+            content, line_num = line.content, line.line_num
 
             # Look for abstract mathematical definitions without prior example
             if re.search(r'∑|∏|∫|lim', content) and i < 20:  # Early in module
                 # ENHANCED: Skip if this is explanatory/framing text (not a definition)
                 # Patterns that indicate explanation rather than abstract definition:
                 is_explanatory = any([
-                    'is the primary tool' in content.lower(),
-                    'to find' in content.lower(),
-                    'by solving' in content.lower(),
-                    'helps us' in content.lower(),
-                    'allows us to' in content.lower(),
-                    'we use' in content.lower(),
-                    'can be used' in content.lower(),
+                    'is the primary tool' in line.lower,
+                    'to find' in line.lower,
+                    'by solving' in line.lower,
+                    'helps us' in line.lower,
+                    'allows us to' in line.lower,
+                    'we use' in line.lower,
+                    'can be used' in line.lower,
                 ])
 
                 # Skip if it's very early framing text (lines 1-6) that introduces concepts
@@ -1056,69 +1754,244 @@ class RuleBasedDetector:
 
                 # Check if there's a concrete example before this
                 has_example = False
-                for j in range(max(0, i - 5), i):
-                    prev_content = self.extract_line_content(j)
-                    if 'example' in prev_content.lower() or 'consider' in prev_content.lower():
+                for previous in self.analysis[max(0, i - 5):i]:
+                    if 'example' in previous.lower or 'consider' in previous.lower:
                         has_example = True
                         break
 
                 # ENHANCED: Also check if examples come soon AFTER (within next 5 lines)
                 # Framing text often precedes examples
                 if not has_example:
-                    for j in range(i + 1, min(len(self.lines), i + 6)):
-                        next_content = self.extract_line_content(j)
-                        if 'example' in next_content.lower() or 'consider' in next_content.lower():
+                    for following in self.analysis[i + 1:i + 6]:
+                        if 'example' in following.lower or 'consider' in following.lower:
                             has_example = True
                             break
 
-                if not has_example and self.should_flag(2):
-                    findings.append({
+                if not has_example:
+                    hits.add({
                         "issue_description": f"Line {line_num}: Abstract definition appears before concrete example",
                         "line_numbers": [line_num],
                         "quoted_text": content[:80],
-                        "category": "Pedagogical Flow",
-                        "severity": 2,
                         "student_impact": "Abstract-first approach increases cognitive load",
                         "suggested_fix": "Introduce a concrete example before the abstract definition",
                         "confidence": 0.65
                     })
 
         # Check for missing scaffolding
-        for i, line in enumerate(self.lines):
-            content = self.extract_line_content(i)
-            line_num = self.get_line_number(line)
+        for i, line in enumerate(self.analysis):
+            content, line_num = line.content, line.line_num
 
             # Look for sudden jumps to complex topics
-            if 'apply the ratio test' in content.lower():
+            if 'apply the ratio test' in line.lower:
                 # Check if ratio test was introduced/explained
                 explained = False
-                for j in range(max(0, i - 10), i):
-                    prev_content = self.extract_line_content(j)
-                    if 'ratio test' in prev_content.lower() and ('is' in prev_content or 'helps' in prev_content):
+                for previous in self.analysis[max(0, i - 10):i]:
+                    if 'ratio test' in previous.lower and ('is' in previous.content or 'helps' in previous.content):
                         explained = True
                         break
 
-                if not explained and self.should_flag(3):
-                    findings.append({
+                if not explained:
+                    hits.add({
                         "issue_description": f"Line {line_num}: Jumps to applying test without explanation",
                         "line_numbers": [line_num],
                         "quoted_text": content[:80],
-                        "category": "Pedagogical Flow",
                         "severity": 3,
                         "student_impact": "Students may not understand why this test is needed",
                         "suggested_fix": "Add explanation of what the test does and why we need it",
                         "confidence": 0.70
                     })
 
-        return findings
+        return hits
+
+
+class DetectionRule:
+    """A registered detector with its <detection_rules> entry (or its declared defaults)."""
+
+    def __init__(self, detector: str, category: str, severity: int,
+                 role_weights: Dict[str, float], competency_weights: Dict[str, float]):
+        self.detector = detector
+        self.category = category
+        self.severity = severity
+        self.role_weights = role_weights
+        self.competency_weights = competency_weights
+
+    def weight(self, role: str, competency: Optional[str]) -> float:
+        """How many independent looks an agent of this role and competency takes at each hit."""
+        return self.role_weights.get(role, 0.0) * self.competency_weights.get(competency, 1.0)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether agents of some role report this rule's hits (a positive role weight)."""
+        return any(weight > 0 for weight in self.role_weights.values())
+
+
+def load_detection_rules() -> List[DetectionRule]:
+    """
+    Detection rules from config/agent_configuration.xml, in document order, followed by
+    registered detectors the configuration does not list (with their declared defaults).
+    Without a <detection_rules> section every detector runs with its defaults.
+    """
+    return _load_detection_rules(CONFIG_PATH / "agent_configuration.xml", DETECTOR_PLUGIN_PATH)
+
+
+@lru_cache(maxsize=4)
+def _load_detection_rules(config_file: Path, plugin_dir: Path) -> List[DetectionRule]:
+    load_detector_plugins(plugin_dir)
+    section = ET.parse(config_file).getroot().find('detection_rules')
+
+    rules = []
+    for rule in (section.findall('rule') if section is not None else ()):
+        spec = DETECTORS.get(rule.get('detector'))
+        if spec is None:
+            raise ValueError(f"Unknown detector in {config_file}: {rule.get('detector')}")
+        role_weights = {}
+        competency_weights = {}
+        for weight in rule.findall('weight'):
+            if weight.get('role'):
+                role_weights[weight.get('role')] = float(weight.get('value'))
+            else:
+                competency_weights[weight.get('competency')] = float(weight.get('value'))
+        if not role_weights:
+            role_weights = {role: 1.0 for role in spec.roles}
+        rules.append(DetectionRule(spec.name, rule.get('category', spec.category),
+                                   int(rule.get('severity', spec.severity)), role_weights, competency_weights))
+
+    configured = {rule.detector for rule in rules}
+    for spec in DETECTORS.values():
+        if spec.name not in configured:
+            rules.append(DetectionRule(spec.name, spec.category, spec.severity,
+                                       {role: 1.0 for role in spec.roles}, {}))
+    return rules
+
+
+def agent_role_and_competency(agent_id: str) -> Tuple[str, Optional[str]]:
+    """Role and specialist competency (None for generalists) of an agent ID."""
+    role = "authoring" if "authoring" in agent_id.lower() else "style"
+    for competency in AGENT_CONFIG[role]["competencies"]:
+        if competency.replace(' ', '').lower() in agent_id.lower():
+            return role, competency
+    return role, None
+
+
+@lru_cache(maxsize=32)
+def detect_module_hits(module_text: str, structure: Optional[ModuleStructure] = None) -> Dict[str, HitTable]:
+    """
+    Run every detection rule once over the module.
+
+    Cached per module text and structure: agents reviewing the module only sample from these tables.
+    Each rule's wall time, lines scanned and hits are recorded in DETECTOR_PROFILE.
+
+    Returns:
+        HitTable per detector name, in rule order
+    """
+    rules = load_detection_rules()
+    started = time.perf_counter()
+    module = RuleBasedDetector(module_text, structure)
+    DETECTOR_PROFILE.record_analysis(time.perf_counter() - started)
+
+    tables = {}
+    for rule in rules:
+        spec = DETECTORS[rule.detector]
+        started = time.perf_counter()
+        table = spec.function(module)
+        DETECTOR_PROFILE.record(rule.detector, time.perf_counter() - started,
+                                spec.lines_scanned(module), len(table))
+        for finding in table.findings:
+            finding.setdefault("category", rule.category)
+            finding.setdefault("severity", rule.severity)
+        tables[rule.detector] = table
+    return tables
+
+
+@lru_cache(maxsize=32)
+def module_hit_table(module_text: str, structure: Optional[ModuleStructure] = None) -> HitTable:
+    """All hits of the module, in rule order (shared by every agent)."""
+    return HitTable.concat(list(detect_module_hits(module_text, structure).values()))
+
+
+@lru_cache(maxsize=256)
+def agent_probabilities(module_text: str, role: str, competency: Optional[str],
+                        structure: Optional[ModuleStructure] = None) -> np.ndarray:
+    """
+    Report probability of each module hit for agents of a role and competency.
+
+    A rule weight w turns a hit's base probability p into 1 - (1 - p)^w: the chance of
+    catching the hit in w independent looks.
+    """
+    rules = {rule.detector: rule for rule in load_detection_rules()}
+    weights = np.concatenate([np.empty(0)] + [
+        np.full(len(table), rules[name].weight(role, competency))
+        for name, table in detect_module_hits(module_text, structure).items()
+    ])
+    return 1.0 - (1.0 - module_hit_table(module_text, structure).probabilities()) ** weights
+
+
+def run_rule_triage(module_text: str, structure: Optional[ModuleStructure] = None) -> List[Dict[str, Any]]:
+    """
+    Run the deterministic TRIAGE_RULES once over the module.
+
+    Returns:
+        Unique hits, attributed to RULE_DETECTOR_ID and marked with source "rule"
+    """
+    rule_hits = detect_module_hits(module_text, structure)
 
+    hits = []
+    seen = set()
+    for rule in TRIAGE_RULES:
+        for finding in rule_hits[rule].report_all():
+            key = finding["issue_description"][:50]
+            if key in seen:
+                continue
+            seen.add(key)
+            finding["agent"] = RULE_DETECTOR_ID
+            finding["source"] = "rule"
+            hits.append(finding)
+
+    return hits
+
+
+def format_known_issues(rule_hits: List[Dict[str, Any]]) -> str:
+    """Prompt section listing rule hits that agents must not report again."""
+    if not rule_hits:
+        return ""
 
-def simulate_agent_review(agent_id: str, prompt: str) -> List[Dict[str, Any]]:
+    lines = [
+        KNOWN_ISSUES_HEADER,
+        "The issues below are already in the report. Do NOT report them again;",
+        "report only issues that are not on this list.",
+        ""
+    ]
+    for hit in rule_hits:
+        line_num = hit["line_numbers"][0] if hit["line_numbers"] else 0
+        lines.append(f"- Line {line_num:04d} | {hit['category']} | {hit['issue_description']}")
+    return '\n'.join(lines)
+
+
+def parse_known_issues(prompt: str) -> set:
+    """Description keys (first 50 chars) of the known issues listed in a prompt."""
+    start = prompt.find(KNOWN_ISSUES_HEADER)
+    if start == -1:
+        return set()
+
+    end = prompt.find("\n# ", start + len(KNOWN_ISSUES_HEADER))
+    section = prompt[start:end if end != -1 else len(prompt)]
+    known = set()
+    for line in section.split('\n'):
+        if line.startswith("- Line "):
+            parts = line[2:].split(" | ", 2)
+            if len(parts) == 3:
+                known.add(parts[2][:50])
+    return known
+
+
+def simulate_agent_review(agent_id: str, prompt: str,
+                          structure: Optional[ModuleStructure] = None) -> List[Dict[str, Any]]:
     """
     Simulate an agent review using rule-based detection.
 
     This replaces the hardcoded findings with generic pattern matching
-    that works on any module.
+    that works on any module. structure is that of the module in the prompt; without it,
+    rules that need the XML elements find nothing.
     """
 
     # Extract module content from prompt
@@ -1150,70 +2023,21 @@ def simulate_agent_review(agent_id: str, prompt: str) -> List[Dict[str, Any]]:
             break
     module_content = '\n'.join(lines[content_start:]).strip()
 
-    # Determine agent type from ID
-    agent_type = "authoring" if "authoring" in agent_id.lower() else "style"
-
-    # Create detector
-    detector = RuleBasedDetector(module_content, agent_type, agent_id)
-
-    findings = []
-
-    # Apply different rules based on agent type and specialization
-
-    # All agents can detect unfinished content
-    findings.extend(detector.detect_todo_placeholders())
-
-    if agent_type == "style":
-        # Style agents focus on mechanical issues
-        findings.extend(detector.detect_contractions())
-        findings.extend(detector.detect_missing_latex())
-        findings.extend(detector.detect_lazy_starts())
-        findings.extend(detector.detect_complex_sentences())
-        findings.extend(detector.detect_passive_voice())
-        findings.extend(detector.detect_imperative_in_hints())
-        findings.extend(detector.detect_interval_notation_issues())
-
-        # Specialists focus on their area
-        if "mechanical" in agent_id.lower():
-            # Extra focus on mechanical compliance
-            findings.extend(detector.detect_contractions())  # May catch more
-            findings.extend(detector.detect_passive_voice())  # Mechanical issue
-        elif "mathematical" in agent_id.lower():
-            # Extra focus on math formatting
-            findings.extend(detector.detect_missing_latex())  # May catch more
-            findings.extend(detector.detect_interval_notation_issues())  # Math formatting
-        elif "punctuation" in agent_id.lower():
-            # Focus on punctuation issues
-            findings.extend(detector.detect_complex_sentences())
-            findings.extend(detector.detect_passive_voice())  # Grammar issue
-
-    else:  # authoring agents
-        # Authoring agents focus on pedagogical issues
-        findings.extend(detector.detect_vague_pronouns())
-        findings.extend(detector.detect_missing_definitions())
-        findings.extend(detector.detect_authoring_issues())
-
-        # Specialists focus on their area
-        if "pedagogical" in agent_id.lower():
-            # Extra focus on flow
-            findings.extend(detector.detect_authoring_issues())  # May catch more
-        elif "structural" in agent_id.lower():
-            # Focus on structure
-            findings.extend(detector.detect_missing_definitions())  # May catch more
-        elif "conceptual" in agent_id.lower():
-            # Focus on clarity
-            findings.extend(detector.detect_vague_pronouns())  # May catch more
-
-    # Generalist agents sample from all categories but with lower probability
-    if "generalist" in agent_id.lower():
-        # Generalists have broader but shallower coverage
-        # They already got some findings above, but with their reduced probability
-        pass
+    # Detection runs once per module; the agent samples which hits it reports, weighted
+    # by its role and competency (see <detection_rules> in agent_configuration.xml)
+    role, competency = agent_role_and_competency(agent_id)
+    findings = module_hit_table(module_content, structure).sample(
+        [agent_id], agent_probabilities(module_content, role, competency, structure))[0]
+
+    # Issues the prompt lists as already known are not reported again
+    known_issues = parse_known_issues(prompt)
 
     # Remove duplicates (same line, same issue type) and add agent tracking
     seen = set()
     unique_findings = []
     for finding in findings:
+        if finding["issue_description"][:50] in known_issues:
+            continue
         key = (finding["line_numbers"][0] if finding["line_numbers"] else 0,
                finding["category"],
                finding["issue_description"][:30])
@@ -1226,6 +2050,604 @@ def simulate_agent_review(agent_id: str, prompt: str) -> List[Dict[str, Any]]:
     return unique_findings
 
 
+def split_module_windows(module_text: str, max_chars: int,
+                         overlap_lines: int = WINDOW_OVERLAP_LINES,
+                         structure: Optional[ModuleStructure] = None) -> List[Dict[str, Any]]:
+    """
+    Split the line-numbered module into overlapping windows of at most max_chars.
+
+    Lines keep their module-wide "0042|" prefixes. Each window owns the lines up to the
+    middle of its overlap with the next window; findings outside that range are left to
+    the neighbouring window so seam issues are reported once.
+
+    Returns:
+        Windows with text, first_line/last_line, owned_first/owned_last (line numbers) and
+        structure (the window's lines of structure, if given)
+    """
+    lines = module_text.split('\n')
+    spans = []
+    start = 0
+    while start < len(lines):
+        end = start
+        size = 0
+        while end < len(lines) and (end == start or size + len(lines[end]) + 1 <= max_chars):
+            size += len(lines[end]) + 1
+            end += 1
+        spans.append((start, end))
+        if end >= len(lines):
+            break
+        start = max(end - overlap_lines, start + 1)
+
+    def line_number(index: int) -> int:
+        prefix = lines[index].split('|', 1)[0].strip()
+        return int(prefix) if prefix.isdigit() else index + 1
+
+    windows = []
+    for i, (start, end) in enumerate(spans):
+        owned_start = start if i == 0 else (start + spans[i - 1][1]) // 2
+        owned_end = end if i == len(spans) - 1 else (spans[i + 1][0] + end) // 2
+        windows.append({
+            "text": '\n'.join(lines[start:end]),
+            "first_line": line_number(start),
+            "last_line": line_number(end - 1),
+            "owned_first": line_number(owned_start),
+            "owned_last": line_number(owned_end - 1),
+            "structure": structure.window(start, end) if structure is not None else None
+        })
+    return windows
+
+
+def format_window_scope(window: Dict[str, Any], window_index: int, window_count: int,
+                        total_lines: int) -> str:
+    """Prompt section telling a map-reduce agent which slice of the module it sees."""
+    return '\n'.join([
+        f"# REVIEW WINDOW ({window_index + 1} of {window_count})",
+        f"You are seeing lines {window['first_line']:04d}-{window['last_line']:04d} "
+        f"of a {total_lines}-line module; the other lines are reviewed separately.",
+        "Report only issues visible in these lines and cite the module's own line numbers."
+    ])
+
+
+def to_global_lines(line_numbers: List[int], window: Dict[str, Any]) -> List[int]:
+    """Map a window finding's line numbers onto the module.
+
+    Agents are asked for the module's own numbers; an answer that is entirely outside the
+    window but fits inside its length was counted from the window start and is shifted.
+    """
+    first, last = window["first_line"], window["last_line"]
+    if line_numbers and all(not first <= n <= last for n in line_numbers) and \
+            all(1 <= n <= last - first + 1 for n in line_numbers):
+        return [n + first - 1 for n in line_numbers]
+    return line_numbers
+
+
+def reduce_window_findings(windows: List[Dict[str, Any]],
+                           window_findings: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Combine one agent's per-window findings into a single module-wide review.
+
+    - Line numbers are restored to module-wide numbering (to_global_lines)
+    - Findings outside a window's owned range are dropped (its neighbour reports them)
+    - The same issue (first 50 chars of description) found in several windows becomes one
+      finding, so consensus still counts the agent once per issue
+    """
+    reduced = []
+    first_seen = {}  # description key -> (window index, finding)
+
+    for window_index, (window, findings) in enumerate(zip(windows, window_findings)):
+        for finding in findings:
+            finding["line_numbers"] = to_global_lines(finding["line_numbers"], window)
+            anchor = finding["line_numbers"][0] if finding["line_numbers"] else window["owned_first"]
+            if not window["owned_first"] <= anchor <= window["owned_last"]:
+                continue
+
+            key = finding["issue_description"][:50]
+            if key in first_seen and first_seen[key][0] != window_index:
+                kept = first_seen[key][1]
+                kept["line_numbers"] = sorted(set(kept["line_numbers"]) | set(finding["line_numbers"]))
+                kept["severity"] = max(kept["severity"], finding["severity"])
+                kept["confidence"] = max(kept["confidence"], finding["confidence"])
+                continue
+
+            first_seen.setdefault(key, (window_index, finding))
+            reduced.append(finding)
+
+    return reduced
+
+
+class FindingValidator:
+    """
+    Validates agent output against the OUTPUT FORMAT in build_agent_prompt and repairs it.
+
+    The field rules are compiled once into per-field (check, repair) pairs. Well-formed
+    findings only pay for one type check per field and are returned unchanged; everything
+    else is repaired in place:
+    - a {"issues": [...]} / {"findings": [...]} wrapper or a single object becomes a list
+    - alternate key names ("description", "lines", "fix", ...) are renamed
+    - severity is coerced to an int in 1-5 (numeric strings and words like "major" too)
+    - confidence is coerced to a float in 0-1 (percentages are scaled)
+    - line_numbers becomes a list of ints ("10-12", "0042", "Line 7" or, if missing,
+      the "Line N" references in the description)
+    - category is matched case- and punctuation-insensitively to FINDING_CATEGORIES
+
+    Items that are not objects, have no description, no line numbers or an unknown
+    category are rejected and counted per agent.
+    """
+
+    KEY_ALIASES = {
+        "description": "issue_description", "issue": "issue_description",
+        "lines": "line_numbers", "line": "line_numbers", "line_number": "line_numbers",
+        "quote": "quoted_text", "quoted": "quoted_text",
+        "impact": "student_impact",
+        "fix": "suggested_fix", "suggestion": "suggested_fix"
+    }
+
+    def __init__(self, categories: List[str] = None):
+        self._categories = {self._category_key(c): c for c in (categories or FINDING_CATEGORIES)}
+        self._valid_categories = frozenset(self._categories.values())
+        self._lock = threading.Lock()
+        self.rejected = defaultdict(int)
+        self.repaired = defaultdict(int)
+        self.reject_reasons = defaultdict(int)
+
+        # Compiled field rules: (field, check, repair). check is the cheap well-formed test;
+        # repair returns the fixed value or raises ValueError to reject the finding.
+        self._fields = [
+            ("issue_description", lambda v: type(v) is str and v.strip() != "", self._repair_description),
+            ("line_numbers", lambda v: type(v) is list and all(type(n) is int for n in v) and v != [],
+             self._repair_lines),
+            ("category", lambda v: v in self._valid_categories, self._repair_category),
+            ("severity", lambda v: type(v) is int and 1 <= v <= 5, self._repair_severity),
+            ("confidence", lambda v: type(v) is float and 0.0 <= v <= 1.0, self._repair_confidence),
+            ("quoted_text", lambda v: type(v) is str, self._repair_text),
+            ("student_impact", lambda v: type(v) is str, self._repair_text),
+            ("suggested_fix", lambda v: type(v) is str, self._repair_text),
+        ]
+
+    @staticmethod
+    def _category_key(category: str) -> str:
+        return re.sub(r'[^a-z]', '', category.lower().replace("&", "and"))
+
+    def validate(self, agent_id: str, output: Any) -> List[Dict[str, Any]]:
+        """Valid (possibly repaired) findings from one agent response."""
+        if isinstance(output, dict):
+            output = output.get("issues", output.get("findings", [output]))
+        if not isinstance(output, list):
+            self._count(agent_id, "response is not a list", rejected=1)
+            return []
+
+        valid = []
+        for item in output:
+            if not isinstance(item, dict):
+                self._count(agent_id, "item is not an object", rejected=1)
+                continue
+            try:
+                repaired = self._validate_item(item)
+            except ValueError as e:
+                self._count(agent_id, str(e), rejected=1)
+                continue
+            if repaired:
+                self._count(agent_id, None, repaired=1)
+            valid.append(item)
+        return valid
+
+    def _validate_item(self, item: Dict[str, Any]) -> bool:
+        repaired = False
+        for alias in self.KEY_ALIASES.keys() & item.keys():
+            item.setdefault(self.KEY_ALIASES[alias], item.pop(alias))
+            repaired = True
+
+        for field_name, check, repair in self._fields:
+            value = item.get(field_name)
+            if not check(value):
+                item[field_name] = repair(value, item)
+                repaired = True
+        return repaired
+
+    def _count(self, agent_id: str, reason: Optional[str], rejected: int = 0, repaired: int = 0):
+        with self._lock:
+            self.rejected[agent_id] += rejected
+            self.repaired[agent_id] += repaired
+            if reason:
+                self.reject_reasons[reason] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals and per-agent reject counts (agents with no rejects omitted)."""
+        return {
+            "rejected": sum(self.rejected.values()),
+            "repaired": sum(self.repaired.values()),
+            "rejected_by_agent": {a: n for a, n in sorted(self.rejected.items()) if n},
+            "reject_reasons": dict(self.reject_reasons)
+        }
+
+    @staticmethod
+    def _repair_description(value, item):
+        if value is None or str(value).strip() == "":
+            raise ValueError("missing issue_description")
+        return str(value)
+
+    @staticmethod
+    def _repair_lines(value, item):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers = [int(value)]
+        elif isinstance(value, str):
+            numbers = []
+            for start, end in re.findall(r'(\d+)(?:\s*[-–]\s*(\d+))?', value):
+                if end and int(end) >= int(start) and int(end) - int(start) < 200:
+                    numbers.extend(range(int(start), int(end) + 1))
+                else:
+                    numbers.append(int(start))
+        elif isinstance(value, list):
+            numbers = [int(n) for n in value
+                       if isinstance(n, (int, float)) and not isinstance(n, bool)
+                       or isinstance(n, str) and n.strip().isdigit()]
+        else:
+            numbers = [int(n) for n in re.findall(r'\bLines?\s+(\d+)', item["issue_description"])]
+        if not numbers:
+            raise ValueError("no line numbers")
+        return numbers
+
+    def _repair_category(self, value, item):
+        category = self._categories.get(self._category_key(str(value or "")))
+        if category is None:
+            raise ValueError("unknown category")
+        return category
+
+    @staticmethod
+    def _repair_severity(value, item):
+        if isinstance(value, str):
+            value = SEVERITY_WORDS.get(value.strip().lower(), value)
+        try:
+            severity = int(round(float(value)))
+        except (TypeError, ValueError):
+            severity = 3
+        return min(5, max(1, severity))
+
+    @staticmethod
+    def _repair_confidence(value, item):
+        try:
+            confidence = float(str(value).rstrip("%")) if isinstance(value, str) else float(value)
+        except (TypeError, ValueError):
+            return 0.5
+        if 1.0 < confidence <= 100.0:
+            confidence /= 100.0
+        return min(1.0, max(0.0, confidence))
+
+    @staticmethod
+    def _repair_text(value, item):
+        return "" if value is None else str(value)
+
+
+# Shared by every agent call so reject counts cover the whole run
+FINDING_VALIDATOR = FindingValidator()
+
+
+def review_prompt(agent_id: str, prompt: str,
+                  structure: Optional[ModuleStructure] = None) -> List[Dict[str, Any]]:
+    """One agent call, with its output passed through FINDING_VALIDATOR."""
+    return FINDING_VALIDATOR.validate(agent_id, simulate_agent_review(agent_id, prompt, structure))
+
+
+def run_agent_review(agent: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Run one roster agent, over the whole module or map-reduced over its windows.
+
+    Windows are reviewed in parallel (map), then merged by reduce_window_findings.
+    """
+    windows = agent.get("windows")
+    if not windows:
+        return review_prompt(agent["agent_id"], agent["prompt"], agent.get("structure"))
+
+    with ThreadPoolExecutor(max_workers=len(windows)) as pool:
+        window_findings = list(pool.map(
+            lambda window: review_prompt(agent["agent_id"], window["prompt"], window.get("structure")),
+            windows
+        ))
+    return reduce_window_findings(windows, window_findings)
+
+
+def build_agent_roster(exemplar_anchors: str, master_prompt: str, authoring_prompt: str,
+                       style_prompt: str, module_text: str,
+                       known_issues: str = "",
+                       windows: List[Dict[str, Any]] = None,
+                       structure: Optional[ModuleStructure] = None) -> List[Dict[str, Any]]:
+    """
+    Build the 30-agent roster (authoring agents first, then style agents).
+
+    Each entry holds agent_id, agent_type, competency, focus, the fully built prompt and
+    the module structure (from extract_text_from_module). known_issues (from format_known_issues) is added to every prompt. With windows (from
+    split_module_windows), each entry instead holds one prompt per window under "windows"
+    and "prompt" is None.
+    """
+    roster = []
+    guide_prompts = {"authoring": authoring_prompt, "style": style_prompt}
+
+    for agent_type in ("authoring", "style"):
+        config = AGENT_CONFIG[agent_type]
+        prefix = agent_type.capitalize()
+
+        for i in range(config["total"]):
+            if i < config["rubric_focused"]:
+                # Rubric-focused agent
+                competency = config["competencies"][i % len(config["competencies"])]
+                rubric_file = f"{agent_type}_{competency.lower().replace(' ', '_')}.xml"
+                try:
+                    rubric_content = load_rubric_file(rubric_file)
+                except FileNotFoundError:
+                    rubric_content = ""
+
+                agent_id = f"{prefix}-Specialist-{competency.replace(' ', '')}-{i+1}"
+                focus = f"Specialist: {competency}"
+            else:
+                # Generalist agent
+                competency = None
+                rubric_content = ""
+                agent_id = f"{prefix}-Generalist-{i+1}"
+                focus = "Generalist (Cross-Cutting)"
+
+            entry = {
+                "agent_id": agent_id,
+                "agent_type": agent_type,
+                "competency": competency,
+                "focus": focus,
+                "prompt": None,
+                "structure": structure
+            }
+            if windows:
+                total_lines = module_text.count('\n') + 1
+                entry["windows"] = [
+                    {**window, "prompt": build_agent_prompt(
+                        agent_type, focus, exemplar_anchors, master_prompt,
+                        guide_prompts[agent_type], rubric_content, window["text"], known_issues,
+                        format_window_scope(window, index, len(windows), total_lines))}
+                    for index, window in enumerate(windows)
+                ]
+            else:
+                entry["prompt"] = build_agent_prompt(agent_type, focus, exemplar_anchors, master_prompt,
+                                                     guide_prompts[agent_type], rubric_content,
+                                                     module_text, known_issues)
+
+            roster.append(entry)
+
+    return roster
+
+
+def interleave_roster(roster: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reorder the roster round-robin across strata (authoring/style × specialist/generalist).
+
+    Any prefix of the result is a stratified sample of the ensemble, so early waves see
+    every kind of agent in roughly the full-ensemble proportions.
+    """
+    strata = defaultdict(list)
+    for agent in roster:
+        kind = "specialist" if agent["competency"] else "generalist"
+        strata[(agent["agent_type"], kind)].append(agent)
+
+    # Draw from each stratum at a rate proportional to its size
+    ordered = []
+    taken = defaultdict(int)
+    total = len(roster)
+    while len(ordered) < total:
+        key = min(
+            (k for k in strata if taken[k] < len(strata[k])),
+            key=lambda k: ((taken[k] + 0.5) / len(strata[k]), list(strata).index(k))
+        )
+        ordered.append(strata[key][taken[key]])
+        taken[key] += 1
+
+    return ordered
+
+
+def prioritize_roster(roster: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Order the roster so high-value agents run first (see SCHEDULING_PRIORITY).
+
+    Generalists follow all specialists, alternating authoring and style.
+    """
+    def rank(indexed_agent):
+        index, agent = indexed_agent
+        if agent["competency"]:
+            return (0, SCHEDULING_PRIORITY.index(agent["competency"]), index)
+        return (1, 0, index)
+
+    specialists = [a for _, a in sorted(enumerate(roster), key=rank) if a["competency"]]
+    generalists = {agent_type: [a for a in roster if not a["competency"] and a["agent_type"] == agent_type]
+                   for agent_type in ("authoring", "style")}
+
+    ordered = list(specialists)
+    for pair in zip(generalists["authoring"], generalists["style"]):
+        ordered.extend(pair)
+    shorter = min(len(g) for g in generalists.values())
+    for group in generalists.values():
+        ordered.extend(group[shorter:])
+
+    return ordered
+
+
+class ProgressiveReport:
+    """
+    Rewrites the JSON/HTML report as agents finish so authors can act before the run completes.
+
+    Partial reports use the counts observed so far (no projection) and auto-refresh in the
+    browser until the final report replaces them. The report is rewritten every update_every
+    agents (default: PROGRESSIVE_UPDATES times per run) and once all agents are done; issues
+    at or above alert_severity are printed at the first update that surfaces them.
+    """
+
+    def __init__(self, output_path: Path, module_xml: str, total_agents: int,
+                 update_every: Optional[int] = None, alert_severity: int = 5):
+        self.output_path = output_path
+        self.module_xml = module_xml
+        self.total_agents = total_agents
+        self.update_every = max(1, update_every or total_agents // PROGRESSIVE_UPDATES)
+        self.alert_severity = alert_severity
+        self.alerted = set()
+        self.updates = 0
+
+    def update(self, all_findings: List[Dict[str, Any]], agents_run: int):
+        """Aggregate the findings so far and rewrite the partial report."""
+        if agents_run % self.update_every and agents_run < self.total_agents:
+            return
+
+        consensus_issues, non_consensus = aggregate_consensus_issues(all_findings, self.total_agents)
+
+        for issue in consensus_issues + non_consensus:
+            key = issue["issue_description"][:50]
+            if issue["severity"] >= self.alert_severity and key not in self.alerted:
+                self.alerted.add(key)
+                print(f"  ⚠ Severity {issue['severity']} after {agents_run} agents: "
+                      f"{issue['issue_description']}")
+
+        run_stats = {
+            "agents_run": agents_run,
+            "total_agents": self.total_agents,
+            "in_progress": True
+        }
+        write_review_outputs(self.output_path, consensus_issues, non_consensus, all_findings,
+                             self.module_xml, run_stats, scheduled=True)
+        self.updates += 1
+
+
+# run_stats entries describing how much of the ensemble ran (see run_sequential_consensus)
+ENSEMBLE_STATS = ("agents_run", "total_agents", "waves", "wave_size", "confidence",
+                  "stopped_early", "in_progress")
+
+
+def write_review_outputs(output_path: Path, consensus_issues: List[Dict[str, Any]],
+                         non_consensus: List[Dict[str, Any]], all_findings: List[Dict[str, Any]],
+                         module_xml: str, run_stats: Dict[str, Any],
+                         scheduled: bool = False) -> Tuple[Path, Path]:
+    """
+    Write the HTML report and JSON data files.
+
+    The JSON records how many agents ran, and whether the report is partial, only for
+    scheduled runs (early stopping or progressive reports); a full ensemble run keeps
+    the original layout plus any diagnostics in run_stats.
+
+    Files are written to a temporary name and renamed so a browser or script polling a
+    partial report never reads a half-written file.
+
+    Returns:
+        (html_path, json_path)
+    """
+    html_report = generate_html_report(consensus_issues, non_consensus, all_findings, AGENT_CONFIG, module_xml,
+                                       run_stats)
+    html_file = output_path / "test_module_review_report_generic.html"
+    _write_atomic(html_file, html_report)
+
+    json_data = {
+        "timestamp": datetime.now().isoformat(),
+        "total_agents": run_stats["total_agents"]
+    }
+    if scheduled:
+        json_data["agents_run"] = run_stats["agents_run"]
+        json_data["status"] = "partial" if run_stats.get("in_progress") else "complete"
+    else:
+        run_stats = {key: value for key, value in run_stats.items() if key not in ENSEMBLE_STATS}
+    if run_stats:
+        json_data["run_stats"] = run_stats
+    json_data.update({
+        "consensus_issues_count": len(consensus_issues),
+        "non_consensus_issues_count": len(non_consensus),
+        "consensus_issues": consensus_issues,
+        "non_consensus_issues": non_consensus,
+        "all_findings": all_findings
+    })
+    json_file = output_path / "test_module_review_data_generic.json"
+    _write_atomic(json_file, json.dumps(json_data, indent=2))
+
+    return html_file, json_file
+
+
+def _write_atomic(path: Path, text: str):
+    """Write text to path via a temporary file and rename."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    tmp_path.replace(path)
+
+
+def run_sequential_consensus(roster: List[Dict[str, Any]], wave_size: int = 6,
+                             confidence: float = 0.95,
+                             min_agents: int = None,
+                             on_agent_done=None,
+                             initial_findings: List[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Run the agent ensemble in waves and stop once every issue's outcome is settled.
+
+    After each wave, the share of agents that flagged each candidate issue is turned into a
+    Wilson confidence interval projected to the full ensemble. When the low and high ends of
+    every interval give the same priority and consensus classification, more agents cannot
+    change the report (at that confidence), so the remaining agents are skipped.
+
+    Args:
+        roster: Agents from build_agent_roster
+        wave_size: Agents run between stability checks
+        confidence: Confidence level for the per-issue intervals
+        min_agents: Never stop before this many agents (default: two waves)
+        on_agent_done: Optional callback(all_findings, agents_run) after each agent
+        initial_findings: Findings already known before any agent runs (rule triage hits)
+
+    Returns:
+        (all_findings, run_stats)
+    """
+    total_agents = len(roster)
+    if min_agents is None:
+        min_agents = 2 * wave_size
+    z = z_for_confidence(confidence)
+
+    ordered = interleave_roster(roster)
+    all_findings = list(initial_findings or [])
+    agents_run = 0
+    waves = 0
+    stopped_early = False
+
+    while agents_run < total_agents:
+        wave = ordered[agents_run:agents_run + wave_size]
+        waves += 1
+        print(f"WAVE {waves} ({len(wave)} agents):")
+        for agent in wave:
+            findings = run_agent_review(agent)
+            all_findings.extend(findings)
+            agents_run += 1
+            print(f"  ✓ {agent['agent_id']}: {len(findings)} findings")
+            if on_agent_done:
+                on_agent_done(all_findings, agents_run)
+
+        if agents_run >= total_agents or agents_run < min_agents:
+            continue
+
+        # Stability check: would any candidate issue's priority or consensus status
+        # differ between the low and high ends of its projected agent count?
+        issue_groups = group_findings_by_issue(consolidate_duplicate_issues(all_findings))
+        unsettled = 0
+        for group in issue_groups.values():
+            if is_rule_detected(group):
+                continue  # Settled by the deterministic check
+            max_severity = max(f["severity"] for f in group)
+            low, high = projected_count_bounds(len(group), agents_run, total_agents, z)
+            if consensus_outcome(low, max_severity) != consensus_outcome(high, max_severity):
+                unsettled += 1
+
+        print(f"  → {len(issue_groups)} candidate issues, {unsettled} not yet settled")
+        if unsettled == 0:
+            stopped_early = True
+            print(f"  ⏹ Consensus stable at {confidence:.0%} confidence — "
+                  f"skipping {total_agents - agents_run} remaining agents")
+            break
+
+    run_stats = {
+        "agents_run": agents_run,
+        "total_agents": total_agents,
+        "waves": waves,
+        "wave_size": wave_size,
+        "confidence": confidence,
+        "stopped_early": stopped_early
+    }
+    return all_findings, run_stats
+
+
 def consolidate_duplicate_issues(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Consolidate duplicate issues that refer to the same problem WITHIN A SINGLE AGENT.
@@ -1296,28 +2718,106 @@ def consolidate_duplicate_issues(findings: List[Dict[str, Any]]) -> List[Dict[st
     return consolidated
 
 
+def group_findings_by_issue(findings: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group consolidated findings that describe the same issue (first 50 chars of description)."""
+    issue_groups = defaultdict(list)
+
+    for finding in findings:
+        # Simple similarity: group by first 50 chars of description
+        key = finding["issue_description"][:50]
+        issue_groups[key].append(finding)
+
+    return issue_groups
+
+
+def is_rule_detected(group: List[Dict[str, Any]]) -> bool:
+    """Whether a group of findings includes a deterministic rule triage hit."""
+    return any(f.get("source") == "rule" for f in group)
+
+
+def consensus_tier(agent_count: float) -> int:
+    """Priority adjustment for the number of agents (out of 30) that flagged an issue."""
+    if agent_count >= 20:      # Very High consensus (67%+)
+        return 0
+    elif agent_count >= 12:    # High consensus (40-66%)
+        return -1
+    elif agent_count >= 8:     # Medium consensus (27-39%)
+        return -2
+    elif agent_count >= 4:     # Low consensus (13-26%)
+        return -3
+    else:                      # Below threshold
+        return -4
+
+
+def consensus_outcome(agent_count: float, max_severity: int) -> Tuple[int, bool]:
+    """
+    Report-visible outcome of an issue: (priority on 1–5 scale, is_consensus).
+
+    Consensus threshold: at least 4 agents OR severity 5.
+    Rationale: encourage more non-consensus (flagged) issues to surface.
+    """
+    priority = max(1, min(5, max_severity + consensus_tier(agent_count)))  # Clamp to [1, 5]
+    return priority, agent_count >= 4 or max_severity == 5
+
+
+def z_for_confidence(confidence: float) -> float:
+    """Two-sided normal critical value for a confidence level (0.95 -> 1.96)."""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def projected_count_bounds(flagged: int, agents_run: int, total_agents: int,
+                           z: float) -> Tuple[float, float]:
+    """
+    Bounds on how many of the full ensemble will flag an issue, given a partial run.
+
+    The agents already run are known exactly; the rate at which the remaining agents flag
+    the issue is bounded by the Wilson score interval of the observed share.
+
+    Returns:
+        (low, high) projected agent counts out of total_agents
+    """
+    remaining = total_agents - agents_run
+    if agents_run <= 0:
+        return 0.0, float(total_agents)
+
+    p = min(flagged, agents_run) / agents_run
+    denom = 1 + z * z / agents_run
+    centre = (p + z * z / (2 * agents_run)) / denom
+    margin = z * math.sqrt(p * (1 - p) / agents_run + z * z / (4 * agents_run * agents_run)) / denom
+    return (flagged + max(0.0, centre - margin) * remaining,
+            flagged + min(1.0, centre + margin) * remaining)
+
+
 def aggregate_consensus_issues(all_findings: List[Dict[str, Any]],
-                                total_agents: int) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+                                total_agents: int,
+                                agents_run: int = None,
+                                confidence: float = 0.95) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Aggregate individual agent findings into consensus issues and non-consensus flagged issues.
 
     Issues flagged by multiple agents get higher confidence.
     Similar issues are grouped together.
 
+    If the ensemble was stopped early (agents_run < total_agents), counts are projected to
+    the full ensemble before tiering, and each issue records its projected count and
+    confidence bounds.
+
+    Issues found by rule triage are deterministic, so they are consensus issues at their
+    full severity regardless of how many agents repeated them; agent_count then counts
+    only the agents.
+
     Returns:
         (consensus_issues, non_consensus_issues)
     """
+    agents_run = agents_run or total_agents
+    stopped_early = agents_run < total_agents
+    z = z_for_confidence(confidence)
 
     # STEP 1: Consolidate duplicate issues (same line, same category, similar text)
     consolidated_findings = consolidate_duplicate_issues(all_findings)
 
     # STEP 2: Group similar issues by description similarity
-    issue_groups = defaultdict(list)
-
-    for finding in consolidated_findings:
-        # Simple similarity: group by first 50 chars of description
-        key = finding["issue_description"][:50]
-        issue_groups[key].append(finding)
+    issue_groups = group_findings_by_issue(consolidated_findings)
 
     consensus_issues = []
     non_consensus_issues = []
@@ -1327,8 +2827,9 @@ def aggregate_consensus_issues(all_findings: List[Dict[str, Any]],
         representative = max(grouped_findings, key=lambda x: x["confidence"])
 
         # Calculate consensus metrics
-        agent_count = len(grouped_findings)
-        avg_confidence = sum(f["confidence"] for f in grouped_findings) / agent_count
+        rule_detected = is_rule_detected(grouped_findings)
+        agent_count = sum(1 for f in grouped_findings if f.get("source") != "rule")
+        avg_confidence = sum(f["confidence"] for f in grouped_findings) / len(grouped_findings)
         max_severity = max(f["severity"] for f in grouped_findings)
 
         # Analyze agent breakdown: authoring vs style, rubric vs generalist
@@ -1354,23 +2855,16 @@ def aggregate_consensus_issues(all_findings: List[Dict[str, Any]],
         style_count = len(style_rubric) + len(style_generalist)
 
         # Consensus percentage
-        consensus_pct = (agent_count / total_agents)
+        consensus_pct = (agent_count / agents_run)
+
+        # Project to the full ensemble when agents were stopped early
+        effective_count = agent_count * total_agents / agents_run
 
         # Priority (1–5 scale): Consensus Tier System
         # High severity + high consensus = high priority
-        if agent_count >= 20:      # Very High consensus (67%+)
-            consensus_tier = 0
-        elif agent_count >= 12:    # High consensus (40-66%)
-            consensus_tier = -1
-        elif agent_count >= 8:     # Medium consensus (27-39%)
-            consensus_tier = -2
-        elif agent_count >= 4:     # Low consensus (13-26%)
-            consensus_tier = -3
-        else:                      # Below threshold
-            consensus_tier = -4
-
-        priority = max_severity + consensus_tier
-        priority = max(1, min(5, priority))  # Clamp to [1, 5]
+        priority, is_consensus = consensus_outcome(effective_count, max_severity)
+        if rule_detected:
+            priority, is_consensus = consensus_outcome(total_agents, max_severity)
 
         issue = {
             "priority": priority,
@@ -1401,9 +2895,15 @@ def aggregate_consensus_issues(all_findings: List[Dict[str, Any]],
             }
         }
 
-        # Consensus threshold: at least 4 agents OR severity 5
-        # Rationale: encourage more non-consensus (flagged) issues to surface
-        if agent_count >= 4 or max_severity == 5:
+        if rule_detected:
+            issue["detected_by"] = "rule"
+
+        if stopped_early and not rule_detected:
+            low, high = projected_count_bounds(agent_count, agents_run, total_agents, z)
+            issue["projected_agent_count"] = round(effective_count, 1)
+            issue["agent_count_bounds"] = [round(low, 1), round(high, 1)]
+
+        if is_consensus:
             consensus_issues.append(issue)
         else:
             # Single/dual/tri-agent findings go to non-consensus flagged issues
@@ -1420,10 +2920,14 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
                          non_consensus_issues: List[Dict[str, Any]],
                          all_findings: List[Dict[str, Any]],
                          agent_config: Dict[str, Any],
-                         module_content: str) -> str:
+                         module_content: str,
+                         run_stats: Dict[str, Any] = None) -> str:
     """
     Generate comprehensive HTML report with 10-tab interface.
 
+    run_stats (from run_sequential_consensus) records how many agents actually ran
+    when the ensemble was stopped early.
+
     Tabs:
     1. Overview - Summary statistics and priority distribution
     2. Consensus Issues - Issues with 4+ agent agreement
@@ -1438,6 +2942,19 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
     """
 
     total_agents = agent_config["authoring"]["total"] + agent_config["style"]["total"]
+    agents_run = run_stats["agents_run"] if run_stats else total_agents
+    in_progress = bool(run_stats and run_stats.get("in_progress"))
+    refresh_tag = '<meta http-equiv="refresh" content="5">' if in_progress else ''
+    if in_progress:
+        agents_value = f"{agents_run}/{total_agents}"
+        agents_description = "Review in progress — this page refreshes as agents finish"
+    elif agents_run < total_agents:
+        agents_value = f"{agents_run}/{total_agents}"
+        agents_description = (f"Stopped early after {run_stats['waves']} waves: "
+                              f"consensus stable at {run_stats['confidence']:.0%} confidence")
+    else:
+        agents_value = f"{total_agents}"
+        agents_description = "15 Authoring + 15 Style Agents"
     num_consensus = len(consensus_issues)
     num_flagged = len(non_consensus_issues)
 
@@ -1522,7 +3039,7 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
 
     # extract_text_from_module() ALREADY returns numbered text (0001| ..., 0002| ..., etc.)
     # So we just use it directly - don't number again!
-    extracted_text_with_numbers = extract_text_from_module(module_content)
+    extracted_text_with_numbers, _ = extract_text_from_module(module_content)
 
     # Split into lines and format for HTML display with LaTeX preservation
     text_lines = extracted_text_with_numbers.split('\n')
@@ -1570,7 +3087,7 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">{refresh_tag}
     <title>LEARNVIA Content Review Report</title>
 
     <!-- MathJax for LaTeX rendering -->
@@ -2019,8 +3536,8 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
             <div class="stat-grid">
                 <div class="stat-card">
                     <h3>Total Agents</h3>
-                    <div class="value">{total_agents}</div>
-                    <div class="description">15 Authoring + 15 Style Agents</div>
+                    <div class="value">{agents_value}</div>
+                    <div class="description">{agents_description}</div>
                 </div>
 
                 <div class="stat-card">
@@ -2120,7 +3637,7 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
             <h2>Consensus Issues</h2>
             <p>Issues identified by 4 or more agents, indicating high confidence in the finding.</p>
 
-            {_format_issues_html(consensus_issues, total_agents, show_all=False, max_issues=50)}
+            {_format_issues_html(consensus_issues, agents_run, show_all=False, max_issues=50)}
 
             {f'<p style="text-align: center; color: #6c757d; margin-top: 30px;"><em>Showing {min(50, len(consensus_issues))} of {len(consensus_issues)} consensus issues</em></p>' if len(consensus_issues) > 50 else ''}
 
@@ -2165,7 +3682,7 @@ def generate_html_report(consensus_issues: List[Dict[str, Any]],
             <h2>Flagged Issues</h2>
             <p>Issues identified by 1-3 agents. These may require manual review to determine validity.</p>
 
-            {_format_issues_html(non_consensus_issues, total_agents, show_all=False, max_issues=30)}
+            {_format_issues_html(non_consensus_issues, agents_run, show_all=False, max_issues=30)}
 
             {f'<p style="text-align: center; color: #6c757d; margin-top: 30px;"><em>Showing {min(30, len(non_consensus_issues))} of {len(non_consensus_issues)} flagged issues</em></p>' if len(non_consensus_issues) > 30 else ''}
         </div>
@@ -2458,6 +3975,13 @@ def _format_issues_html(issues: List[Dict[str, Any]], total_agents: int,
         quoted_text = issue.get('quoted_text', '')
         quoted_preview = escape_preserve_latex(quoted_text[:300]) + ('...' if len(quoted_text) > 300 else '')
 
+        projection = ""
+        if "agent_count_bounds" in issue:
+            low, high = issue["agent_count_bounds"]
+            projection = f"(projected {issue['projected_agent_count']}, range {low}–{high} of 30) "
+
+        rule_check = "<strong>Rule check</strong> + " if issue.get("detected_by") == "rule" else ""
+
         html += f"""
         <div class="issue-card">
             <div class="issue-header">
@@ -2465,7 +3989,7 @@ def _format_issues_html(issues: List[Dict[str, Any]], total_agents: int,
                 <span class="badge severity-{issue['severity']}">Severity {issue['severity']}</span>
                 <span class="badge category-badge">{issue['category']}</span>
                 <span class="consensus-meter" style="font-size: 0.8em;">
-                    <strong>{issue['agent_count']}/{total_agents}</strong> agents -
+                    {rule_check}<strong>{issue['agent_count']}/{total_agents}</strong> agents {projection}-
                     {issue['agent_breakdown']['authoring']['total']}/15 authoring
                     ({issue['agent_breakdown']['authoring']['rubric']}/9 rubric,
                     {issue['agent_breakdown']['authoring']['generalist']}/6 generalist),
@@ -2620,18 +4144,39 @@ def _format_top_issues_list(issues: List[Dict[str, Any]]) -> str:
 
 def main():
     """Main execution function."""
-    global TEST_MODULE_PATH, OUTPUT_PATH
+    global TEST_MODULE_PATH, OUTPUT_PATH, MODULE_ORDER
 
     # Parse command-line arguments
-    if len(sys.argv) != 3:
-        print("Usage: python run_review.py <module_folder> <xml_file>")
-        print("\nExample:")
-        print("  python run_review.py Power_Series power_series_original.xml")
-        print("  python run_review.py Fund_Thm_of_Calculus module_5_6.xml")
-        sys.exit(1)
-
-    module_folder = sys.argv[1]
-    xml_file = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Run the 30-agent content review on a module XML file.",
+        epilog="Example: python run_review.py Power_Series power_series_original.xml"
+    )
+    parser.add_argument("module_folder", help="Module folder under Testing/")
+    parser.add_argument("xml_file", help="Module XML file inside the folder")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="Run agents in waves and stop once consensus is stable")
+    parser.add_argument("--wave-size", type=int, default=6,
+                        help="Agents per wave with --early-stop (default: 6)")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="Confidence level for early stopping (default: 0.95)")
+    parser.add_argument("--progressive", action="store_true",
+                        help="Run high-value agents first and rewrite the report as agents finish")
+    parser.add_argument("--update-every", type=int, default=None,
+                        help="Agents between partial report updates with --progressive "
+                             f"(default: {PROGRESSIVE_UPDATES} updates per run)")
+    parser.add_argument("--alert-severity", type=int, default=5,
+                        help="Print newly found issues at or above this severity (default: 5)")
+    parser.add_argument("--rule-first", action="store_true",
+                        help="Run deterministic detectors first and tell agents to report only new issues")
+    parser.add_argument("--map-reduce", action="store_true",
+                        help="Review the module in overlapping windows even if it fits in one prompt")
+    parser.add_argument("--context-chars", type=int, default=MODEL_CONTEXT_CHARS,
+                        help="Agent prompt budget in characters; larger modules are map-reduced "
+                             f"(default: {MODEL_CONTEXT_CHARS})")
+    args = parser.parse_args()
+
+    module_folder = args.module_folder
+    xml_file = args.xml_file
 
     # Set paths based on arguments
     MODULE_PATH = TESTING_PATH / module_folder
@@ -2674,10 +4219,19 @@ def main():
 
     # Extract text IN-MEMORY ONLY for pattern detection
     # This is TRANSIENT - never saved to disk
-    module_text = extract_text_from_module(module_xml)
+    module_text, module_structure = extract_text_from_module(module_xml)
     print(f"✓ Module XML loaded: {len(module_xml)} chars")
     print(f"✓ Extracted text for analysis: {len(module_text)} chars (transient, in-memory only)")
-    print()
+
+    # Terms defined by earlier modules of the course are known prerequisites
+    # (only detect_missing_definitions reads the glossary: skip the course scan without it)
+    MODULE_ORDER = module_order(module_xml, TEST_MODULE_PATH)
+    if any(rule.detector == "detect_missing_definitions" and rule.enabled for rule in load_detection_rules()):
+        rescanned = COURSE_GLOSSARY.refresh()
+        position = '.'.join(map(str, MODULE_ORDER)) if MODULE_ORDER else "unknown"
+        print(f"✓ Course glossary: {len(COURSE_GLOSSARY.first_defined)} terms from {len(COURSE_GLOSSARY.modules)} "
+              f"modules ({rescanned} rescanned); course position of this module: {position}")
+        print()
 
     # Create output directory
     try:
@@ -2685,71 +4239,116 @@ def main():
     except Exception:
         pass
 
-    # Simulate 30 agent reviews
-    print("Simulating 30 agent reviews with GENERIC RULES...")
-    print()
-
-    all_findings = []
-
-    # Authoring agents
-    print("AUTHORING AGENTS (15 total):")
-    for i in range(AGENT_CONFIG["authoring"]["total"]):
-        if i < AGENT_CONFIG["authoring"]["rubric_focused"]:
-            # Rubric-focused agent
-            competency = AGENT_CONFIG["authoring"]["competencies"][i % len(AGENT_CONFIG["authoring"]["competencies"])]
-            rubric_file = f"authoring_{competency.lower().replace(' ', '_')}.xml"
-            try:
-                rubric_content = load_rubric_file(rubric_file)
-            except FileNotFoundError:
-                rubric_content = ""
-
-            agent_id = f"Authoring-Specialist-{competency.replace(' ', '')}-{i+1}"
-            agent_type = "authoring"
-            focus = f"Specialist: {competency}"
-        else:
-            # Generalist agent
-            rubric_content = ""
-            agent_id = f"Authoring-Generalist-{i+1}"
-            agent_type = "authoring"
-            focus = "Generalist (Cross-Cutting)"
-
-        prompt = build_agent_prompt(agent_type, focus, exemplar_anchors, master_prompt, authoring_prompt,
-                                     rubric_content, module_text)
+    rule_hits = []
+    if args.rule_first:
+        rule_hits = run_rule_triage(module_text, module_structure)
+        print(f"Rule triage: {len(rule_hits)} deterministic hits marked as known in agent prompts")
+        print()
+
+    known_issues = format_known_issues(rule_hits)
+    roster = build_agent_roster(exemplar_anchors, master_prompt, authoring_prompt, style_prompt,
+                                module_text, known_issues, structure=module_structure)
+
+    # Map-reduce when the largest prompt (plus room for findings) exceeds the budget
+    windows = None
+    largest_prompt = max(len(agent["prompt"]) for agent in roster)
+    if args.map_reduce or largest_prompt + OUTPUT_RESERVE_CHARS > args.context_chars:
+        window_chars = args.context_chars - OUTPUT_RESERVE_CHARS - (largest_prompt - len(module_text))
+        if window_chars < MIN_WINDOW_CHARS:
+            print(f"Error: --context-chars {args.context_chars} leaves only {window_chars} chars "
+                  f"for the module (need {MIN_WINDOW_CHARS})")
+            sys.exit(1)
+        windows = split_module_windows(module_text, window_chars, structure=module_structure)
+        roster = build_agent_roster(exemplar_anchors, master_prompt, authoring_prompt, style_prompt,
+                                    module_text, known_issues, windows, module_structure)
+        if largest_prompt + OUTPUT_RESERVE_CHARS > args.context_chars:
+            print(f"Largest agent prompt ({largest_prompt:,} chars + {OUTPUT_RESERVE_CHARS:,} for findings) "
+                  f"exceeds the {args.context_chars:,}-char budget")
+        print(f"Map-reduce: {len(windows)} windows of up to {window_chars:,} chars "
+              f"({WINDOW_OVERLAP_LINES}-line overlap) per agent")
+        print()
+
+    progress = None
+    if args.progressive:
+        progress = ProgressiveReport(OUTPUT_PATH, module_xml, len(roster),
+                                     args.update_every, args.alert_severity)
+        print(f"Progressive report: {OUTPUT_PATH / 'test_module_review_report_generic.html'}")
+
+    if args.early_stop:
+        # Waves keep the stratified order so projected counts stay unbiased
+        print(f"Simulating up to {len(roster)} agent reviews in waves of {args.wave_size} "
+              f"(early stop at {args.confidence:.0%} confidence)...")
+        print()
+        all_findings, run_stats = run_sequential_consensus(
+            roster, args.wave_size, args.confidence,
+            on_agent_done=progress.update if progress else None,
+            initial_findings=rule_hits
+        )
+    elif args.progressive:
+        print(f"Simulating {len(roster)} agent reviews in priority order...")
+        print()
+
+        all_findings = list(rule_hits)
+        for agents_run, agent in enumerate(prioritize_roster(roster), start=1):
+            findings = run_agent_review(agent)
+            all_findings.extend(findings)
+
+            print(f"  ✓ {agent['agent_id']}: {len(findings)} findings")
+            progress.update(all_findings, agents_run)
+
+        run_stats = {
+            "agents_run": len(roster),
+            "total_agents": len(roster),
+            "stopped_early": False
+        }
+    else:
+        # Simulate 30 agent reviews
+        print("Simulating 30 agent reviews with GENERIC RULES...")
+        print()
+
+        all_findings = list(rule_hits)
+        current_type = None
+        for agent in roster:
+            if agent["agent_type"] != current_type:
+                if current_type is not None:
+                    print()
+                current_type = agent["agent_type"]
+                print(f"{current_type.upper()} AGENTS ({AGENT_CONFIG[current_type]['total']} total):")
+
+            findings = run_agent_review(agent)
+            all_findings.extend(findings)
+
+            print(f"  ✓ {agent['agent_id']}: {len(findings)} findings")
+
+        run_stats = {
+            "agents_run": len(roster),
+            "total_agents": len(roster),
+            "stopped_early": False
+        }
 
-        findings = simulate_agent_review(agent_id, prompt)
-        all_findings.extend(findings)
+    if windows:
+        run_stats["map_reduce_windows"] = len(windows)
 
-        print(f"  ✓ {agent_id}: {len(findings)} findings")
+    validation = FINDING_VALIDATOR.stats()
+    if validation["rejected"] or validation["repaired"]:
+        run_stats["finding_validation"] = validation
+        print()
+        print(f"Finding validation: {validation['repaired']} repaired, {validation['rejected']} rejected")
+        for agent_id, count in validation["rejected_by_agent"].items():
+            print(f"  ✗ {agent_id}: {count} rejected")
 
+    detectors = DETECTOR_PROFILE.stats()
+    run_stats["detectors"] = detectors
     print()
-    print("STYLE AGENTS (15 total):")
-    for i in range(AGENT_CONFIG["style"]["total"]):
-        if i < AGENT_CONFIG["style"]["rubric_focused"]:
-            # Rubric-focused agent
-            competency = AGENT_CONFIG["style"]["competencies"][i % len(AGENT_CONFIG["style"]["competencies"])]
-            rubric_file = f"style_{competency.lower().replace(' ', '_')}.xml"
-            try:
-                rubric_content = load_rubric_file(rubric_file)
-            except FileNotFoundError:
-                rubric_content = ""
+    print(f"Detectors: {detectors['analysis_seconds'] * 1000:.1f} ms shared line analysis "
+          f"over {detectors['modules']} module text(s); slowest rules:")
+    for rule in detectors["rules"][:3]:
+        print(f"  {rule['rule']} ({rule['cost']}): {rule['seconds'] * 1000:.1f} ms, "
+              f"{rule['lines_scanned']} lines, {rule['hits']} hits")
 
-            agent_id = f"Style-Specialist-{competency.replace(' ', '')}-{i+1}"
-            agent_type = "style"
-            focus = f"Specialist: {competency}"
-        else:
-            # Generalist agent
-            rubric_content = ""
-            agent_id = f"Style-Generalist-{i+1}"
-            agent_type = "style"
-            focus = f"Generalist (Cross-Cutting)"
-
-        prompt = build_agent_prompt(agent_type, focus, exemplar_anchors, master_prompt, style_prompt,
-                                     rubric_content, module_text)
-
-        findings = simulate_agent_review(agent_id, prompt)
-        all_findings.extend(findings)
-
-        print(f"  ✓ {agent_id}: {len(findings)} findings")
+    if args.rule_first:
+        run_stats["rule_hits"] = len(rule_hits)
+        run_stats["agent_findings"] = len(all_findings) - len(rule_hits)
 
     print()
     print("=" * 80)
@@ -2758,36 +4357,25 @@ def main():
 
     # Aggregate consensus issues
     print("Aggregating consensus issues...")
-    consensus_issues, non_consensus = aggregate_consensus_issues(all_findings, 30)
+    consensus_issues, non_consensus = aggregate_consensus_issues(
+        all_findings, run_stats["total_agents"], run_stats["agents_run"], args.confidence
+    )
+    if run_stats["stopped_early"]:
+        print(f"✓ Agents run: {run_stats['agents_run']}/{run_stats['total_agents']} "
+              f"(counts projected to {run_stats['total_agents']})")
     print(f"✓ Consensus issues identified: {len(consensus_issues)}")
     print(f"✓ Non-consensus flagged issues: {len(non_consensus)}")
     print()
 
-    # Generate HTML report
+    # Generate HTML report and JSON data for further analysis
     print("Generating HTML report...")
     # Pass the ORIGINAL XML to the HTML report (will be displayed in "Original Input" tab)
-    html_report = generate_html_report(consensus_issues, non_consensus, all_findings, AGENT_CONFIG, module_xml)
-
-    output_file = OUTPUT_PATH / "test_module_review_report_generic.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_report)
+    output_file, json_output = write_review_outputs(OUTPUT_PATH, consensus_issues, non_consensus,
+                                                    all_findings, module_xml, run_stats,
+                                                    scheduled=args.early_stop or args.progressive)
 
     print(f"✓ Report saved: {output_file}")
     print()
-
-    # Save JSON data for further analysis
-    json_output = OUTPUT_PATH / "test_module_review_data_generic.json"
-    with open(json_output, 'w', encoding='utf-8') as f:
-        json.dump({
-            "timestamp": datetime.now().isoformat(),
-            "total_agents": 30,
-            "consensus_issues_count": len(consensus_issues),
-            "non_consensus_issues_count": len(non_consensus),
-            "consensus_issues": consensus_issues,
-            "non_consensus_issues": non_consensus,
-            "all_findings": all_findings
-        }, f, indent=2)
-
     print(f"✓ JSON data saved: {json_output}")
     print()
 
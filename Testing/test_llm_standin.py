@@ -0,0 +1,125 @@
+"""
+Test suite for the local stand-in LLM server.
+Tests replies to run_review and CODE reviewer prompts and the injected fault rates.
+"""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+import run_review
+from llm_standin import StandInConfig, StandInLLM
+
+
+MODULE_XML = """<Module>
+  <Activity>
+    <title>Power Series</title>
+    <p>You don't need a new test here. Don't forget the ratio test from the last module.</p>
+    <p>A power series is a series of the form <m>\\sum_{n=0}^\\infty c_n (x-a)^n</m>.</p>
+    <p>Find the radius of convergence. It's the distance to the nearest singularity.</p>
+    <p>We can't use the root test here, and it isn't needed.</p>
+    <p>Let's check the endpoints. They're not covered by the ratio test, so don't skip them.</p>
+  </Activity>
+</Module>
+"""
+
+MODULE_TEXT = ("You don't need a new test here. Don't forget the ratio test from the last module.\n"
+               "A power series is a series of the form $\\sum_{n=0}^\\infty c_n (x-a)^n$.\n"
+               "Find the radius of convergence. It's the distance to the nearest singularity.\n"
+               "We can't use the root test here, and it isn't needed.\n"
+               "Let's check the endpoints. They're not covered by the ratio test, so don't skip them.")
+
+
+@pytest.fixture(autouse=True)
+def repo_config(monkeypatch):
+    """Detection rules from the repository's config/ directory."""
+    monkeypatch.setattr(run_review, "CONFIG_PATH", Path(__file__).resolve().parent.parent / "config")
+
+
+def chat(prompt, system_prompt="You are a reviewer."):
+    """Chat-completions request body for a prompt."""
+    return {"model": "stand-in", "messages": [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]}
+
+
+def code_prompt(focus):
+    """A CODE reviewer prompt (see BaseReviewer in reviewers.py)."""
+    return (f"Review the following educational module content:\n\nMODULE CONTENT:\n{MODULE_TEXT}\n\n"
+            f"AGENT TYPE: style\n\nFOCUS AREA: {focus}\n\nPlease identify issues related to your focus area.")
+
+
+class TestStandInReplies:
+    """Tests for the findings returned per prompt shape."""
+
+    def test_run_review_prompt_gets_findings_array(self):
+        """A run_review agent prompt is answered with simulate_agent_review's findings."""
+        module_text, _ = run_review.extract_text_from_module(MODULE_XML)
+        prompt = run_review.build_agent_prompt("style", "Generalist (Cross-Cutting)", "", "", "", "",
+                                               module_text)
+        standin = StandInLLM(StandInConfig())
+
+        content, finish_reason = standin.complete(chat(prompt), random.Random(0))
+
+        findings = json.loads(content)
+        assert finish_reason == "stop"
+        assert findings
+        assert all({"line_numbers", "category", "issue_description", "agent"} <= set(f) for f in findings)
+
+    def test_code_reviewer_prompt_gets_issues(self):
+        """A CODE reviewer prompt is answered with {"issues": [...]} in the reviewers' format."""
+        standin = StandInLLM(StandInConfig())
+
+        content, finish_reason = standin.complete(
+            chat(code_prompt("contractions and mechanical style"), "You are a style reviewer."),
+            random.Random(0)
+        )
+
+        response = json.loads(content)
+        assert finish_reason == "stop"
+        assert response["issues"]
+        assert all({"type", "severity", "location", "issue", "suggestion"} <= set(issue)
+                   for issue in response["issues"])
+
+
+class TestFaultInjection:
+    """Tests for the 429/500 and truncation rates with a seeded RNG."""
+
+    def test_fault_rates_match_config(self):
+        """429s and 500s are drawn at their configured rates."""
+        standin = StandInLLM(StandInConfig(rate_429=0.1, rate_500=0.05))
+        rng = random.Random(7)
+
+        faults = [standin.draw_fault(rng) for _ in range(10000)]
+
+        assert faults.count(429) / len(faults) == pytest.approx(0.1, abs=0.01)
+        assert faults.count(500) / len(faults) == pytest.approx(0.05, abs=0.01)
+
+    def test_no_faults_by_default(self):
+        """Without configured rates every request succeeds."""
+        standin = StandInLLM(StandInConfig())
+        rng = random.Random(7)
+        assert all(standin.draw_fault(rng) is None for _ in range(1000))
+
+    def test_truncation_rate_and_reproducibility(self):
+        """Truncated replies come at truncate_rate, are invalid JSON and repeat for a seed."""
+        body = chat(code_prompt("contractions and mechanical style"), "You are a style reviewer.")
+
+        def run(seed):
+            standin = StandInLLM(StandInConfig(truncate_rate=0.2))
+            rng = random.Random(seed)
+            replies = [standin.complete(body, rng) for _ in range(1000)]
+            return standin, replies
+
+        standin, replies = run(7)
+        truncated = [content for content, finish_reason in replies if finish_reason == "length"]
+
+        assert standin.stats["truncated"] == len(truncated)
+        assert len(truncated) / len(replies) == pytest.approx(0.2, abs=0.04)
+        for content in truncated:
+            with pytest.raises(json.JSONDecodeError):
+                json.loads(content)
+        assert [finish for _, finish in run(7)[1]] == [finish for _, finish in replies]
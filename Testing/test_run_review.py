@@ -0,0 +1,932 @@
+"""
+Test suite for the rule-based review simulation in run_review.py.
+Tests hit sampling, detection rules, line analysis and the aggregation helpers.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import run_review
+from run_review import HitTable, agent_rng
+
+
+REPO_PATH = Path(__file__).resolve().parent.parent
+POWER_SERIES_MODULE = REPO_PATH / "modules" / "test" / "Power_Series" / "power_series_original.xml"
+EXEMPLAR_MODULES = sorted((REPO_PATH / "modules" / "exemplary").glob("*.xml")) + [POWER_SERIES_MODULE]
+SCAN_CHARS = 2000   # Prefix of each line compared (the embedded base64 lines make full scans slow)
+AGENT_IDS = [f"Style-Generalist-{i}" for i in range(1, 41)]
+
+
+@pytest.fixture(autouse=True)
+def repo_config(monkeypatch):
+    """Detection rules from the repository's config/ directory."""
+    monkeypatch.setattr(run_review, "CONFIG_PATH", REPO_PATH / "config")
+
+
+@pytest.fixture(scope="module")
+def power_series():
+    """Extracted text and structure of the Power Series test module."""
+    return run_review.extract_text_from_module(POWER_SERIES_MODULE.read_text(encoding="utf-8"))
+
+
+def make_finding(description, severity=2):
+    """A minimal detector finding."""
+    return {"issue_description": description, "line_numbers": [1], "category": "Mechanical Compliance",
+            "severity": severity}
+
+
+def per_agent_loop(table, agent_id, probabilities):
+    """
+    The per-agent detector loop HitTable replaced: walk the hits in order, report a hit
+    when its draw passes, and skip the rest of its group after a report (the old `break`).
+    """
+    draws = agent_rng(agent_id).random(len(table))
+    reported = []
+    reported_group = None
+    for index, finding in enumerate(table.findings):
+        group = table.group_starts[index]
+        if group == reported_group:
+            continue
+        if draws[index] < probabilities[index]:
+            reported.append(finding["issue_description"])
+            reported_group = group
+    return reported
+
+
+def grouped_table():
+    """Hits in singleton and multi-hit groups, including a group key reused after a gap."""
+    table = HitTable()
+    for line in range(1, 9):
+        for pattern in range(line % 4):
+            table.add(make_finding(f"line {line} pattern {pattern}", severity=1 + line % 5), group=line)
+        table.add(make_finding(f"line {line} alone"), rate=0.5)
+    for pattern in range(3):
+        table.add(make_finding(f"line 1 again {pattern}"), group=1)
+    return table
+
+
+class TestHitTable:
+    """Tests for sampling agents' findings from a module's hits."""
+
+    def test_sample_matches_per_agent_loop(self):
+        """Seeded sampling gives each agent the findings of the old per-agent loop."""
+        table = grouped_table()
+        probabilities = table.probabilities()
+
+        sampled = table.sample(AGENT_IDS, probabilities)
+
+        for agent_id, findings in zip(AGENT_IDS, sampled):
+            assert [f["issue_description"] for f in findings] == per_agent_loop(table, agent_id, probabilities)
+
+    def test_sample_matches_per_agent_loop_on_module(self, power_series):
+        """The same holds for every rule's hits on a real module and role weights."""
+        module_text, structure = power_series
+        table = run_review.module_hit_table(module_text, structure)
+        probabilities = run_review.agent_probabilities(module_text, "style", None, structure)
+
+        sampled = table.sample(AGENT_IDS, probabilities)
+
+        assert len(table) > 0
+        for agent_id, findings in zip(AGENT_IDS, sampled):
+            assert [f["issue_description"] for f in findings] == per_agent_loop(table, agent_id, probabilities)
+
+    def test_each_group_reports_at_most_one_hit(self):
+        """Even when every hit is flagged, a group yields only its first hit."""
+        table = grouped_table()
+
+        reported = table.reported(table.flag_matrix(AGENT_IDS, np.ones(len(table))))
+
+        group_starts = np.array(table.group_starts)
+        for row in reported:
+            groups = group_starts[row]
+            assert len(groups) == len(set(groups))
+        assert [f["issue_description"] for f in table.report_all()] == [
+            table.findings[start]["issue_description"] for start in sorted(set(table.group_starts))
+        ]
+
+    def test_same_agent_same_findings(self):
+        """An agent's findings depend only on its ID."""
+        table = grouped_table()
+        first = table.sample(AGENT_IDS[:3], table.probabilities())
+        again = table.sample(AGENT_IDS[:3], table.probabilities())
+        assert first == again
+
+    def test_concat_offsets_groups(self):
+        """Groups of concatenated tables stay separate."""
+        first, second = HitTable(), HitTable()
+        first.add(make_finding("a"), group="x")
+        first.add(make_finding("b"), group="x")
+        second.add(make_finding("c"), group="x")
+
+        combined = HitTable.concat([first, second])
+
+        assert combined.group_starts == [0, 0, 2]
+        assert [f["issue_description"] for f in combined.report_all()] == ["a", "c"]
+
+
+class TestLineRuleScanner:
+    """Tests that the combined LINE_RULES scan finds what each rule finds alone."""
+
+    @pytest.mark.parametrize("module_path", EXEMPLAR_MODULES, ids=lambda path: path.name)
+    def test_scan_equals_finditer_per_rule(self, module_path):
+        """On every line (raw and math-masked), each rule's matches equal re.finditer's."""
+        module_text, _ = run_review.extract_text_from_module(module_path.read_text(encoding="utf-8"))
+        rules = [re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+                 for _, pattern, ignore_case in run_review.LINE_RULES]
+
+        matched = 0
+        for line in module_text.split("\n"):
+            content = line.split("|", 1)[1].strip()[:SCAN_CHARS]
+            for text in (content, run_review.MathSpans(content).masked):
+                scanned = run_review.LINE_SCANNER.scan(text)
+                for key, rule in zip(run_review.LINE_SCANNER.keys, rules):
+                    expected = [(m.start(), m.end(), m.group()) for m in rule.finditer(text)]
+                    assert scanned.get(key, []) == expected, (key, line[:80])
+                    matched += len(expected)
+        assert matched > 0
+
+    def test_overlapping_rules_keep_their_own_matches(self):
+        """Matches of one rule do not hide overlapping matches of another."""
+        scanner = run_review.LineRuleScanner([("a", r"ab", False), ("b", r"bc", False), ("a", r"b+", False)])
+
+        matches = scanner.scan("abcbbc")
+
+        assert matches[("a", 0)] == [(0, 2, "ab")]
+        assert matches[("b", 0)] == [(1, 3, "bc"), (4, 6, "bc")]
+        assert matches[("a", 1)] == [(1, 2, "b"), (3, 5, "bb")]
+
+
+def load_rules(tmp_path, detection_rules):
+    """Detection rules from an agent configuration holding this <detection_rules> markup."""
+    config_file = tmp_path / "agent_configuration.xml"
+    config_file.write_text(f"<learnvia_configuration>{detection_rules}</learnvia_configuration>")
+    return {rule.detector: rule for rule in
+            run_review._load_detection_rules(config_file, tmp_path / "detectors")}
+
+
+class TestDetectionRules:
+    """Tests for <detection_rules> loading and role/competency weights."""
+
+    def test_rules_are_parsed_in_document_order(self, tmp_path):
+        """Configured rules come first, with their category, severity and weights."""
+        rules = load_rules(tmp_path, """<detection_rules>
+            <rule detector="detect_contractions" category="Tone" severity="4">
+              <weight role="style" value="1.5"/>
+              <weight competency="Mechanical Compliance" value="2"/>
+            </rule>
+            <rule detector="detect_todo_placeholders"><weight role="authoring" value="1"/></rule>
+          </detection_rules>""")
+
+        assert list(rules)[:2] == ["detect_contractions", "detect_todo_placeholders"]
+        contractions = rules["detect_contractions"]
+        assert (contractions.category, contractions.severity) == ("Tone", 4)
+        assert contractions.weight("style", "Mechanical Compliance") == 3.0
+        assert contractions.weight("style", None) == 1.5
+        assert contractions.weight("authoring", None) == 0.0
+        assert rules["detect_todo_placeholders"].weight("style", None) == 0.0
+
+    def test_missing_entries_use_declared_defaults(self, tmp_path):
+        """Left-out attributes, role weights and whole rules fall back to the @detector declaration."""
+        rules = load_rules(tmp_path, """<detection_rules>
+            <rule detector="detect_todo_placeholders"/>
+          </detection_rules>""")
+
+        todo = rules["detect_todo_placeholders"]
+        assert (todo.category, todo.severity) == ("UNFINISHED", 3)
+        assert todo.weight("authoring", None) == todo.weight("style", None) == 1.0
+        assert set(rules) == set(run_review.DETECTORS)
+        contractions = rules["detect_contractions"]
+        assert (contractions.category, contractions.severity) == ("Mechanical Compliance", 2)
+        assert contractions.role_weights == {"style": 1.0}
+
+    def test_missing_section_uses_declared_defaults(self, tmp_path):
+        """Without <detection_rules> every registered detector runs with its defaults."""
+        rules = load_rules(tmp_path, "")
+
+        assert set(rules) == set(run_review.DETECTORS)
+        for name, spec in run_review.DETECTORS.items():
+            assert (rules[name].category, rules[name].severity) == (spec.category, spec.severity)
+            assert rules[name].role_weights == {role: 1.0 for role in spec.roles}
+
+    def test_unknown_detector_is_rejected(self, tmp_path):
+        """A rule naming no registered detector is a configuration error."""
+        with pytest.raises(ValueError, match="detect_nothing"):
+            load_rules(tmp_path, '<detection_rules><rule detector="detect_nothing"/></detection_rules>')
+
+    def test_weight_applies_as_independent_looks(self, power_series):
+        """A weight w turns a hit's probability p into 1 - (1 - p)^w."""
+        module_text, structure = power_series
+        rules = {rule.detector: rule for rule in run_review.load_detection_rules()}
+        hits = run_review.detect_module_hits(module_text, structure)
+        base = run_review.module_hit_table(module_text, structure).probabilities()
+        role, competency = "style", "Mechanical Compliance"
+
+        weights = np.concatenate([np.full(len(table), rules[name].weight(role, competency))
+                                  for name, table in hits.items()])
+        probabilities = run_review.agent_probabilities(module_text, role, competency, structure)
+
+        assert np.allclose(probabilities, 1 - (1 - base) ** weights)
+        assert 1 - (1 - 0.4) ** 2 == pytest.approx(0.64)
+        assert (probabilities[weights == 0] == 0).all()
+        assert (probabilities[weights > 1] > base[weights > 1]).all()
+
+
+HINT_MODULE_XML = """<Module>
+  <title>Series</title>
+  <Activities>
+    <Activity>
+      <Hints>
+        <hint>Use the ratio test.</hint>
+        <hint>Look at <m>a_n</m> again.</hint>
+      </Hints>
+      <p>Use the ratio test.</p>
+    </Activity>
+  </Activities>
+</Module>
+"""
+
+
+class TestModuleStructure:
+    """Tests for the XML element context extracted with the module text."""
+
+    def test_lines_know_their_enclosing_elements(self):
+        """Each line's element path runs from below the root to the element holding it."""
+        module_text, structure = run_review.extract_text_from_module(HINT_MODULE_XML)
+
+        analysis = run_review.analyze_module(module_text, structure)
+
+        assert [line.content for line in analysis] == [
+            "Series", "Use the ratio test.", "Look at <m>a_n</m> again.", "Use the ratio test."]
+        assert [line.element_path for line in analysis] == [
+            "title", "Activities/Activity/Hints/hint", "Activities/Activity/Hints/hint", "Activities/Activity/p"]
+        assert analysis[1].within("Hints") and not analysis[3].within("hint")
+
+    def test_elements_are_told_apart_by_id(self):
+        """Sibling elements with the same tag get separate IDs."""
+        module_text, structure = run_review.extract_text_from_module(HINT_MODULE_XML)
+
+        hints = run_review.RuleBasedDetector(module_text, structure).element_lines("hint")
+
+        assert [[line.line_num for line in lines] for lines in hints.values()] == [[2], [3]]
+
+    def test_same_line_text_keeps_its_own_context(self):
+        """Identical line text in different modules or elements does not share elements."""
+        module_text, structure = run_review.extract_text_from_module(HINT_MODULE_XML)
+        other_text, other_structure = run_review.extract_text_from_module(
+            "<Module>\n<p>Series</p>\n<p>Use the ratio test.</p>\n</Module>")
+
+        assert run_review.analyze_module(other_text, other_structure)[1].element_path == "p"
+        assert run_review.analyze_module(module_text, structure)[1].within("hint")
+        assert run_review.analyze_module(module_text)[1].elements == ()
+
+    def test_extraction_is_repeatable(self):
+        """Element IDs restart for every module, so the same XML gives an equal structure."""
+        first = run_review.extract_text_from_module(HINT_MODULE_XML)
+        second = run_review.extract_text_from_module(HINT_MODULE_XML)
+
+        assert first == second
+        assert hash(first[1]) == hash(second[1])
+
+    def test_window_and_mismatched_structure(self):
+        """Windows slice the structure; a structure for other text is ignored."""
+        module_text, structure = run_review.extract_text_from_module(HINT_MODULE_XML)
+        lines = module_text.split("\n")
+
+        window = structure.window(1, 3)
+        window_text = "\n".join(lines[1:3])
+
+        assert [line.within("hint") for line in run_review.analyze_module(window_text, window)] == [True, True]
+        assert run_review.line_structure(window_text, structure) == ((), ())
+
+    def test_unparsable_xml_has_no_elements(self):
+        """The tag-stripping fallback still returns one (empty) entry per line."""
+        module_text, structure = run_review.extract_text_from_module("<Module><p>Open <b>tag</b>\n<p>Next")
+
+        assert len(structure) == module_text.count("\n") + 1
+        assert set(structure.line_elements) == {()}
+
+
+PLUGIN_SOURCE = '''
+from run_review import HitTable, detector
+
+
+@detector(category="Consistency", severity=1, inputs=("elements",), elements=("hint",))
+def detect_hint_exclamations(module):
+    hits = HitTable()
+    for lines in module.element_lines("hint").values():
+        for line in lines:
+            hits.add({"issue_description": "Hint opens with a command", "line_numbers": [line.line_num]})
+    return hits
+'''
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A copy of the detector registry and profile, so plugins registered by a test go away."""
+    monkeypatch.setattr(run_review, "DETECTORS", dict(run_review.DETECTORS))
+    monkeypatch.setattr(run_review, "DETECTOR_PROFILE", run_review.DetectorProfile())
+    return run_review.DETECTORS
+
+
+class TestDetectorRegistry:
+    """Tests for @detector registration and plugin loading."""
+
+    @pytest.mark.parametrize("kwargs", [
+        {"inputs": ("tokens",)},
+        {"inputs": ("elements",)},
+        {"elements": ("hint",)},
+        {"cost": "free"},
+    ])
+    def test_invalid_declarations_are_rejected(self, registry, kwargs):
+        """Unknown inputs or costs, and element tags without 'elements' (or vice versa), raise."""
+        with pytest.raises(ValueError):
+            run_review.detector(category="Consistency", severity=1, **kwargs)
+
+    def test_names_are_unique(self, registry):
+        """A second detector with a registered name is refused."""
+        def detect_contractions(module):
+            return HitTable()
+
+        with pytest.raises(ValueError, match="already registered"):
+            run_review.detector(category="Consistency", severity=1)(detect_contractions)
+
+    def test_plugins_register_and_run_once_per_module(self, registry, tmp_path, monkeypatch):
+        """Plugin detectors join the rules with their defaults, run per module and are profiled."""
+        plugin_dir = tmp_path / "detectors"
+        plugin_dir.mkdir()
+        (plugin_dir / "hint_exclamations.py").write_text(PLUGIN_SOURCE)
+        (plugin_dir / "_disabled.py").write_text("raise RuntimeError('not a plugin')")
+        monkeypatch.setattr(run_review, "DETECTOR_PLUGIN_PATH", plugin_dir)
+
+        rules = {rule.detector: rule for rule in run_review.load_detection_rules()}
+        module_text, structure = run_review.extract_text_from_module(
+            HINT_MODULE_XML.replace("Series", "Plugin series"))
+        hits = run_review.detect_module_hits(module_text, structure)
+
+        assert run_review.load_detector_plugins(plugin_dir) == ("hint_exclamations",)
+        assert rules["detect_hint_exclamations"].weight("style", None) == 1.0
+        table = hits["detect_hint_exclamations"]
+        assert [f["line_numbers"] for f in table.findings] == [[2], [3]]
+        assert table.findings[0]["category"] == "Consistency"
+        profile = {rule["rule"]: rule for rule in run_review.DETECTOR_PROFILE.stats()["rules"]}
+        assert profile["detect_hint_exclamations"]["runs"] == 1
+        assert profile["detect_hint_exclamations"]["lines_scanned"] == 2
+        assert profile["detect_hint_exclamations"]["hits"] == 2
+        assert profile["detect_contractions"]["lines_scanned"] == 4
+
+    def test_missing_plugin_directory_loads_nothing(self, tmp_path):
+        """Without Testing/detectors only the built-in detectors run."""
+        assert run_review.load_detector_plugins(tmp_path / "absent") == ()
+
+
+READABILITY_MODULE_XML = """<Module>
+<p>The cat sat on the mat. Students calculate the radius of convergence very carefully.</p>
+<p>The series <m>\\sum a_n</m> converges (for all x) quickly, doesn't it?</p>
+<Code>var total = compute(alpha, beta) + another_long_identifier</Code>
+</Module>
+"""
+
+
+class TestSentenceReadability:
+    """Tests for the vectorized per-sentence readability metrics."""
+
+    def test_metrics_match_hand_counts(self):
+        """Word, syllable and long-word counts and the Flesch-Kincaid grade, counted by hand.
+
+        "Students calculate the radius of convergence very carefully." has 8 words and
+        2+3+1+2+1+3+2+4 = 18 syllables (silent final e in calculate, the, convergence), and
+        4 words over six letters: grade 0.39 * 8 + 11.8 * 18 / 8 - 15.59 = 14.08.
+        """
+        module_text, structure = run_review.extract_text_from_module(READABILITY_MODULE_XML)
+
+        metrics = run_review.sentence_readability(module_text, structure)
+
+        assert list(metrics["line"]) == [0, 0, 1, 2]
+        assert list(metrics["words"]) == [6, 8, 6, 0]
+        assert list(metrics["syllables"]) == [6, 18, 10, 0]
+        assert list(metrics["long_words"]) == [0, 4, 3, 0]   # converges, quickly, doesn't
+        assert metrics["long_word_ratio"][1] == pytest.approx(0.5)
+        assert metrics["grade"][0] == pytest.approx(0.39 * 6 + 11.8 * 6 / 6 - 15.59)
+        assert metrics["grade"][1] == pytest.approx(14.08)
+        assert metrics["grade"][2] == pytest.approx(0.39 * 6 + 11.8 * 10 / 6 - 15.59)
+        assert metrics["grade"][3] == 0.0
+
+    def test_sentence_offsets_index_the_line(self):
+        """start/end slice each sentence out of its line's content."""
+        module_text, structure = run_review.extract_text_from_module(READABILITY_MODULE_XML)
+        analysis = run_review.analyze_module(module_text, structure)
+
+        metrics = run_review.sentence_readability(module_text, structure)
+
+        content = analysis[0].content
+        assert content[metrics["start"][0]:metrics["end"][0]] == "The cat sat on the mat"
+        assert content[metrics["start"][1]:metrics["end"][1]].startswith("Students calculate")
+
+    def test_reading_level_rule_flags_outliers(self, monkeypatch):
+        """Only scored sentences above a threshold are reported, grade outliers as severity 3."""
+        monkeypatch.setattr(run_review, "READABILITY_THRESHOLDS",
+                            {"grade": 12.0, "words": 34.0, "long_word_ratio": 0.6})
+        module_text, structure = run_review.extract_text_from_module(READABILITY_MODULE_XML)
+
+        hits = run_review.RuleBasedDetector(module_text, structure).detect_reading_level()
+
+        assert [(f["line_numbers"], f["severity"]) for f in hits.findings] == [([1], 3)]
+        assert "grade 14.1" in hits.findings[0]["issue_description"]
+
+
+def course_module(section, definition):
+    """Module XML numbered by its learning outcomes, informally defining a term."""
+    return (f'<Module>\n<LearningOutcomes ids="{section}.1"/>\n<title>Section {section}</title>\n'
+            f'<p>{definition}</p>\n</Module>\n')
+
+
+@pytest.fixture
+def course(tmp_path):
+    """A course of two modules and an empty glossary index for it."""
+    modules_path = tmp_path / "modules"
+    modules_path.mkdir()
+    (modules_path / "power_series.xml").write_text(
+        course_module("5.2", "A <b>power series</b> is a series of the form sum."))
+    (modules_path / "taylor.xml").write_text(
+        course_module("5.4", "The radius of convergence is defined as the distance to the nearest singularity."))
+    return run_review.CourseGlossary(modules_path, tmp_path / "output" / "course_glossary.json")
+
+
+class TestCourseGlossary:
+    """Tests for the incremental course glossary index."""
+
+    def test_refresh_scans_each_module_once(self, course):
+        """The first refresh scans every module; unchanged files are not rescanned."""
+        first = course.refresh()
+        again = course.refresh()
+
+        assert (first, again) == (2, 0)
+        assert course.first_defined["power series"] == ((5, 2), "power_series.xml")
+        assert course.first_defined["radius of convergence"] == ((5, 4), "taylor.xml")
+        assert course.index_path.exists()
+
+    def test_changed_and_deleted_modules(self, course):
+        """A file whose size or mtime changed is rescanned; a deleted one drops its terms."""
+        course.refresh()
+        taylor = course.modules_path / "taylor.xml"
+        taylor.write_text(course_module("5.1", "The radius of convergence is defined as the largest distance."))
+        (course.modules_path / "power_series.xml").unlink()
+
+        rescanned = course.refresh()
+
+        assert rescanned == 1
+        assert set(course.modules) == {"taylor.xml"}
+        assert course.first_defined == {"radius of convergence": ((5, 1), "taylor.xml")}
+
+    def test_touched_module_is_rescanned(self, course):
+        """Same size, new modification time: the module is rescanned."""
+        course.refresh()
+        taylor = course.modules_path / "taylor.xml"
+        stat = taylor.stat()
+        os.utime(taylor, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert course.refresh() == 1
+
+    def test_saved_index_is_reused(self, course):
+        """A new glossary over the same index loads it instead of rescanning."""
+        course.refresh()
+        reloaded = run_review.CourseGlossary(course.modules_path, course.index_path)
+
+        rescanned = reloaded.refresh()
+
+        assert rescanned == 0
+        assert reloaded.first_defined == course.first_defined
+
+    def test_defined_before(self, course):
+        """Only a module earlier in the course counts as defining a term first."""
+        course.refresh()
+
+        assert course.defined_before("The power series", (5, 3)) == "power_series.xml"
+        assert course.defined_before("power series", (5, 2)) is None
+        assert course.defined_before("power series", None) is None
+        assert course.defined_before("taylor series", (9, 9)) is None
+
+
+DEFINITIONS_MODULE_XML = """<Module>
+<title>Taylor Series</title>
+<p>A Taylor series generalizes a polynomial. Each Taylor series has a radius of convergence.</p>
+<p>The radius of convergence of this Taylor series is infinite.</p>
+</Module>
+"""
+
+
+class TestMissingDefinitions:
+    """Tests for detect_missing_definitions and when main() refreshes the course glossary."""
+
+    def test_title_terms_are_the_module_topic(self, monkeypatch, tmp_path):
+        """Curriculum terms named by a title are not flagged; other undefined terms are."""
+        monkeypatch.setattr(run_review, "COURSE_GLOSSARY",
+                            run_review.CourseGlossary(tmp_path / "modules", tmp_path / "glossary.json"))
+        module_text, structure = run_review.extract_text_from_module(DEFINITIONS_MODULE_XML)
+
+        hits = run_review.RuleBasedDetector(module_text, structure).detect_missing_definitions()
+
+        flagged = [f["issue_description"] for f in hits.findings]
+        assert len(flagged) == 1
+        assert "'radius of convergence' appears 2 times" in flagged[0]
+
+    def test_rule_enabled_by_a_positive_role_weight(self, tmp_path):
+        """A rule whose role weights are all zero is disabled."""
+        rules = load_rules(tmp_path, """<detection_rules>
+            <rule detector="detect_missing_definitions"><weight role="authoring" value="0"/></rule>
+            <rule detector="detect_contractions"><weight role="style" value="0.5"/></rule>
+          </detection_rules>""")
+
+        assert not rules["detect_missing_definitions"].enabled
+        assert rules["detect_contractions"].enabled
+        assert rules["detect_reading_level"].enabled
+
+
+VOCABULARY_TIERS = {"fundamentals": {"course": "Calculus 1", "action": "ignore"},
+                    "tests": {"course": "Calculus 2", "action": "verify"}}
+VOCABULARY_TERMS = {"limit": "fundamentals", "comparison test": "tests", "limit comparison test": "tests",
+                    "series": "fundamentals", "power series": "tests", "ratio test": "tests"}
+
+
+class TestVocabularyMatcher:
+    """Tests for the single-pass curriculum term matcher."""
+
+    def test_longest_term_wins(self):
+        """Where terms overlap, the leftmost and then longest term is reported."""
+        matcher = run_review.VocabularyMatcher(VOCABULARY_TIERS, VOCABULARY_TERMS)
+
+        matches = matcher.scan("Use the limit comparison test on the power series.")
+
+        assert [term for _, _, term, _ in matches] == ["limit comparison test", "power series"]
+
+    def test_matches_whole_words_ignoring_case(self):
+        """Terms match case-insensitively, only as whole words, with their tier and offsets."""
+        matcher = run_review.VocabularyMatcher(VOCABULARY_TIERS, VOCABULARY_TERMS)
+        text = "The Limit of the limits; a Comparison Test, then the ratio tests."
+
+        matches = matcher.scan(text)
+
+        start = text.index("Comparison Test")
+        assert matches == [(4, 9, "limit", "fundamentals"), (start, start + 15, "comparison test", "tests")]
+
+    def test_same_as_alternation_longest_first(self):
+        """On the course modules the trie matches a longest-first alternation of the terms."""
+        matcher = run_review.load_curriculum_vocabulary()
+        alternation = re.compile(r'\b(?:' + '|'.join(
+            re.escape(term) for term in sorted(matcher.terms, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+
+        matched = 0
+        for module_path in EXEMPLAR_MODULES:
+            module_text, _ = run_review.extract_text_from_module(module_path.read_text(encoding="utf-8"))
+            for line in module_text.split("\n"):
+                content = line.split("|", 1)[1][:SCAN_CHARS]
+                expected = [(m.start(), m.end()) for m in alternation.finditer(content)]
+                assert [(start, end) for start, end, _, _ in matcher.scan(content)] == expected
+                matched += len(expected)
+        assert matched > 0
+
+    def test_term_keeps_its_first_tier(self, tmp_path):
+        """A term listed in two tiers belongs to the first; unknown actions are rejected."""
+        vocabulary_file = tmp_path / "curriculum_vocabulary.xml"
+        vocabulary_file.write_text(f'<curriculum_vocabulary version="{run_review.CURRICULUM_VOCABULARY_VERSION}">'
+                                   '<tier name="a" action="define"><term>Power  Series</term></tier>'
+                                   '<tier name="b" action="ignore"><term>power series</term><term>limit</term></tier>'
+                                   '</curriculum_vocabulary>')
+
+        matcher = run_review._load_curriculum_vocabulary(vocabulary_file)
+
+        assert matcher.terms == {"power series": "a", "limit": "b"}
+        vocabulary_file.write_text(f'<curriculum_vocabulary version="{run_review.CURRICULUM_VOCABULARY_VERSION}">'
+                                   '<tier name="a" action="skip"><term>limit</term></tier></curriculum_vocabulary>')
+        run_review._load_curriculum_vocabulary.cache_clear()
+        with pytest.raises(ValueError, match="Unknown action"):
+            run_review._load_curriculum_vocabulary(vocabulary_file)
+
+
+def make_roster():
+    """Roster entries as build_agent_roster names them, without prompts."""
+    roster = []
+    for agent_type, config in run_review.AGENT_CONFIG.items():
+        prefix = agent_type.capitalize()
+        for i in range(config["total"]):
+            competency = config["competencies"][i % len(config["competencies"])] \
+                if i < config["rubric_focused"] else None
+            agent_id = (f"{prefix}-Specialist-{competency.replace(' ', '')}-{i+1}" if competency
+                        else f"{prefix}-Generalist-{i+1}")
+            roster.append({"agent_id": agent_id, "agent_type": agent_type, "competency": competency,
+                           "focus": "", "prompt": None, "structure": None})
+    return roster
+
+
+def agent_finding(agent, description, severity=3):
+    """A finding reported by a roster agent."""
+    return {**make_finding(description, severity), "agent": agent["agent_id"], "quoted_text": "",
+            "student_impact": "", "suggested_fix": "", "confidence": 0.8}
+
+
+class TestSequentialConsensus:
+    """Tests for the projected count bounds and early stopping of the ensemble."""
+
+    def test_bounds_match_wilson_interval(self):
+        """5 of 10 agents at z = 1.96: Wilson interval 0.5 ± 0.2634 over the 20 remaining agents."""
+        low, high = run_review.projected_count_bounds(5, 10, 30, 1.96)
+
+        assert low == pytest.approx(5 + (0.5 - 0.263410) * 20, abs=1e-4)
+        assert high == pytest.approx(5 + (0.5 + 0.263410) * 20, abs=1e-4)
+
+    def test_bounds_at_the_ends_of_a_run(self):
+        """Nothing run yet: anything is possible; everything run: the count is exact."""
+        assert run_review.projected_count_bounds(0, 0, 30, 1.96) == (0.0, 30.0)
+        assert run_review.projected_count_bounds(7, 30, 30, 1.96) == (7.0, 7.0)
+
+    def test_bounds_narrow_as_agents_run(self):
+        """At the same observed share, more agents run give tighter bounds around the projection."""
+        widths = []
+        for agents_run in (6, 12, 24):
+            low, high = run_review.projected_count_bounds(agents_run // 2, agents_run, 30, 1.96)
+            assert low <= 15 <= high
+            widths.append(high - low)
+
+        assert widths == sorted(widths, reverse=True)
+
+    def test_stops_once_consensus_is_settled(self, monkeypatch):
+        """When every agent reports the same issue, the run stops after min_agents."""
+        monkeypatch.setattr(run_review, "run_agent_review",
+                            lambda agent: [agent_finding(agent, "Contraction on line 1")])
+
+        findings, run_stats = run_review.run_sequential_consensus(make_roster(), wave_size=6)
+
+        assert run_stats["stopped_early"]
+        assert run_stats["agents_run"] == len(findings) == 12
+        assert (run_stats["waves"], run_stats["total_agents"]) == (2, 30)
+
+    def test_runs_every_agent_while_unsettled(self, monkeypatch):
+        """An issue flagged by 40% of the agents stays near the 12-agent tier, so nobody is skipped."""
+        monkeypatch.setattr(run_review, "run_agent_review",
+                            lambda agent: [agent_finding(agent, "Ambiguous wording", severity=5)]
+                            if int(agent["agent_id"].rsplit("-", 1)[1]) % 5 in (1, 3) else [])
+        agents_done = []
+
+        _, run_stats = run_review.run_sequential_consensus(
+            make_roster(), wave_size=6, on_agent_done=lambda findings, agents_run: agents_done.append(agents_run))
+
+        assert not run_stats["stopped_early"]
+        assert run_stats["agents_run"] == 30
+        assert agents_done == list(range(1, 31))
+
+
+class TestProgressiveReview:
+    """Tests for the priority order and partial reports of progressive reviews."""
+
+    def test_specialists_run_in_priority_order(self):
+        """Specialists come first by SCHEDULING_PRIORITY, keeping roster order within a competency."""
+        roster = make_roster()
+
+        ordered = run_review.prioritize_roster(roster)
+
+        specialists = [agent for agent in ordered if agent["competency"]]
+        assert ordered[:len(specialists)] == specialists
+        ranks = [run_review.SCHEDULING_PRIORITY.index(agent["competency"]) for agent in specialists]
+        assert ranks == sorted(ranks)
+        assert [agent["agent_id"] for agent in specialists[:2]] == [
+            "Authoring-Specialist-StructuralIntegrity-2", "Authoring-Specialist-StructuralIntegrity-7"]
+        assert sorted(a["agent_id"] for a in ordered) == sorted(a["agent_id"] for a in roster)
+
+    def test_generalists_alternate_authoring_and_style(self):
+        """Generalists follow the specialists, alternating authoring and style; the longer group ends the run."""
+        roster = [agent for agent in make_roster()
+                  if not (agent["agent_id"] in ("Style-Generalist-14", "Style-Generalist-15"))]
+
+        ordered = run_review.prioritize_roster(roster)
+
+        generalists = [agent["agent_id"] for agent in ordered if not agent["competency"]]
+        assert generalists[:4] == ["Authoring-Generalist-10", "Style-Generalist-10",
+                                   "Authoring-Generalist-11", "Style-Generalist-11"]
+        assert generalists[-2:] == ["Authoring-Generalist-14", "Authoring-Generalist-15"]
+
+    def test_partial_report_default_update_rate(self, monkeypatch, tmp_path):
+        """By default the report is rewritten PROGRESSIVE_UPDATES times, the last with all agents."""
+        written = []
+        monkeypatch.setattr(run_review, "write_review_outputs",
+                            lambda *args, **kwargs: written.append(args[5]["agents_run"]))
+        report = run_review.ProgressiveReport(tmp_path, "<Module/>", total_agents=30)
+
+        for agents_run in range(1, 31):
+            report.update([], agents_run)
+
+        assert report.updates == run_review.PROGRESSIVE_UPDATES
+        assert written == list(range(3, 31, 3))
+
+    def test_json_records_the_ensemble_size(self, tmp_path):
+        """total_agents in the JSON comes from run_stats, for full and scheduled runs."""
+        run_stats = {"agents_run": 40, "total_agents": 40, "stopped_early": False}
+
+        _, json_file = run_review.write_review_outputs(tmp_path, [], [], [], "<Module/>", run_stats)
+        full = json.loads(json_file.read_text())
+        _, json_file = run_review.write_review_outputs(tmp_path, [], [], [], "<Module/>",
+                                                       {**run_stats, "agents_run": 12, "waves": 2, "confidence": 0.95},
+                                                       scheduled=True)
+        scheduled = json.loads(json_file.read_text())
+
+        assert full["total_agents"] == scheduled["total_agents"] == 40
+        assert "run_stats" not in full
+        assert (scheduled["agents_run"], scheduled["status"]) == (12, "complete")
+
+
+class TestKnownIssues:
+    """Tests for rule triage and the known issues agents are told not to report again."""
+
+    def test_triage_hits_are_unique_rule_findings(self, power_series):
+        """Triage keeps the first hit per description key, attributed to the rule detector."""
+        module_text, structure = power_series
+
+        hits = run_review.run_rule_triage(module_text, structure)
+
+        keys = [hit["issue_description"][:50] for hit in hits]
+        assert hits
+        assert len(keys) == len(set(keys))
+        assert all(hit["agent"] == run_review.RULE_DETECTOR_ID and hit["source"] == "rule" for hit in hits)
+
+    def test_known_issues_round_trip_through_the_prompt(self, power_series):
+        """parse_known_issues reads back the keys format_known_issues listed, and nothing after the section."""
+        module_text, structure = power_series
+        hits = run_review.run_rule_triage(module_text, structure)
+        prompt = run_review.build_agent_prompt("style", "Generalist (Cross-Cutting)", "", "", "", "",
+                                               module_text, run_review.format_known_issues(hits))
+
+        known = run_review.parse_known_issues(prompt)
+
+        assert known == {hit["issue_description"][:50] for hit in hits}
+        assert run_review.parse_known_issues(run_review.KNOWN_ISSUES_HEADER + "\n\n# NEXT\n- Line 0001 | A | b") == set()
+        assert run_review.format_known_issues([]) == ""
+
+    def test_agents_skip_known_issues(self, power_series):
+        """With the triage hits listed, no agent reports them; without, agents do."""
+        module_text, structure = power_series
+        hits = run_review.run_rule_triage(module_text, structure)
+        known = {hit["issue_description"][:50] for hit in hits}
+
+        def reported(known_issues):
+            prompt = run_review.build_agent_prompt("style", "Generalist (Cross-Cutting)", "", "", "", "",
+                                                   module_text, known_issues)
+            return [finding["issue_description"][:50] for agent_id in AGENT_IDS[:10]
+                    for finding in run_review.simulate_agent_review(agent_id, prompt, structure)]
+
+        assert known & set(reported(""))
+        assert not known & set(reported(run_review.format_known_issues(hits)))
+
+
+WINDOWED_TEXT = '\n'.join(f"{n:04d}| Sentence number {n} of the module." for n in range(1, 101))
+
+
+def window_finding(description, line_numbers, severity=2, confidence=0.5):
+    """An agent's finding on one window."""
+    return {**make_finding(description, severity), "line_numbers": line_numbers, "confidence": confidence}
+
+
+class TestModuleWindows:
+    """Tests for map-reduce windows and the merging of their findings."""
+
+    def test_windows_overlap_and_own_every_line_once(self):
+        """Windows fit max_chars, share overlap_lines lines, and their owned ranges tile the module."""
+        windows = run_review.split_module_windows(WINDOWED_TEXT, 400, overlap_lines=3)
+
+        assert len(windows) > 2
+        assert all(len(window["text"]) <= 400 for window in windows)
+        for previous, window in zip(windows, windows[1:]):
+            assert previous["last_line"] - window["first_line"] + 1 == 3
+            assert window["owned_first"] == previous["owned_last"] + 1
+        assert (windows[0]["owned_first"], windows[-1]["owned_last"]) == (1, 100)
+        assert all(w["first_line"] <= w["owned_first"] <= w["owned_last"] <= w["last_line"] for w in windows)
+
+    def test_window_structure_follows_its_lines(self):
+        """Each window carries the structure of exactly its lines."""
+        module_text, structure = run_review.extract_text_from_module(
+            "<Module>\n" + "\n".join(f"<p>Line {n}.</p>" for n in range(40)) + "\n</Module>")
+
+        windows = run_review.split_module_windows(module_text, 120, overlap_lines=2, structure=structure)
+
+        for window in windows:
+            assert len(window["structure"]) == window["text"].count("\n") + 1
+            first = window["first_line"] - 1
+            assert window["structure"] == structure.window(first, first + len(window["structure"]))
+
+    def test_seam_issue_is_reported_once(self):
+        """Lines in an overlap are left to the window owning them; the other window's findings are dropped."""
+        windows = run_review.split_module_windows(WINDOWED_TEXT, 400, overlap_lines=3)
+        early, late = windows[1]["first_line"], windows[0]["last_line"]
+
+        reduced = run_review.reduce_window_findings(windows[:2], [
+            [window_finding("Early seam issue (window 1)", [early]),
+             window_finding("Late seam issue (window 1)", [late])],
+            [window_finding("Early seam issue (window 2)", [early]),
+             window_finding("Late seam issue (window 2)", [late])]
+        ])
+
+        assert windows[0]["owned_last"] == early < late <= windows[1]["owned_last"]
+        assert [f["issue_description"] for f in reduced] == ["Early seam issue (window 1)",
+                                                             "Late seam issue (window 2)"]
+
+    def test_same_issue_in_two_windows_is_merged(self):
+        """One agent's issue found in two windows counts once, with lines, severity and confidence merged."""
+        windows = run_review.split_module_windows(WINDOWED_TEXT, 400, overlap_lines=3)
+        first_line, second_line = windows[0]["owned_first"], windows[1]["owned_last"]
+
+        reduced = run_review.reduce_window_findings(windows[:2], [
+            [window_finding("Undefined term", [first_line], severity=2, confidence=0.4)],
+            [window_finding("Undefined term", [second_line], severity=4, confidence=0.9)]
+        ])
+
+        assert len(reduced) == 1
+        assert reduced[0]["line_numbers"] == [first_line, second_line]
+        assert (reduced[0]["severity"], reduced[0]["confidence"]) == (4, 0.9)
+
+    def test_window_relative_lines_are_shifted(self):
+        """Line numbers counted from the window start are mapped onto the module."""
+        windows = run_review.split_module_windows(WINDOWED_TEXT, 400, overlap_lines=3)
+        window = windows[1]
+
+        reduced = run_review.reduce_window_findings([window], [[window_finding("Relative", [5])]])
+
+        assert reduced[0]["line_numbers"] == [window["first_line"] + 4]
+
+
+def valid_finding(**fields):
+    """A finding in the OUTPUT FORMAT of build_agent_prompt."""
+    return {"issue_description": "Contraction on line 3", "line_numbers": [3], "category": "Mechanical Compliance",
+            "severity": 2, "confidence": 0.8, "quoted_text": "don't", "student_impact": "", "suggested_fix": "",
+            **fields}
+
+
+class TestFindingValidator:
+    """Tests for the validation and repair of agent output."""
+
+    def test_well_formed_findings_are_unchanged(self):
+        """Valid findings pass through as they are and count as neither repaired nor rejected."""
+        validator = run_review.FindingValidator()
+        finding = valid_finding()
+
+        valid = validator.validate("agent", [finding])
+
+        assert valid == [valid_finding()] and valid[0] is finding
+        assert (validator.stats()["repaired"], validator.stats()["rejected"]) == (0, 0)
+
+    @pytest.mark.parametrize("output", [{"issues": [valid_finding()]}, {"findings": [valid_finding()]},
+                                        valid_finding()], ids=["issues", "findings", "object"])
+    def test_wrappers_become_a_list(self, output):
+        """{"issues": [...]}, {"findings": [...]} and a single object are all read as a list."""
+        assert run_review.FindingValidator().validate("agent", output) == [valid_finding()]
+
+    def test_aliases_and_values_are_repaired(self):
+        """Alternate keys are renamed and every field is coerced to its OUTPUT FORMAT type."""
+        validator = run_review.FindingValidator()
+        finding = {"description": "Passive voice", "lines": "10-12, 0042", "category": "punctuation and grammar",
+                   "severity": "major", "confidence": "80%", "quote": 7, "fix": None}
+
+        valid = validator.validate("agent", [finding])
+
+        assert valid == [{"issue_description": "Passive voice", "line_numbers": [10, 11, 12, 42],
+                          "category": "Punctuation & Grammar", "severity": 4, "confidence": 0.8,
+                          "quoted_text": "7", "student_impact": "", "suggested_fix": ""}]
+        assert validator.stats()["repaired"] == 1
+
+    @pytest.mark.parametrize("field, value, repaired", [
+        ("severity", "4", 4), ("severity", 9, 5), ("severity", "unclear", 3),
+        ("confidence", 85, 0.85), ("confidence", 1, 1.0), ("confidence", "n/a", 0.5),
+        ("line_numbers", 7.0, [7]), ("line_numbers", ["5", 6, "x"], [5, 6]),
+        ("category", "MECHANICAL-compliance", "Mechanical Compliance"),
+    ])
+    def test_field_repairs(self, field, value, repaired):
+        """Each field's repair rule, one value at a time."""
+        valid = run_review.FindingValidator().validate("agent", [valid_finding(**{field: value})])
+
+        assert valid[0][field] == repaired
+
+    def test_lines_from_the_description(self):
+        """Missing line numbers are taken from "Line N" references in the description."""
+        finding = valid_finding(issue_description="Line 7 and Line 9 use different notation")
+        del finding["line_numbers"]
+
+        valid = run_review.FindingValidator().validate("agent", [finding])
+
+        assert valid[0]["line_numbers"] == [7, 9]
+
+    def test_rejects_are_counted_per_agent(self):
+        """Unrepairable items are dropped and counted per agent and reason."""
+        validator = run_review.FindingValidator()
+
+        validator.validate("first", [valid_finding(category="Vibes"), "not an object", valid_finding()])
+        validator.validate("second", [valid_finding(issue_description=" "),
+                                      valid_finding(issue_description="No lines", line_numbers=[])])
+        validator.validate("third", "not a list")
+
+        stats = validator.stats()
+        assert stats["rejected_by_agent"] == {"first": 2, "second": 2, "third": 1}
+        assert stats["reject_reasons"] == {"unknown category": 1, "item is not an object": 1,
+                                           "missing issue_description": 1, "no line numbers": 1,
+                                           "response is not a list": 1}
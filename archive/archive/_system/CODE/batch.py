@@ -0,0 +1,374 @@
+"""
+Offline batch execution for whole review passes.
+Writes every agent request for a set of modules into a single batch job file,
+submits it, polls until the job finishes and fans the results back into
+per-module ReviewFeedback lists.
+"""
+
+import asyncio
+import json
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Try to import openai, fall back to mock if not available
+try:
+    import openai
+except ImportError:
+    from .mock_api import openai
+
+from .models import AgentRequest, ModuleContent, ReviewFeedback, ReviewPass
+from .reviewers import APIClient, ReviewerPool, get_project_root
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+class BatchJobStatus:
+    """Lifecycle states of a batch job (mirrors provider batch APIs)."""
+    VALIDATING = "validating"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"
+    CANCELLING = "cancelling"
+    CANCELLED = "cancelled"
+
+    TERMINAL = (COMPLETED, FAILED, EXPIRED, CANCELLED)
+
+
+def write_batch_file(requests: List[AgentRequest], api_client: APIClient,
+                     path: Path) -> Path:
+    """Write agent requests as a JSONL batch job file.
+
+    Args:
+        requests: Requests to include, one line each
+        api_client: Client used to build the chat request bodies
+        path: Destination file
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for request in requests:
+            line = {
+                "custom_id": request.request_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": api_client.build_chat_request(
+                    request.prompt, request.system_prompt,
+                    request.temperature, request.max_tokens,
+                    model=request.model
+                )
+            }
+            f.write(json.dumps(line) + "\n")
+
+    return path
+
+
+def read_batch_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read a JSONL batch output file keyed by custom_id."""
+    results = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                results[record["custom_id"]] = record
+    return results
+
+
+class BatchService(ABC):
+    """Interface for services that execute batch job files.
+
+    A provider-backed implementation uploads the file and talks to the
+    provider's batch endpoint; LocalBatchService runs jobs on disk.
+    """
+
+    @abstractmethod
+    def submit(self, input_path: Path) -> str:
+        """Submit a batch job file and return its job ID."""
+
+    @abstractmethod
+    def retrieve(self, job_id: str) -> Dict[str, Any]:
+        """Return the current status record for a job."""
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Request cancellation of a job and return its status record.
+
+        Providers report "cancelling" until in-flight requests have stopped.
+        """
+
+    @abstractmethod
+    def output_path(self, job_id: str) -> Path:
+        """Return the local path of a completed job's output file."""
+
+
+class LocalBatchService(BatchService):
+    """File-based stand-in batch service for testing and dry runs.
+
+    Each job lives in its own directory holding input.jsonl, status.json and
+    (once processed) output.jsonl. A job is executed the first time it is
+    polled after processing_delay seconds have passed.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None,
+                 responder: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 processing_delay: float = 0.0):
+        """Initialize the local batch service.
+
+        Args:
+            root_dir: Directory holding job folders (default: batch_jobs/ in project root)
+            responder: Callable taking a request body and returning a chat
+                       completion; defaults to openai.ChatCompletion.create
+            processing_delay: Seconds a job stays in progress before it is run
+        """
+        if root_dir is None:
+            root_dir = str(get_project_root() / "batch_jobs")
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.responder = responder or (lambda body: openai.ChatCompletion.create(**body))
+        self.processing_delay = processing_delay
+
+    def submit(self, input_path: Path) -> str:
+        """Copy a batch file into a new job directory."""
+        job_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        job_dir = self.root_dir / job_id
+        job_dir.mkdir(parents=True)
+        shutil.copyfile(input_path, job_dir / "input.jsonl")
+
+        with open(job_dir / "input.jsonl", 'r', encoding='utf-8') as f:
+            total = sum(1 for line in f if line.strip())
+
+        self._write_status(job_dir, {
+            "id": job_id,
+            "status": BatchJobStatus.IN_PROGRESS,
+            "created_at": datetime.now().isoformat(),
+            "completed_at": None,
+            "request_counts": {"total": total, "completed": 0, "failed": 0}
+        })
+        return job_id
+
+    def retrieve(self, job_id: str) -> Dict[str, Any]:
+        """Return job status, running the job if it is due."""
+        job_dir = self.root_dir / job_id
+        status = self._read_status(job_dir)
+
+        if status["status"] == BatchJobStatus.IN_PROGRESS:
+            created = datetime.fromisoformat(status["created_at"])
+            if (datetime.now() - created).total_seconds() >= self.processing_delay:
+                status = self._process(job_dir, status)
+
+        return status
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a job that has not been processed yet (nothing is in flight locally)."""
+        job_dir = self.root_dir / job_id
+        status = self._read_status(job_dir)
+
+        if status["status"] not in BatchJobStatus.TERMINAL:
+            status["status"] = BatchJobStatus.CANCELLED
+            status["completed_at"] = datetime.now().isoformat()
+            self._write_status(job_dir, status)
+
+        return status
+
+    def output_path(self, job_id: str) -> Path:
+        """Return the output file for a job."""
+        return self.root_dir / job_id / "output.jsonl"
+
+    def _process(self, job_dir: Path, status: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every request in a job and write the output file."""
+        completed = 0
+        failed = 0
+
+        with open(job_dir / "input.jsonl", 'r', encoding='utf-8') as f_in, \
+                open(job_dir / "output.jsonl", 'w', encoding='utf-8') as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                try:
+                    response = self.responder(request["body"])
+                    content = response.choices[0].message.content
+                    record = {
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}
+                        },
+                        "error": None
+                    }
+                    completed += 1
+                except Exception as e:
+                    record = {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"message": str(e)}
+                    }
+                    failed += 1
+                f_out.write(json.dumps(record) + "\n")
+
+        status["status"] = BatchJobStatus.COMPLETED
+        status["completed_at"] = datetime.now().isoformat()
+        status["request_counts"] = {"total": completed + failed, "completed": completed, "failed": failed}
+        self._write_status(job_dir, status)
+        return status
+
+    def _read_status(self, job_dir: Path) -> Dict[str, Any]:
+        """Load a job's status record."""
+        with open(job_dir / "status.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_status(self, job_dir: Path, status: Dict[str, Any]):
+        """Persist a job's status record."""
+        with open(job_dir / "status.json", 'w', encoding='utf-8') as f:
+            json.dump(status, f, indent=2)
+
+
+class BatchRunner:
+    """Runs whole review passes for many modules as one batch job."""
+
+    def __init__(self, service: BatchService,
+                 api_client: Optional[APIClient] = None,
+                 work_dir: Optional[str] = None,
+                 poll_interval: float = 30.0,
+                 max_wait_seconds: float = 24 * 3600):
+        """Initialize the batch runner.
+
+        Args:
+            service: Batch service that executes job files
+            api_client: Client used to build request bodies and parse responses
+            work_dir: Directory for job input files (default: batch_jobs/ in project root)
+            poll_interval: Seconds between status polls
+            max_wait_seconds: Give up if the job has not finished by then
+        """
+        if work_dir is None:
+            work_dir = str(get_project_root() / "batch_jobs")
+        self.service = service
+        self.api_client = api_client or APIClient()
+        self.work_dir = Path(work_dir)
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.last_job: Dict[str, Any] = {}
+
+    async def run_pass_async(self, modules: List[ModuleContent],
+                             review_pass: ReviewPass,
+                             num_reviewers: int) -> Dict[str, List[ReviewFeedback]]:
+        """Run one review pass for every module in a single batch job.
+
+        Args:
+            modules: Modules to review
+            review_pass: Pass to run (determines the reviewer pool)
+            num_reviewers: Reviewer count for the pass
+
+        Returns:
+            Feedback lists keyed by module_id
+        """
+        pool = ReviewerPool(review_pass, num_reviewers, self.api_client)
+
+        requests = []
+        for module in modules:
+            requests.extend(pool.build_requests(module))
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        input_path = write_batch_file(
+            requests, self.api_client,
+            self.work_dir / f"{review_pass.value}_{timestamp}.jsonl"
+        )
+
+        job_id = self.service.submit(input_path)
+        print(f"   📦 Submitted batch job {job_id}: {len(requests)} agent requests "
+              f"for {len(modules)} modules")
+
+        status = await self._wait_for_job(job_id)
+        if status["status"] != BatchJobStatus.COMPLETED:
+            raise RuntimeError(f"Batch job {job_id} ended with status '{status['status']}'")
+
+        results = read_batch_results(self.service.output_path(job_id))
+        feedback_by_module, failed = self._fan_out(pool, requests, results)
+
+        self.last_job = {
+            "job_id": job_id,
+            "input_file": str(input_path),
+            "requests": len(requests),
+            "failed_requests": failed,
+            "request_counts": status.get("request_counts", {})
+        }
+        print(f"   ✓ Batch job {job_id} completed: "
+              f"{len(requests) - len(failed)}/{len(requests)} agent responses parsed")
+
+        return feedback_by_module
+
+    def run_pass(self, modules: List[ModuleContent], review_pass: ReviewPass,
+                 num_reviewers: int) -> Dict[str, List[ReviewFeedback]]:
+        """Synchronous wrapper for a batch pass."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(
+                self.run_pass_async(modules, review_pass, num_reviewers)
+            )
+        finally:
+            loop.close()
+
+    async def _wait_for_job(self, job_id: str) -> Dict[str, Any]:
+        """Poll the service until the job reaches a terminal state.
+
+        retrieve() blocks (file or network I/O), so it runs in the default
+        executor instead of on the event loop.
+        """
+        waited = 0.0
+        while True:
+            status = await asyncio.get_event_loop().run_in_executor(
+                None, self.service.retrieve, job_id
+            )
+            if status["status"] in BatchJobStatus.TERMINAL:
+                return status
+            if waited >= self.max_wait_seconds:
+                status["status"] = BatchJobStatus.EXPIRED
+                return status
+            await asyncio.sleep(self.poll_interval)
+            waited += self.poll_interval
+
+    def _fan_out(self, pool: ReviewerPool, requests: List[AgentRequest],
+                 results: Dict[str, Dict[str, Any]]):
+        """Parse batch results back into per-module feedback lists.
+
+        Returns:
+            (feedback keyed by module_id, list of request IDs that failed)
+        """
+        feedback_by_module = defaultdict(list)
+        failed = []
+
+        for request in requests:
+            record = results.get(request.request_id)
+            if record is None or record.get("error") or not record.get("response"):
+                error = (record or {}).get("error") or {"message": "missing from batch output"}
+                print(f"Reviewer error: {request.reviewer_id} on {request.module_id}: {error.get('message')}")
+                failed.append(request.request_id)
+                continue
+
+            try:
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+                response = self.api_client.parse_content(content)
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"Reviewer error: {request.reviewer_id} on {request.module_id}: {e}")
+                failed.append(request.request_id)
+                continue
+
+            reviewer = pool.get_reviewer(request.reviewer_id)
+            if not reviewer or not self.api_client.validate_response(response):
+                print(f"Reviewer error: {request.reviewer_id} on {request.module_id}: invalid response")
+                failed.append(request.request_id)
+                continue
+            feedback_by_module[request.module_id].extend(reviewer.parse_response(response))
+
+        return dict(feedback_by_module), failed
@@ -0,0 +1,177 @@
+"""
+Shared circuit breaker for the agent backend.
+When the provider is failing, every agent retrying on its own turns an outage
+into a thundering herd and a pass that takes minutes to fail. The breaker
+watches the error rate of all API attempts; once it trips, calls fail fast
+with CircuitOpenError and reviewers fall back to rule-based checks until a
+probe request shows the backend has recovered.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class CircuitState:
+    """States of a circuit breaker."""
+    CLOSED = "closed"          # Normal operation
+    OPEN = "open"              # Failing fast, no calls reach the backend
+    HALF_OPEN = "half_open"    # Letting probe calls through to test recovery
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker shared by every agent call.
+
+    Closed: outcomes of the last window_size attempts are kept; once at least
+    min_calls are recorded and the failure rate reaches failure_threshold, the
+    circuit opens. Open: calls are refused for open_seconds. Half-open: up to
+    half_open_probes calls go through; a success closes the circuit, a
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: float = 0.5,
+                 window_size: int = 20,
+                 min_calls: int = 5,
+                 open_seconds: float = 30.0,
+                 half_open_probes: int = 1):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Failure rate (0-1) over the window that trips the circuit
+            window_size: Most recent attempts considered
+            min_calls: Attempts needed before the circuit can trip
+            open_seconds: How long the circuit stays open before probing
+            half_open_probes: Concurrent probe calls allowed while half-open
+        """
+        self.failure_threshold = failure_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+        self.stats = {
+            "trips": 0,
+            "rejected": 0,
+            "probes": 0,
+            "throttled": 0
+        }
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once open_seconds have passed."""
+        with self._lock:
+            return self._current_state_locked()
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go to the backend (and claim a probe slot if half-open)."""
+        with self._lock:
+            state = self._current_state_locked()
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    async def acquire(self, poll_interval: float = 0.05) -> bool:
+        """Like allow_request, but while a half-open probe is in flight, wait for its outcome.
+
+        Calls arriving during a probe would otherwise all be refused and
+        degraded even though the backend may be about to be declared healthy.
+        """
+        while True:
+            with self._lock:
+                state = self._current_state_locked()
+                if state != CircuitState.HALF_OPEN or \
+                        self._probes_in_flight < self.half_open_probes:
+                    break
+            await asyncio.sleep(poll_interval)
+        return self.allow_request()
+
+    def record_success(self):
+        """Record a successful backend call."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._state = CircuitState.CLOSED
+                self._outcomes.clear()
+                print("   🟢 Agent backend recovered: circuit closed")
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        """Record a failed backend call, opening the circuit if the error rate is too high."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open_locked("probe call failed")
+                return
+            if self._state == CircuitState.OPEN:
+                return
+
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and \
+                    failures / len(self._outcomes) >= self.failure_threshold:
+                self._open_locked(f"{failures}/{len(self._outcomes)} recent calls failed")
+
+    def record_cancelled(self):
+        """Record a call abandoned without an outcome (e.g. a losing hedge)."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record_throttled(self):
+        """Record a rate-limited call (HTTP 429).
+
+        The backend answered, so throttling counts as neither success nor
+        failure; backoff, not degradation, is the remedy for it.
+        """
+        with self._lock:
+            self.stats["throttled"] += 1
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        with self._lock:
+            state = self._current_state_locked()
+            retry_in: Optional[float] = None
+            if state == CircuitState.OPEN:
+                retry_in = max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+            return {
+                "state": state,
+                "recent_failures": self._outcomes.count(False),
+                "recent_calls": len(self._outcomes),
+                "retry_in_seconds": retry_in,
+                **self.stats
+            }
+
+    def _current_state_locked(self) -> str:
+        if self._state == CircuitState.OPEN and \
+                time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def _open_locked(self, reason: str):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.stats["trips"] += 1
+        print(f"   🔴 Agent backend failing ({reason}): circuit open for {self.open_seconds:g}s, "
+              f"using rule-based agents")
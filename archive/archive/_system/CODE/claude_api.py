@@ -32,7 +32,8 @@ class ClaudeAPIClient:
             self.style_guidelines = "Guidelines not found"
 
     async def call_api_async(self, prompt: str, system_prompt: str,
-                            temperature: float = 0.7, max_tokens: int = 2000) -> Dict[str, Any]:
+                            temperature: float = 0.7, max_tokens: int = 2000,
+                            model: Optional[str] = None) -> Dict[str, Any]:
         """Call Claude API asynchronously with actual content analysis.
 
         This implementation provides real, thoughtful reviews based on the guidelines.
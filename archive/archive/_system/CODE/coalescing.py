@@ -0,0 +1,203 @@
+"""
+In-flight coalescing of identical agent requests across review sessions.
+When two sessions review the same module version at once (demos, CI), their
+agents send byte-identical requests. The first caller with a given request
+hash makes the call; concurrent callers with the same hash await its result
+instead of sending a duplicate.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Outcome sent to waiters when the leading call was cancelled (e.g. a losing
+# hedge); they retry and one of them leads instead
+_LEADER_CANCELLED = object()
+
+
+def request_hash(prompt: str, system_prompt: str, temperature: float,
+                 max_tokens: int, model: Optional[str]) -> str:
+    """Hash of everything that determines an agent call's response."""
+    payload = json.dumps({
+        "model": model,
+        "system_prompt": system_prompt,
+        "prompt": prompt,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """Shares one in-flight call among concurrent callers with the same key.
+
+    Waiters may be on other event loops (sessions driven by the synchronous
+    wrappers run one loop per thread); results are handed over with
+    call_soon_threadsafe and each waiter gets its own deep copy. A failed
+    call raises the same error in every waiter. Nothing is cached: once the
+    call finishes, the next request with that key goes to the backend again.
+    """
+
+    def __init__(self, exempt_patterns: Optional[List[str]] = None):
+        """Initialize the coalescer.
+
+        Args:
+            exempt_patterns: Regexes; requests whose system prompt matches one
+                             are never coalesced (agents that must stay independent)
+        """
+        self.exempt_patterns = [re.compile(p) for p in (exempt_patterns or [])]
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, List[tuple]] = {}
+
+        self.stats = {
+            "calls": 0,        # Calls sent to the backend
+            "coalesced": 0,    # Callers served by another caller's call
+            "exempt": 0
+        }
+
+    def is_exempt(self, system_prompt: str) -> bool:
+        """Whether a request must always get its own call."""
+        return any(p.search(system_prompt) for p in self.exempt_patterns)
+
+    async def run(self, key: Optional[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run call, or await the identical call already in flight.
+
+        Args:
+            key: Request identity (see CoalescingAPIClient.request_key);
+                 None for an exempt request, which always runs on its own
+            call: Zero-argument coroutine function making the call
+
+        Returns:
+            The call's result
+        """
+        if key is None:
+            with self._lock:
+                self.stats["exempt"] += 1
+            return await call()
+
+        while True:
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                waiters = self._in_flight.get(key)
+                if waiters is None:
+                    self._in_flight[key] = []
+                    self.stats["calls"] += 1
+                    future = None
+                else:
+                    future = loop.create_future()
+                    waiters.append((loop, future))
+
+            if future is None:
+                return await self._lead(key, call)
+
+            outcome = await future
+            if outcome is _LEADER_CANCELLED:
+                continue
+            with self._lock:
+                self.stats["coalesced"] += 1
+            error, result = outcome
+            if error is not None:
+                raise error
+            return copy.deepcopy(result)
+
+    async def _lead(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._finish(key, _LEADER_CANCELLED)
+            raise
+        except Exception as e:
+            self._finish(key, (e, None))
+            raise
+        self._finish(key, (None, result))
+        return result
+
+    def _finish(self, key: str, outcome):
+        with self._lock:
+            waiters = self._in_flight.pop(key, [])
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, outcome)
+            except RuntimeError:
+                pass  # Waiter's event loop already closed
+
+
+def _resolve(future: asyncio.Future, outcome):
+    if not future.done():
+        future.set_result(outcome)
+
+
+class CoalescingAPIClient:
+    """Routes an APIClient's calls through a RequestCoalescer.
+
+    One instance per session pass. The n-th identical request of this pass is
+    keyed as (request hash, n), so it only joins the n-th identical request of
+    another session: reviewers inside one pass that happen to send the same
+    prompt still get independent samples.
+
+    Exposes the same interface as APIClient; attributes it does not define
+    are read from the wrapped client.
+    """
+
+    def __init__(self, api_client, coalescer: RequestCoalescer):
+        """Initialize the coalescing client.
+
+        Args:
+            api_client: Client that makes the actual calls
+            coalescer: Coalescer shared by the concurrent sessions
+        """
+        self.api_client = api_client
+        self.coalescer = coalescer
+        self.coalesced_calls = 0
+        self._occurrences: Dict[str, int] = defaultdict(int)
+
+    def __getattr__(self, name):
+        return getattr(self.api_client, name)
+
+    def request_key(self, prompt: str, system_prompt: str, temperature: float,
+                    max_tokens: int, model: Optional[str]) -> str:
+        """Coalescing key: request hash plus its occurrence number in this pass."""
+        digest = request_hash(prompt, system_prompt, temperature, max_tokens,
+                              model or getattr(self.api_client, "model", None))
+        occurrence = self._occurrences[digest]
+        self._occurrences[digest] += 1
+        return f"{digest}:{occurrence}"
+
+    async def call_api_async(self, prompt: str, system_prompt: str,
+                             temperature: float = 0.7,
+                             max_tokens: int = 2000,
+                             model: Optional[str] = None) -> Dict[str, Any]:
+        """Make an API call, sharing it with identical concurrent calls from other sessions."""
+        key = None
+        if not self.coalescer.is_exempt(system_prompt):
+            key = self.request_key(prompt, system_prompt, temperature, max_tokens, model)
+        sent = []
+
+        def call():
+            sent.append(True)
+            return self.api_client.call_api_async(prompt, system_prompt, temperature,
+                                                  max_tokens, model=model)
+
+        result = await self.coalescer.run(key, call)
+        if not sent:
+            self.coalesced_calls += 1
+        return result
+
+
+_global_coalescer: Optional[RequestCoalescer] = None
+_global_coalescer_lock = threading.Lock()
+
+
+def get_global_coalescer() -> RequestCoalescer:
+    """Return the process-wide coalescer, creating it on first use."""
+    global _global_coalescer
+    with _global_coalescer_lock:
+        if _global_coalescer is None:
+            _global_coalescer = RequestCoalescer()
+        return _global_coalescer
@@ -0,0 +1,198 @@
+"""
+Deadline-aware hedged requests for review passes.
+A pass is only as fast as its slowest agent. Once an agent has been waiting
+longer than the pass's running p90 latency, a duplicate request is sent; the
+first response wins and the others are cancelled. Every agent also has a hard
+deadline taken from the pass's latency SLO.
+
+Latencies are measured from the moment a call is sent, so a HedgedAPIClient
+belongs inside the scheduler's slot (wrapped by ScheduledAPIClient): time spent
+queued for a slot is neither hedged against nor counted towards the SLO.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values (pct in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return len(text) // 4
+
+
+class PassLatencyTracker:
+    """Latency and hedging statistics for one review pass."""
+
+    def __init__(self, slo_seconds: Optional[float] = None):
+        """Initialize the tracker.
+
+        Args:
+            slo_seconds: Per-agent deadline for the pass (None for no deadline)
+        """
+        self.slo_seconds = slo_seconds
+        self.latencies: List[float] = []
+        self.agents = 0
+        self.hedged_agents = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.deadline_misses = 0
+        self.wasted_tokens = 0
+
+    def record(self, latency: float):
+        """Record the latency of a completed agent call."""
+        self.latencies.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Running latency percentile of completed agents."""
+        return percentile(self.latencies, pct)
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency percentiles and hedging counters for session output."""
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+
+        return {
+            "agents": self.agents,
+            "completed": len(self.latencies),
+            "slo_seconds": self.slo_seconds,
+            "p50_seconds": rounded(self.percentile(50)),
+            "p95_seconds": rounded(self.percentile(95)),
+            "p99_seconds": rounded(self.percentile(99)),
+            "hedge_rate": round(self.hedged_agents / self.agents, 3) if self.agents else 0.0,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "deadline_misses": self.deadline_misses,
+            "wasted_tokens": self.wasted_tokens
+        }
+
+
+class HedgedAPIClient:
+    """Wraps an APIClient with per-agent deadlines and hedged duplicate calls.
+
+    Exposes the same interface as APIClient, so it can be handed to a
+    ReviewerPool in its place. Attributes it does not define (model,
+    validate_response, parse_content, ...) are read from the wrapped client.
+    Under a scheduler, wrap it in the ScheduledAPIClient rather than the other
+    way round, so a call's clock starts when it gets its slot.
+    """
+
+    def __init__(self, api_client, tracker: PassLatencyTracker,
+                 hedge_percentile: float = 90,
+                 min_samples: int = 3,
+                 max_hedges: int = 1,
+                 poll_interval: float = 0.05):
+        """Initialize the hedged client.
+
+        Args:
+            api_client: Client that makes the actual calls
+            tracker: Latency tracker for the pass (shared by all its agents)
+            hedge_percentile: Hedge once an agent has waited this running percentile
+            min_samples: Completed agents needed before the percentile is trusted
+            max_hedges: Duplicate requests allowed per agent
+            poll_interval: Seconds between checks while waiting to hedge
+        """
+        self.api_client = api_client
+        self.tracker = tracker
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.poll_interval = poll_interval
+
+    def __getattr__(self, name):
+        return getattr(self.api_client, name)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while too few agents have finished."""
+        if len(self.tracker.latencies) < self.min_samples:
+            return None
+        return self.tracker.percentile(self.hedge_percentile)
+
+    async def call_api_async(self, prompt: str, system_prompt: str,
+                             temperature: float = 0.7,
+                             max_tokens: int = 2000,
+                             model: Optional[str] = None) -> Dict[str, Any]:
+        """Make a call, hedging it if it runs past the pass's running p90.
+
+        Raises:
+            asyncio.TimeoutError: If no response arrives before the pass SLO
+        """
+        tracker = self.tracker
+        tracker.agents += 1
+        request_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        sent = []
+
+        async def attempt():
+            sent.append(True)
+            return await self.api_client.call_api_async(prompt, system_prompt, temperature,
+                                                        max_tokens, model=model)
+
+        def launch():
+            return asyncio.ensure_future(attempt())
+
+        start = time.monotonic()
+        attempts = [launch()]
+        pending = set(attempts)
+        winner = None
+
+        try:
+            while winner is None:
+                elapsed = time.monotonic() - start
+                wait_for = self.poll_interval
+
+                if tracker.slo_seconds is not None:
+                    remaining = tracker.slo_seconds - elapsed
+                    if remaining <= 0:
+                        tracker.deadline_misses += 1
+                        raise asyncio.TimeoutError(
+                            f"No response within the {tracker.slo_seconds}s pass SLO"
+                        )
+                    wait_for = min(wait_for, remaining)
+
+                delay = self.hedge_delay()
+                if delay is not None and len(attempts) <= self.max_hedges:
+                    if elapsed >= delay:
+                        if len(attempts) == 1:
+                            tracker.hedged_agents += 1
+                        hedge = launch()
+                        attempts.append(hedge)
+                        pending.add(hedge)
+                        continue
+                    wait_for = min(wait_for, delay - elapsed)
+
+                done, pending = await asyncio.wait(pending, timeout=max(wait_for, 0),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in attempts:
+                    if task in done and task.exception() is None:
+                        winner = task
+                        break
+
+                if winner is None and not pending:
+                    # Every attempt failed (each already retried inside the client)
+                    raise attempts[0].exception()
+
+            tracker.record(time.monotonic() - start)
+            if winner is not attempts[0]:
+                tracker.hedge_wins += 1
+            return winner.result()
+
+        finally:
+            # Duplicate requests are paid for even when they lose: a call
+            # running in an executor thread still completes upstream after
+            # its task is cancelled. A hedge cancelled before it started was
+            # never sent and costs nothing.
+            hedges_sent = max(0, len(sent) - 1)
+            tracker.hedges_sent += hedges_sent
+            tracker.wasted_tokens += request_tokens * hedges_sent
+            for task in attempts:
+                if task is not winner:
+                    task.cancel()
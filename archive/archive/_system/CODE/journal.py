@@ -0,0 +1,166 @@
+"""
+Append-only checkpoint journal for review sessions.
+Every finished agent is written to disk as soon as its response arrives, so
+an interrupted session can be resumed without calling those agents again.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import ModuleContent, ReviewFeedback, ReviewPass
+from .reviewers import get_project_root
+
+
+class JournalEvent:
+    """Record types written to a session journal."""
+    SESSION_START = "session_start"
+    AGENT_DONE = "agent_done"
+    PASS_DONE = "pass_done"
+    SESSION_DONE = "session_done"
+
+
+class SessionJournal:
+    """JSONL journal of one review session.
+
+    One record per line, only ever appended. A record that was cut short by a
+    crash is dropped when the journal is opened again, so the next record starts
+    on a line of its own.
+    """
+
+    def __init__(self, session_id: str, journal_dir: Optional[str] = None):
+        """Open (or create) the journal for a session.
+
+        Args:
+            session_id: ReviewSession ID the journal belongs to
+            journal_dir: Directory holding journals (default: sessions/ in project root)
+        """
+        if journal_dir is None:
+            journal_dir = str(get_project_root() / "sessions")
+        self.session_id = session_id
+        self.path = Path(journal_dir) / f"{session_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._drop_partial_record()
+
+    @classmethod
+    def exists(cls, session_id: str, journal_dir: Optional[str] = None) -> bool:
+        """Check whether a journal has been written for a session."""
+        if journal_dir is None:
+            journal_dir = str(get_project_root() / "sessions")
+        return (Path(journal_dir) / f"{session_id}.jsonl").exists()
+
+    def record_start(self, module: ModuleContent, author_experience: str):
+        """Record the module under review so a resume can rebuild it."""
+        self._append({
+            "event": JournalEvent.SESSION_START,
+            "module": {
+                "content": module.content,
+                "module_id": module.module_id,
+                "title": module.title,
+                "author": module.author
+            },
+            "author_experience": author_experience
+        })
+
+    def record_agent(self, review_pass: ReviewPass, reviewer_id: str,
+                     raw_response: Dict[str, Any], feedback: List[ReviewFeedback]):
+        """Record a finished agent's raw response and parsed feedback."""
+        self._append({
+            "event": JournalEvent.AGENT_DONE,
+            "review_pass": review_pass.value,
+            "reviewer_id": reviewer_id,
+            "raw_response": raw_response,
+            "feedback": [f.to_dict() for f in feedback]
+        })
+
+    def record_pass_complete(self, review_pass: ReviewPass,
+                             metrics: Optional[Dict[str, Any]] = None):
+        """Record that a pass finished and its report was generated."""
+        record = {"event": JournalEvent.PASS_DONE, "review_pass": review_pass.value}
+        if metrics:
+            record["metrics"] = metrics
+        self._append(record)
+
+    def record_session_complete(self):
+        """Record that every pass of the session finished."""
+        self._append({"event": JournalEvent.SESSION_DONE})
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Read every complete record in the journal."""
+        if not self.path.exists():
+            return []
+
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Partial line from a crash mid-write
+                    continue
+        return records
+
+    def load_start(self) -> Dict[str, Any]:
+        """Return the module and author experience recorded at session start.
+
+        Raises:
+            ValueError: If the journal has no session_start record
+        """
+        for record in self.read():
+            if record["event"] == JournalEvent.SESSION_START:
+                return {
+                    "module": ModuleContent(**record["module"]),
+                    "author_experience": record.get("author_experience", "new")
+                }
+        raise ValueError(f"Journal {self.path} has no session_start record")
+
+    def completed_agents(self, review_pass: ReviewPass) -> Dict[str, List[ReviewFeedback]]:
+        """Feedback of every agent already recorded for a pass, keyed by reviewer ID."""
+        completed = {}
+        for record in self.read():
+            if record["event"] == JournalEvent.AGENT_DONE and \
+                    record["review_pass"] == review_pass.value:
+                completed[record["reviewer_id"]] = [
+                    ReviewFeedback.from_dict(f) for f in record["feedback"]
+                ]
+        return completed
+
+    def completed_passes(self) -> List[ReviewPass]:
+        """Passes recorded as complete, in the order they finished."""
+        return [ReviewPass(record["review_pass"]) for record in self.read()
+                if record["event"] == JournalEvent.PASS_DONE]
+
+    def is_complete(self) -> bool:
+        """Check whether the session ran to completion."""
+        return any(record["event"] == JournalEvent.SESSION_DONE for record in self.read())
+
+    def _drop_partial_record(self):
+        """Truncate the journal after its last complete line (a crash mid-write leaves no "\n")."""
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                chunk_start = max(0, position - 4096)
+                f.seek(chunk_start)
+                newline = f.read(position - chunk_start).rfind(b"\n")
+                if newline != -1:
+                    position = chunk_start + newline + 1
+                    break
+                position = chunk_start
+            if position < end:
+                f.truncate(position)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append(self, record: Dict[str, Any]):
+        """Append one record and flush it to disk."""
+        record = {"timestamp": datetime.now().isoformat(), "session_id": self.session_id, **record}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
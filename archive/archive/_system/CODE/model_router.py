@@ -0,0 +1,372 @@
+"""
+Cost-aware model routing per agent role.
+Maps each agent's role and competency to a model tier and max_tokens using the
+<model_routing> table in agent_configuration.xml, tracks latency and cost per
+tier, and moves routes between tiers based on precision observed in the
+feedback loop.
+"""
+
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import ReviewerConfig
+from .reviewers import XMLConfigLoader, get_project_root
+from .hedging import estimate_tokens, percentile
+
+
+@dataclass
+class ModelTier:
+    """A model and its price per 1k tokens."""
+    name: str
+    model: str
+    input_cost_per_1k: float = 0.0
+    output_cost_per_1k: float = 0.0
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Cost in dollars of a call with the given token counts."""
+        return (input_tokens * self.input_cost_per_1k +
+                output_tokens * self.output_cost_per_1k) / 1000
+
+
+@dataclass
+class RouteRule:
+    """One row of the routing table."""
+    role: str
+    competency: str
+    tier: str
+    max_tokens: int
+    focus_areas: List[str] = field(default_factory=list)
+    issue_types: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.role}:{self.competency}"
+
+
+@dataclass
+class ModelRoute:
+    """The model an agent is routed to."""
+    rule_key: str
+    tier: ModelTier
+    max_tokens: int
+
+    @property
+    def model(self) -> str:
+        return self.tier.model
+
+
+class ModelRouter:
+    """Routes agents to model tiers and adapts the routes to observed precision.
+
+    Rules are matched on (role, competency), then on a rule's text-mode
+    focus_areas, then (role, "*"), then the table's default. A route whose
+    precision over at least min_samples validated disputes reaches
+    downgrade_precision moves one tier cheaper; one that falls below
+    upgrade_precision moves one tier up. Tier changes are saved to a
+    state file, and only feedback validated after a route's last change counts
+    towards its next move.
+    """
+
+    def __init__(self, xml_loader: Optional[XMLConfigLoader] = None,
+                 state_path: Optional[str] = None):
+        """Load the routing table.
+
+        Args:
+            xml_loader: Loader for agent_configuration.xml (default: config/ in project root)
+            state_path: JSON file holding tier changes (default: feedback/model_routing.json)
+
+        Raises:
+            ValueError: If the configuration has no <model_routing> section
+        """
+        xml_loader = xml_loader or XMLConfigLoader()
+        routing = xml_loader.load_agent_configuration().find('model_routing')
+        if routing is None:
+            raise ValueError("Agent configuration has no <model_routing> section")
+
+        # Tiers in document order, cheapest first
+        self.tiers: List[ModelTier] = [
+            ModelTier(
+                name=tier.get('name'),
+                model=tier.get('model'),
+                input_cost_per_1k=float(tier.get('input_cost_per_1k', '0')),
+                output_cost_per_1k=float(tier.get('output_cost_per_1k', '0'))
+            )
+            for tier in routing.findall('./tiers/tier')
+        ]
+        self._tiers_by_name = {tier.name: tier for tier in self.tiers}
+
+        routes = routing.find('routes')
+        self.default_tier = routes.get('default_tier', self.tiers[-1].name)
+        self.default_max_tokens = int(routes.get('default_max_tokens', '2000'))
+        self.rules: Dict[str, RouteRule] = {}
+        for route in routes.findall('route'):
+            rule = RouteRule(
+                role=route.get('role'),
+                competency=route.get('competency', '*'),
+                tier=route.get('tier'),
+                max_tokens=int(route.get('max_tokens', self.default_max_tokens)),
+                focus_areas=_split(route.get('focus_areas', '')),
+                issue_types=_split(route.get('issue_types', ''))
+            )
+            self.rules[rule.key] = rule
+
+        adaptation = routing.find('adaptation')
+        self.min_samples = int(adaptation.findtext('min_samples', '20'))
+        self.downgrade_precision = float(adaptation.findtext('downgrade_precision', '0.95'))
+        self.upgrade_precision = float(adaptation.findtext('upgrade_precision', '0.80'))
+
+        if state_path is None:
+            state_path = str(get_project_root() / "feedback" / "model_routing.json")
+        self.state_path = Path(state_path)
+        self.overrides: Dict[str, Dict[str, str]] = self._load_state()
+
+        self.usage: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "latencies": [], "input_tokens": 0,
+                     "output_tokens": 0, "cost": 0.0}
+        )
+        self.outcomes: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"confirmed": 0, "false_positive": 0}
+        )
+        self._counted_feedback = set()
+
+    def rule_for(self, role: str, competency: str) -> Optional[RouteRule]:
+        """Most specific rule for an agent, or None to use the default."""
+        rule = self.rules.get(f"{role}:{competency}")
+        if rule:
+            return rule
+        for rule in self.rules.values():
+            if rule.role == role and competency in rule.focus_areas:
+                return rule
+        return self.rules.get(f"{role}:*")
+
+    def route(self, role: str, competency: str) -> ModelRoute:
+        """Resolve the tier and max_tokens for an agent.
+
+        Args:
+            role: ReviewerRole value ("authoring" or "style")
+            competency: Competency name, or the generalist focus area
+
+        Returns:
+            ModelRoute with the tier currently in effect
+        """
+        rule = self.rule_for(role, competency)
+        if rule is None:
+            return ModelRoute("default", self._tiers_by_name[self.default_tier],
+                              self.default_max_tokens)
+        return ModelRoute(rule.key, self._tiers_by_name[self.current_tier(rule.key)],
+                          rule.max_tokens)
+
+    def apply(self, config: ReviewerConfig) -> ReviewerConfig:
+        """Set a reviewer's model and max_tokens from its route."""
+        route = self.route(config.role.value, config.focus_area)
+        config.model = route.model
+        config.max_tokens = route.max_tokens
+        return config
+
+    def current_tier(self, rule_key: str) -> str:
+        """Tier in effect for a rule, including adaptive changes."""
+        override = self.overrides.get(rule_key)
+        if override:
+            return override["tier"]
+        return self.rules[rule_key].tier
+
+    def tier_for_model(self, model: str) -> Optional[ModelTier]:
+        """Tier a model belongs to."""
+        for tier in self.tiers:
+            if tier.model == model:
+                return tier
+        return None
+
+    def record_call(self, model: str, latency: float,
+                    input_tokens: int, output_tokens: int):
+        """Record the latency and token use of one agent call."""
+        tier = self.tier_for_model(model)
+        name = tier.name if tier else model
+        usage = self.usage[name]
+        usage["calls"] += 1
+        usage["latencies"].append(latency)
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
+        if tier:
+            usage["cost"] += tier.cost(input_tokens, output_tokens)
+
+    def record_outcome(self, rule_key: str, confirmed: bool):
+        """Record whether an issue flagged by a route's agents was real."""
+        self.outcomes[rule_key]["confirmed" if confirmed else "false_positive"] += 1
+
+    def rule_for_issue_type(self, issue_type: str) -> Optional[RouteRule]:
+        """Rule whose issue_types match an issue's type."""
+        issue_type = (issue_type or "").lower()
+        for rule in self.rules.values():
+            if any(t in issue_type for t in rule.issue_types):
+                return rule
+        return None
+
+    def load_feedback(self, feedback_loop) -> int:
+        """Count validated author disputes as precision outcomes.
+
+        A dispute the human reviewer judged valid means the flagged issue was
+        a false positive; one judged invalid means the issue was real. Partial
+        judgments and disputes validated before a route's last tier change are
+        skipped.
+
+        Args:
+            feedback_loop: FeedbackLoop holding validated disputes
+
+        Returns:
+            Number of outcomes counted
+        """
+        counted = 0
+        for feedback_id, item in feedback_loop.validations.items():
+            if feedback_id in self._counted_feedback or \
+                    item.reviewer_judgment not in ("valid", "invalid"):
+                continue
+
+            rule = self.rule_for_issue_type(item.original_issue.get("issue_type", ""))
+            if rule is None:
+                continue
+
+            since = self.overrides.get(rule.key, {}).get("since")
+            if since and item.validation_timestamp and \
+                    item.validation_timestamp < datetime.fromisoformat(since):
+                continue
+
+            self.record_outcome(rule.key, confirmed=item.reviewer_judgment == "invalid")
+            self._counted_feedback.add(feedback_id)
+            counted += 1
+
+        return counted
+
+    def precision(self, rule_key: str) -> Optional[float]:
+        """Observed precision of a route, or None without outcomes."""
+        outcomes = self.outcomes.get(rule_key)
+        if not outcomes:
+            return None
+        total = outcomes["confirmed"] + outcomes["false_positive"]
+        return outcomes["confirmed"] / total if total else None
+
+    def adapt(self) -> List[Dict[str, Any]]:
+        """Move routes one tier up or down based on observed precision.
+
+        Returns:
+            One entry per route that changed tier
+        """
+        names = [tier.name for tier in self.tiers]
+        changes = []
+
+        for rule_key in self.rules:
+            outcomes = self.outcomes.get(rule_key)
+            if not outcomes or sum(outcomes.values()) < self.min_samples:
+                continue
+
+            precision = self.precision(rule_key)
+            current = self.current_tier(rule_key)
+            index = names.index(current)
+            if precision >= self.downgrade_precision and index > 0:
+                new_tier = names[index - 1]
+            elif precision < self.upgrade_precision and index < len(names) - 1:
+                new_tier = names[index + 1]
+            else:
+                continue
+
+            self.overrides[rule_key] = {"tier": new_tier, "since": datetime.now().isoformat()}
+            del self.outcomes[rule_key]
+            changes.append({
+                "route": rule_key,
+                "from_tier": current,
+                "to_tier": new_tier,
+                "precision": round(precision, 3),
+                "samples": sum(outcomes.values())
+            })
+            arrow = "⬇️" if names.index(new_tier) < index else "⬆️"
+            print(f"   {arrow}  {rule_key}: {current} → {new_tier} (precision {precision:.0%})")
+
+        if changes:
+            self._save_state()
+        return changes
+
+    def summary(self) -> Dict[str, Any]:
+        """Calls, latency and estimated cost per tier."""
+        tiers = {}
+        for name, usage in self.usage.items():
+            p50 = percentile(usage["latencies"], 50)
+            p95 = percentile(usage["latencies"], 95)
+            tiers[name] = {
+                "calls": usage["calls"],
+                "p50_seconds": round(p50, 3) if p50 is not None else None,
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "input_tokens": usage["input_tokens"],
+                "output_tokens": usage["output_tokens"],
+                "estimated_cost": round(usage["cost"], 4)
+            }
+        return {
+            "tiers": tiers,
+            "estimated_cost": round(sum(u["cost"] for u in self.usage.values()), 4),
+            "routes": {key: self.current_tier(key) for key in self.rules}
+        }
+
+    def _load_state(self) -> Dict[str, Dict[str, str]]:
+        """Load saved tier changes, dropping any for unknown rules or tiers."""
+        if not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not load model routing state: {e}")
+            return {}
+        return {key: override for key, override in state.get("overrides", {}).items()
+                if key in self.rules and override.get("tier") in self._tiers_by_name}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({"overrides": self.overrides}, f, indent=2)
+
+
+def _split(value: str) -> List[str]:
+    """Split a comma-separated XML attribute."""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class RoutedAPIClient:
+    """Records each call's latency, tokens and cost against its model tier.
+
+    Exposes the same interface as APIClient; attributes it does not define
+    are read from the wrapped client.
+    """
+
+    def __init__(self, api_client, router: ModelRouter):
+        """Initialize the routed client.
+
+        Args:
+            api_client: Client that makes the actual calls
+            router: Router collecting per-tier usage
+        """
+        self.api_client = api_client
+        self.router = router
+
+    def __getattr__(self, name):
+        return getattr(self.api_client, name)
+
+    async def call_api_async(self, prompt: str, system_prompt: str,
+                             temperature: float = 0.7,
+                             max_tokens: int = 2000,
+                             model: Optional[str] = None) -> Dict[str, Any]:
+        """Make an API call and record its usage."""
+        start = time.monotonic()
+        response = await self.api_client.call_api_async(
+            prompt, system_prompt, temperature, max_tokens, model=model
+        )
+        self.router.record_call(
+            model or getattr(self.api_client, "model", "gpt-4"),
+            time.monotonic() - start,
+            estimate_tokens(system_prompt) + estimate_tokens(prompt),
+            estimate_tokens(json.dumps(response))
+        )
+        return response
@@ -113,6 +113,20 @@ class ReviewFeedback:
             "timestamp": self.timestamp.isoformat()
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReviewFeedback":
+        """Rebuild feedback from its dictionary format."""
+        return cls(
+            reviewer_id=data["reviewer_id"],
+            issue_type=data["issue_type"],
+            severity=data["severity"],
+            location=data["location"],
+            issue=data["issue"],
+            suggestion=data["suggestion"],
+            confidence_contribution=data.get("confidence_contribution", 1.0),
+            timestamp=datetime.fromisoformat(data["timestamp"]) if "timestamp" in data else datetime.now()
+        )
+
     def to_student_success_framing(self) -> str:
         """Convert feedback to student-success framing.
         Focus on CONTENT quality (not author evaluation).
@@ -185,6 +199,12 @@ class ReviewReport:
     strengths: List[str]
     estimated_revision_time: int  # in minutes
     author_experience_level: str = "new"
+    agent_modes: Dict[str, str] = field(default_factory=dict)  # reviewer_id -> "api" | "degraded"
+
+    @property
+    def degraded_agents(self) -> List[str]:
+        """Reviewers that ran rule-based checks because the AI backend was unavailable."""
+        return [agent for agent, mode in self.agent_modes.items() if mode == "degraded"]
 
     def get_priority_matrix(self) -> Dict[str, List[ConsensusResult]]:
         """Organize issues into priority matrix."""
@@ -225,6 +245,7 @@ class ReviewReport:
             "consensus_results": [r.to_dict() for r in self.consensus_results],
             "strengths": self.strengths,
             "estimated_revision_time": self.estimated_revision_time,
+            "agent_modes": self.agent_modes,
             "priority_matrix": {
                 k: [r.to_dict() for r in v]
                 for k, v in self.get_priority_matrix().items()
@@ -242,6 +263,8 @@ class ReviewSession:
     all_feedback: List[ReviewFeedback] = field(default_factory=list)
     reports: List[ReviewReport] = field(default_factory=list)
     api_calls_made: int = 0
+    pass_metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Latency/hedging per pass
+    warmup_seconds: float = 0.0  # Building reviewer pools and opening connections before Pass 1
 
     def __post_init__(self):
         """Initialize session ID if not provided."""
@@ -277,6 +300,52 @@ class ReviewSession:
         prefix = pass_prefixes.get(review_pass, "")
         return [f for f in self.all_feedback if f.reviewer_id.startswith(prefix)]
 
+@dataclass
+class AgentRequest:
+    """A single agent call, detached from the reviewer object that built it.
+
+    Used wherever agent calls leave the process (batch job files, work queues)
+    and have to be matched back to their reviewer afterwards.
+    """
+    request_id: str
+    module_id: str
+    review_pass: ReviewPass
+    reviewer_id: str
+    system_prompt: str
+    prompt: str
+    model: str = "gpt-4"
+    temperature: float = 0.7
+    max_tokens: int = 2000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert request to dictionary format."""
+        return {
+            "request_id": self.request_id,
+            "module_id": self.module_id,
+            "review_pass": self.review_pass.value,
+            "reviewer_id": self.reviewer_id,
+            "system_prompt": self.system_prompt,
+            "prompt": self.prompt,
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentRequest":
+        """Rebuild a request from its dictionary format."""
+        return cls(
+            request_id=data["request_id"],
+            module_id=data["module_id"],
+            review_pass=ReviewPass(data["review_pass"]),
+            reviewer_id=data["reviewer_id"],
+            system_prompt=data["system_prompt"],
+            prompt=data["prompt"],
+            model=data.get("model", "gpt-4"),
+            temperature=data.get("temperature", 0.7),
+            max_tokens=data.get("max_tokens", 2000)
+        )
+
 @dataclass
 class ReviewerConfig:
     """Configuration for individual AI reviewers."""
@@ -287,6 +356,7 @@ class ReviewerConfig:
     prompt_variation: str = ""
     temperature: float = 0.7
     max_tokens: int = 2000
+    model: Optional[str] = None  # None uses the API client's model
 
     def get_system_prompt(self, product_vision: str, guidelines: str) -> str:
         """Generate the system prompt for this reviewer."""
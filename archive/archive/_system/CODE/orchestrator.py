@@ -4,7 +4,8 @@ Coordinates the 4-pass review process with 60 AI reviewers.
 """
 
 import asyncio
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime
 import os
 import json
@@ -16,20 +17,79 @@ from .models import (
 from .reviewers import ReviewerPool, APIClient, get_project_root
 from .aggregator import ConsensusAggregator
 from .report_generator import ReportGenerator
+from .batch import BatchRunner
+from .task_queue import QueueRunner
+from .journal import SessionJournal
+from .hedging import HedgedAPIClient, PassLatencyTracker
+from .scheduler import GlobalAgentScheduler, ScheduledAPIClient, get_global_scheduler
+from .model_router import ModelRouter, RoutedAPIClient
+from .feedback_loop import FeedbackLoop
+from .coalescing import CoalescingAPIClient, RequestCoalescer, get_global_coalescer
+from .circuit_breaker import CircuitBreaker
 
 
 class RevisionOrchestrator:
     """Orchestrates the complete AI revision process."""
 
+    # Per-agent deadline (seconds) for each pass
+    DEFAULT_PASS_SLOS = {
+        ReviewPass.CONTENT_PASS_1: 120.0,
+        ReviewPass.CONTENT_PASS_2: 120.0,
+        ReviewPass.COPY_PASS_1: 90.0,
+        ReviewPass.COPY_PASS_2: 90.0
+    }
+
     def __init__(self, api_key: Optional[str] = None,
-                 output_dir: str = None):
-        """Initialize the orchestrator."""
+                 output_dir: str = None,
+                 journal_dir: str = None,
+                 hedge_requests: bool = True,
+                 pass_slos: Optional[Dict[ReviewPass, float]] = None,
+                 scheduler: Optional[GlobalAgentScheduler] = None,
+                 model_router: Optional[ModelRouter] = None,
+                 feedback_loop: Optional[FeedbackLoop] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 coalesce_requests: bool = True,
+                 coalescer: Optional[RequestCoalescer] = None,
+                 warm_connections: int = 8):
+        """Initialize the orchestrator.
+
+        Args:
+            api_key: OpenAI API key (falls back to OPENAI_API_KEY)
+            output_dir: Directory for saved reports (default: reports/ in project root)
+            journal_dir: Directory for session checkpoint journals (default: sessions/ in project root)
+            hedge_requests: Send a duplicate request for agents slower than the pass's running p90
+            pass_slos: Per-agent deadline in seconds by pass (default: DEFAULT_PASS_SLOS)
+            scheduler: Scheduler shared with other sessions (default: the process-wide one)
+            model_router: Routes each agent to a model tier (default: every agent on the client's model)
+            feedback_loop: Validated disputes the model router adapts its routes to at
+                           session start (default: FeedbackLoop() when model_router is set)
+            circuit_breaker: Breaker that switches agents to rule-based checks during
+                             backend outages (default: a new CircuitBreaker())
+            coalesce_requests: Share identical in-flight agent calls with concurrent sessions
+            coalescer: Coalescer shared with other sessions (default: the process-wide one)
+            warm_connections: Backend connections opened before Pass 1 (0 to skip)
+        """
         if output_dir is None:
             output_dir = str(get_project_root() / "reports")
+        if journal_dir is None:
+            journal_dir = str(get_project_root() / "sessions")
         self.api_client = APIClient(api_key)
+        self.scheduler = scheduler or get_global_scheduler()
+        self.api_client.rate_limit_listener = self.scheduler.report_rate_limit
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.api_client.circuit_breaker = self.circuit_breaker
         self.aggregator = ConsensusAggregator()
         self.report_generator = ReportGenerator()
         self.output_dir = output_dir
+        self.journal_dir = journal_dir
+        self.hedge_requests = hedge_requests
+        self.warm_connections = warm_connections
+        self.coalescer = (coalescer or get_global_coalescer()) if coalesce_requests else None
+        self.model_router = model_router
+        self.feedback_loop = feedback_loop
+        self.pass_slos = dict(self.DEFAULT_PASS_SLOS)
+        if pass_slos:
+            self.pass_slos.update(pass_slos)
         os.makedirs(output_dir, exist_ok=True)
 
         # Define reviewer counts for 4-pass system
@@ -41,9 +101,14 @@ class RevisionOrchestrator:
         }
 
     async def run_complete_review_async(self, module: ModuleContent,
-                                       author_experience: str = "new") -> ReviewSession:
+                                       author_experience: str = "new",
+                                       session_id: Optional[str] = None) -> ReviewSession:
         """Run the complete 4-pass review process with author resubmit between passes.
 
+        Every finished agent is checkpointed to the session journal. If a
+        journal already exists for session_id, agents recorded in it are not
+        called again (see resume_review_async).
+
         PASS 1: 20 agents review content + style (independent)
         → Author revises and resubmits
         PASS 2: Different 20 agents review content + style (independent)
@@ -56,12 +121,20 @@ class RevisionOrchestrator:
         → Human copy editor checkpoint (author can dispute, human has final say)
         → Feedback loop collects model failures
         """
-        session = ReviewSession(module=module)
+        session = ReviewSession(module=module, session_id=session_id or "")
+        resuming = SessionJournal.exists(session.session_id, self.journal_dir)
+        journal = SessionJournal(session.session_id, self.journal_dir)
+        if not resuming:
+            journal.record_start(module, author_experience)
 
         print(f"\n{'='*70}")
-        print(f"✨ Starting AI Review Session for Module: {module.module_id}")
+        print(f"✨ {'Resuming' if resuming else 'Starting'} AI Review Session for Module: {module.module_id}")
+        print(f"   Session: {session.session_id} (journal: {journal.path})")
         print(f"{'='*70}\n")
 
+        self._adapt_model_routes()
+        pools = await self._warm_up_session(session)
+
         # ==================== ROUND 1: CONTENT REVIEW ====================
         print("📚 ROUND 1: CONTENT & STYLE REVIEW")
         print("="*70)
@@ -71,7 +144,8 @@ class RevisionOrchestrator:
         print("   10 agents: Pedagogical quality ONLY (authoring guidelines)")
         print("   10 agents: Writing mechanics ONLY (style guidelines)")
         pass1_report = await self._run_pass(
-            module, ReviewPass.CONTENT_PASS_1, session, author_experience
+            module, ReviewPass.CONTENT_PASS_1, session, author_experience, journal=journal,
+            pool=pools[ReviewPass.CONTENT_PASS_1]
         )
         self._save_report(pass1_report, "pass1_content")
         self._display_summary(pass1_report)
@@ -86,7 +160,8 @@ class RevisionOrchestrator:
         print("   10 agents: Writing mechanics ONLY (style guidelines)")
         print("   Fresh review with NO knowledge of Pass 1 results")
         pass2_report = await self._run_pass(
-            module, ReviewPass.CONTENT_PASS_2, session, author_experience
+            module, ReviewPass.CONTENT_PASS_2, session, author_experience, journal=journal,
+            pool=pools[ReviewPass.CONTENT_PASS_2]
         )
         self._save_report(pass2_report, "pass2_content")
         self._display_summary(pass2_report)
@@ -109,7 +184,8 @@ class RevisionOrchestrator:
         print("\n🔍 PASS 3: Initial Copy Edit (10 independent agents)...")
         print("   Focus ONLY on style/mechanical issues (NO pedagogy)")
         pass3_report = await self._run_pass(
-            module, ReviewPass.COPY_PASS_1, session, author_experience
+            module, ReviewPass.COPY_PASS_1, session, author_experience, journal=journal,
+            pool=pools[ReviewPass.COPY_PASS_1]
         )
         self._save_report(pass3_report, "pass3_copy")
         self._display_summary(pass3_report)
@@ -122,7 +198,8 @@ class RevisionOrchestrator:
         print("🔍 PASS 4: Re-review Copy Edit (10 DIFFERENT independent agents)...")
         print("   Fresh review with NO knowledge of Pass 3 results")
         pass4_report = await self._run_pass(
-            module, ReviewPass.COPY_PASS_2, session, author_experience
+            module, ReviewPass.COPY_PASS_2, session, author_experience, journal=journal,
+            pool=pools[ReviewPass.COPY_PASS_2]
         )
         self._save_report(pass4_report, "pass4_copy")
         self._display_summary(pass4_report)
@@ -143,20 +220,100 @@ class RevisionOrchestrator:
         self._generate_final_assessment(pass4_report)
 
         session.complete_session()
-        print(f"\n✅ All 4 passes completed in {session.get_duration_minutes():.1f} minutes")
+        journal.record_session_complete()
+        print(f"\n✅ All 4 passes completed in {session.get_duration_minutes():.1f} minutes "
+              f"(warm-up {session.warmup_seconds:.1f}s)")
         print(f"📊 Total API calls made: {session.api_calls_made}")
         print(f"   (Pass 1: 20 + Pass 2: 20 + Pass 3: 10 + Pass 4: 10 = 60 total)\n")
 
         return session
 
     def run_complete_review(self, module: ModuleContent,
-                           author_experience: str = "new") -> ReviewSession:
+                           author_experience: str = "new",
+                           session_id: Optional[str] = None) -> ReviewSession:
         """Synchronous wrapper for complete review."""
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
             return loop.run_until_complete(
-                self.run_complete_review_async(module, author_experience)
+                self.run_complete_review_async(module, author_experience, session_id)
+            )
+        finally:
+            loop.close()
+
+    async def resume_review_async(self, session_id: str) -> ReviewSession:
+        """Resume an interrupted session from its journal.
+
+        The module and author experience are read back from the journal.
+        Agents that already finished are reused; only the missing ones are
+        called before the pipeline continues.
+
+        Raises:
+            FileNotFoundError: If no journal exists for the session
+        """
+        if not SessionJournal.exists(session_id, self.journal_dir):
+            raise FileNotFoundError(f"No journal for session '{session_id}' in {self.journal_dir}")
+
+        start = SessionJournal(session_id, self.journal_dir).load_start()
+        return await self.run_complete_review_async(
+            start["module"], start["author_experience"], session_id=session_id
+        )
+
+    def resume_review(self, session_id: str) -> ReviewSession:
+        """Synchronous wrapper for resuming a session."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(self.resume_review_async(session_id))
+        finally:
+            loop.close()
+
+    async def run_chapter_async(self, modules: List[ModuleContent],
+                                author_experience: str = "new",
+                                weights: Optional[Dict[str, float]] = None) -> Dict[str, ReviewSession]:
+        """Review many modules concurrently under the shared scheduler.
+
+        All sessions draw from the scheduler's single concurrency budget,
+        so a whole chapter can be submitted at once without unbounded
+        parallel calls.
+
+        Args:
+            modules: Modules to review
+            author_experience: Author experience level for every module
+            weights: Optional fair-share weight per module_id (default 1.0)
+
+        Returns:
+            Sessions keyed by module_id (modules whose session failed are omitted)
+        """
+        for module_id, weight in (weights or {}).items():
+            self.scheduler.set_weight(module_id, weight)
+
+        results = await asyncio.gather(
+            *(self.run_complete_review_async(module, author_experience) for module in modules),
+            return_exceptions=True
+        )
+
+        sessions = {}
+        for module, result in zip(modules, results):
+            if isinstance(result, Exception):
+                print(f"Session error: {module.module_id}: {result}")
+            else:
+                sessions[module.module_id] = result
+
+        snapshot = self.scheduler.snapshot()
+        print(f"📊 Scheduler: {snapshot['dispatched']} agent calls, peak {snapshot['peak_active']} "
+              f"in flight, {snapshot['rate_limit_pauses']} rate-limit pauses")
+        return sessions
+
+    def run_chapter(self, modules: List[ModuleContent],
+                    author_experience: str = "new",
+                    weights: Optional[Dict[str, float]] = None) -> Dict[str, ReviewSession]:
+        """Synchronous wrapper for a chapter review."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(
+                self.run_chapter_async(modules, author_experience, weights)
             )
         finally:
             loop.close()
@@ -183,27 +340,184 @@ class RevisionOrchestrator:
         finally:
             loop.close()
 
+    async def run_batch_pass_async(self, modules: List[ModuleContent],
+                                   review_pass: ReviewPass,
+                                   batch_runner: BatchRunner,
+                                   author_experience: str = "new") -> Dict[str, ReviewReport]:
+        """Run one pass for many modules through an offline batch job.
+
+        Every agent request for every module goes into a single job file, so
+        nightly runs pay batch pricing instead of per-request pricing.
+        """
+        print(f"\n📦 BATCH {review_pass.name}: {len(modules)} modules x "
+              f"{self.reviewer_counts[review_pass]} agents")
+
+        feedback_by_module = await batch_runner.run_pass_async(
+            modules, review_pass, self.reviewer_counts[review_pass]
+        )
+        return self._reports_from_feedback(modules, review_pass, feedback_by_module, author_experience)
+
+    def run_batch_pass(self, modules: List[ModuleContent],
+                       review_pass: ReviewPass,
+                       batch_runner: BatchRunner,
+                       author_experience: str = "new") -> Dict[str, ReviewReport]:
+        """Synchronous wrapper for a batch pass."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(
+                self.run_batch_pass_async(modules, review_pass, batch_runner, author_experience)
+            )
+        finally:
+            loop.close()
+
+    async def run_queued_pass_async(self, modules: List[ModuleContent],
+                                    review_pass: ReviewPass,
+                                    queue_runner: QueueRunner,
+                                    author_experience: str = "new") -> Dict[str, ReviewReport]:
+        """Run one pass for many modules through the durable task queue.
+
+        Agent calls are made by queue workers (scripts/queue_worker.py),
+        possibly on other machines; this process only collects results and
+        aggregates.
+        """
+        print(f"\n📥 QUEUED {review_pass.name}: {len(modules)} modules x "
+              f"{self.reviewer_counts[review_pass]} agents")
+
+        feedback_by_module = await queue_runner.run_pass_async(
+            modules, review_pass, self.reviewer_counts[review_pass]
+        )
+        return self._reports_from_feedback(modules, review_pass, feedback_by_module, author_experience)
+
+    def run_queued_pass(self, modules: List[ModuleContent],
+                        review_pass: ReviewPass,
+                        queue_runner: QueueRunner,
+                        author_experience: str = "new") -> Dict[str, ReviewReport]:
+        """Synchronous wrapper for a queued pass."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(
+                self.run_queued_pass_async(modules, review_pass, queue_runner, author_experience)
+            )
+        finally:
+            loop.close()
+
+    def _reports_from_feedback(self, modules: List[ModuleContent],
+                               review_pass: ReviewPass,
+                               feedback_by_module: Dict[str, List[ReviewFeedback]],
+                               author_experience: str) -> Dict[str, ReviewReport]:
+        """Aggregate, generate and save one report per module from collected feedback."""
+        reports = {}
+        for module in modules:
+            feedback_list = feedback_by_module.get(module.module_id, [])
+            consensus_results = self.aggregator.aggregate(feedback_list)
+            report = self.aggregator.generate_report(
+                consensus_results=consensus_results,
+                module_id=module.module_id,
+                review_pass=review_pass,
+                strengths=self._identify_strengths(consensus_results, review_pass)
+            )
+            report.author_experience_level = author_experience
+            self._save_report(report, f"{review_pass.value}")
+            reports[module.module_id] = report
+
+        return reports
+
+    def _adapt_model_routes(self) -> List[Dict[str, Any]]:
+        """Count newly validated disputes and move model routes a tier up or down.
+
+        Returns:
+            Route changes from ModelRouter.adapt (empty without a router)
+        """
+        if self.model_router is None:
+            return []
+        if self.feedback_loop is None:
+            self.feedback_loop = FeedbackLoop()
+
+        counted = self.model_router.load_feedback(self.feedback_loop)
+        if counted:
+            print(f"🔀 Model routing: {counted} newly validated disputes counted")
+        changes = self.model_router.adapt()
+        if counted or changes:
+            print(f"   {len(changes)} route(s) changed tier\n")
+        return changes
+
+    async def _warm_up_session(self, session: ReviewSession) -> Dict[ReviewPass, ReviewerPool]:
+        """Build every pass's reviewer pool and open backend connections before Pass 1.
+
+        Pools are built once per session (sharing one configuration loader)
+        and only re-pointed at each pass's client stack when the pass starts,
+        so no pass pays setup costs on its first wave of agents.
+
+        Returns:
+            Reviewer pools keyed by pass
+        """
+        start = time.monotonic()
+        pools = {}
+        xml_loader = None
+        for review_pass, num_reviewers in self.reviewer_counts.items():
+            pools[review_pass] = ReviewerPool(review_pass, num_reviewers, self.api_client,
+                                              xml_loader=xml_loader)
+            xml_loader = xml_loader or pools[review_pass].xml_loader
+        connections = await self.api_client.warm_up_async(self.warm_connections)
+
+        session.warmup_seconds = time.monotonic() - start
+        reviewers = sum(len(pool.reviewers) for pool in pools.values())
+        print(f"🔥 Warm-up: {reviewers} reviewers in {len(pools)} pools, "
+              f"{connections} backend connections opened ({session.warmup_seconds:.1f}s)\n")
+        return pools
+
     async def _run_pass(self, module: ModuleContent,
                        review_pass: ReviewPass,
                        session: ReviewSession,
                        author_experience: str,
-                       previous_report: Optional[ReviewReport] = None) -> ReviewReport:
-        """Run a single review pass."""
+                       previous_report: Optional[ReviewReport] = None,
+                       journal: Optional[SessionJournal] = None,
+                       pool: Optional[ReviewerPool] = None) -> ReviewReport:
+        """Run a single review pass.
+
+        Args:
+            pool: Pool built by _warm_up_session (default: build one for this pass)
+        """
         session.current_pass = review_pass
 
-        # Create reviewer pool
+        # Create reviewer pool. Calls go through the shared scheduler and are
+        # shared with identical in-flight calls from concurrent sessions.
+        # Deadlines and hedging against slow agents apply inside the
+        # scheduler slot, so time spent queued does not count as latency.
         num_reviewers = self.reviewer_counts[review_pass]
-        pool = ReviewerPool(review_pass, num_reviewers, self.api_client)
+        tracker = PassLatencyTracker(self.pass_slos.get(review_pass))
+        api_client = self.api_client
+        if self.model_router:
+            api_client = RoutedAPIClient(api_client, self.model_router)
+        if self.hedge_requests:
+            api_client = HedgedAPIClient(api_client, tracker)
+        api_client = ScheduledAPIClient(api_client, self.scheduler, module.module_id)
+        coalescing_client = None
+        if self.coalescer:
+            api_client = coalescing_client = CoalescingAPIClient(api_client, self.coalescer)
+        if pool is None:
+            pool = ReviewerPool(review_pass, num_reviewers, api_client,
+                                model_router=self.model_router)
+        else:
+            pool.prepare_pass(api_client, self.model_router)
+
+        # Agents already checkpointed in the journal are not called again
+        journaled = len(journal.completed_agents(review_pass)) if journal else 0
 
         # Run reviews in parallel
         start_time = datetime.now()
-        feedback_list = await pool.review_parallel(module)
+        feedback_list = await pool.review_parallel(module, journal=journal)
         end_time = datetime.now()
 
         # Update session
         for feedback in feedback_list:
             session.add_feedback(feedback)
-        session.api_calls_made += num_reviewers
+        coalesced = coalescing_client.coalesced_calls if coalescing_client else 0
+        session.api_calls_made += max(0, num_reviewers - journaled - len(pool.degraded_reviewers) - coalesced)
+        if coalesced:
+            print(f"   🔗 {coalesced} agent calls shared with a concurrent session")
 
         # Aggregate feedback
         consensus_results = self.aggregator.aggregate(feedback_list)
@@ -222,12 +536,29 @@ class RevisionOrchestrator:
             strengths=self._identify_strengths(consensus_results, review_pass)
         )
         report.author_experience_level = author_experience
+        report.agent_modes = pool.agent_modes()
 
         session.add_report(report)
+        metrics = tracker.summary() if self.hedge_requests else None
+        if metrics:
+            session.pass_metrics[review_pass.value] = metrics
+        if journal:
+            journal.record_pass_complete(review_pass, metrics)
 
         print(f"   ✓ Completed in {(end_time - start_time).total_seconds():.1f} seconds")
         print(f"   ✓ {len(feedback_list)} pieces of feedback collected")
         print(f"   ✓ {len(consensus_results)} consensus issues identified")
+        if report.degraded_agents:
+            print(f"   ⚠️  {len(report.degraded_agents)}/{num_reviewers} agents degraded to rule-based "
+                  f"checks (circuit {self.circuit_breaker.state}); resume the session to re-run them")
+        if metrics and metrics["completed"]:
+            print(f"   ⏱  Latency p50/p95/p99: {metrics['p50_seconds']}s / {metrics['p95_seconds']}s / "
+                  f"{metrics['p99_seconds']}s, hedge rate {metrics['hedge_rate']:.0%}, "
+                  f"{metrics['deadline_misses']} deadline misses")
+        if self.model_router:
+            spend = self.model_router.summary()
+            calls = ", ".join(f"{name} {tier['calls']}" for name, tier in spend["tiers"].items())
+            print(f"   💰 Estimated model spend so far: ${spend['estimated_cost']:.2f} ({calls} calls)")
 
         return report
 
@@ -110,6 +110,15 @@ class ReportFormatter:
         }
         return explanations.get(level, "")
 
+    @staticmethod
+    def format_degraded_agents(report: ReviewReport) -> str:
+        """Explain how many agents fell back to rule-based checks."""
+        degraded = len(report.degraded_agents)
+        total = len(report.agent_modes)
+        return (f"{degraded} of {total} agents ran rule-based checks because the AI backend "
+                f"was unavailable; {total - degraded} ran normally. Re-run the pass once the "
+                f"backend recovers for a full review.")
+
 
 class ReportGenerator:
     """Generates various report formats from review results."""
@@ -132,6 +141,11 @@ class ReportGenerator:
         lines.append(f"Estimated Revision Time: {self.formatter.format_time_estimate(report.estimated_revision_time)}")
         lines.append("")
 
+        if report.degraded_agents:
+            lines.append(f"⚠️  DEGRADED MODE: {self.formatter.format_degraded_agents(report)}")
+            lines.append(f"   Rule-based agents: {', '.join(report.degraded_agents)}")
+            lines.append("")
+
         # Content strengths section (not author strengths - important distinction!)
         lines.append("🌟 CONTENT STRENGTHS - What's Working Well:")
         lines.append("-" * 40)
@@ -209,6 +223,11 @@ class ReportGenerator:
         lines.append(f"**Estimated Revision Time:** {self.formatter.format_time_estimate(report.estimated_revision_time)}")
         lines.append("")
 
+        if report.degraded_agents:
+            lines.append(f"> ⚠️ **Degraded mode:** {self.formatter.format_degraded_agents(report)}")
+            lines.append(f"> Rule-based agents: {', '.join(report.degraded_agents)}")
+            lines.append("")
+
         # Content Strengths (evaluating the work, not the person)
         lines.append("## 🌟 Content Strengths")
         lines.append("")
@@ -437,6 +456,14 @@ class ReportGenerator:
         <p><strong>Estimated Revision Time:</strong> {self.formatter.format_time_estimate(report.estimated_revision_time)}</p>
     </div>""")
 
+        if report.degraded_agents:
+            html.append(f"""
+    <div class="section">
+        <h2>⚠️ Degraded Mode</h2>
+        <p>{self.formatter.format_degraded_agents(report)}</p>
+        <p><strong>Rule-based agents:</strong> {', '.join(report.degraded_agents)}</p>
+    </div>""")
+
         # Content strengths section (focus on the work, not the person)
         html.append("""
     <div class="section">
@@ -53,8 +53,9 @@ except ImportError:
 
 from .models import (
     ReviewerConfig, ReviewerRole, ReviewPass,
-    ReviewFeedback, ModuleContent, SeverityLevel
+    ReviewFeedback, ModuleContent, SeverityLevel, AgentRequest
 )
+from .circuit_breaker import CircuitOpenError
 
 
 class ConfigMode(Enum):
@@ -275,55 +276,86 @@ class APIClient:
     """Handles communication with the OpenAI API."""
 
     def __init__(self, api_key: Optional[str] = None, max_retries: int = 3,
-                 retry_delay: float = 1.0):
-        """Initialize API client with key and retry settings."""
+                 retry_delay: float = 1.0, model: str = "gpt-4",
+                 api_base: Optional[str] = None):
+        """Initialize API client with key and retry settings.
+
+        api_base (or OPENAI_API_BASE) points the client at another endpoint
+        speaking the same wire format, e.g. Testing/llm_standin.py.
+        """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY") or "mock_api_key"
+        self.api_base = api_base or os.getenv("OPENAI_API_BASE")
+        self.model = model
 
         # Only require real API key if not using mock
         if hasattr(openai, 'api_key'):
             if not self.api_key or self.api_key == "mock_api_key":
                 print("⚠️  No OpenAI API key found. Using mock API for demonstration.")
             openai.api_key = self.api_key
+        if self.api_base and hasattr(openai, 'api_base'):
+            print(f"🔌 Sending agent calls to {self.api_base}")
+            openai.api_base = self.api_base
 
         self.max_retries = max_retries
         self.retry_delay = retry_delay
 
+        # Called on every rate-limit error (e.g. GlobalAgentScheduler.report_rate_limit)
+        self.rate_limit_listener = None
+
+        # Shared CircuitBreaker; while it is open, calls fail fast with CircuitOpenError
+        self.circuit_breaker = None
+
     async def call_api_async(self, prompt: str, system_prompt: str,
                              temperature: float = 0.7,
-                             max_tokens: int = 2000) -> Dict[str, Any]:
+                             max_tokens: int = 2000,
+                             model: Optional[str] = None) -> Dict[str, Any]:
         """Make an async API call with retry logic."""
+        request_body = self.build_chat_request(prompt, system_prompt, temperature,
+                                               max_tokens, model=model)
+
+        breaker = self.circuit_breaker
+
         for attempt in range(self.max_retries):
+            if breaker and not await breaker.acquire():
+                raise CircuitOpenError("Agent backend circuit is open")
+
             try:
-                response = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        response_format={"type": "json_object"}
+                try:
+                    response = await asyncio.get_event_loop().run_in_executor(
+                        None,
+                        lambda: openai.ChatCompletion.create(**request_body)
                     )
-                )
+                except asyncio.CancelledError:
+                    if breaker:
+                        breaker.record_cancelled()
+                    raise
+                except openai.error.RateLimitError:
+                    # Throttling is absorbed by the backoff below and the scheduler,
+                    # not by degrading the pass
+                    if breaker:
+                        breaker.record_throttled()
+                    raise
+                except Exception:
+                    if breaker:
+                        breaker.record_failure()
+                    raise
+                if breaker:
+                    breaker.record_success()
 
                 content = response.choices[0].message.content
-                return json.loads(content)
+                return self.parse_content(content)
 
             except openai.error.RateLimitError:
+                if self.rate_limit_listener:
+                    self.rate_limit_listener()
                 if attempt < self.max_retries - 1:
                     await asyncio.sleep(self.retry_delay * (2 ** attempt))
                 else:
                     raise
 
-            except json.JSONDecodeError as e:
-                # Try to extract JSON from the response
-                if 'content' in locals():
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    if json_match:
-                        return json.loads(json_match.group())
-                raise e
+            except json.JSONDecodeError:
+                # Malformed JSON will not improve on retry
+                raise
 
             except Exception as e:
                 if attempt < self.max_retries - 1:
@@ -331,6 +363,65 @@ class APIClient:
                 else:
                     raise e
 
+    def build_chat_request(self, prompt: str, system_prompt: str,
+                           temperature: float = 0.7,
+                           max_tokens: int = 2000,
+                           model: Optional[str] = None) -> Dict[str, Any]:
+        """Build the chat-completions request body for a single agent call.
+
+        Shared by live calls and offline batch jobs so both send exactly
+        the same request.
+        """
+        return {
+            "model": model or self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"}
+        }
+
+    async def warm_up_async(self, connections: int = 8) -> int:
+        """Open backend connections before the first agent wave.
+
+        Calls run on executor threads, and the OpenAI client keeps one HTTP
+        session per thread, so a cheap concurrent request on each thread pays
+        DNS, TLS and pool setup ahead of time. Bypasses the circuit breaker.
+
+        Args:
+            connections: Concurrent warm-up requests (roughly the first wave's size)
+
+        Returns:
+            Number of connections opened (0 with the mock API)
+        """
+        model_api = getattr(openai, "Model", None)
+        if model_api is None or connections <= 0:
+            return 0
+
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(None, model_api.list) for _ in range(connections)),
+            return_exceptions=True
+        )
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+    @staticmethod
+    def parse_content(content: str) -> Dict[str, Any]:
+        """Parse a response message body into JSON.
+
+        Falls back to the first {...} block when the model wrapped its JSON
+        in prose.
+        """
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group())
+            raise
+
     def call_api(self, prompt: str, system_prompt: str,
                  temperature: float = 0.7,
                  max_tokens: int = 2000) -> Dict[str, Any]:
@@ -573,28 +664,117 @@ Remember to evaluate from the perspective of a student studying home alone with
 
         return prompt
 
+    def build_request(self, module: ModuleContent) -> AgentRequest:
+        """Build a detached request for this reviewer's call on a module.
+
+        Args:
+            module: Module content to review
+
+        Returns:
+            AgentRequest carrying the exact prompts and sampling settings
+        """
+        return AgentRequest(
+            request_id=f"{module.module_id}::{self.config.review_pass.value}::{self.config.reviewer_id}",
+            module_id=module.module_id,
+            review_pass=self.config.review_pass,
+            reviewer_id=self.config.reviewer_id,
+            system_prompt=self.generate_system_prompt(),
+            prompt=self.generate_prompt(module),
+            model=self.config.model or getattr(self.api_client, "model", "gpt-4"),
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens
+        )
+
     async def review_async(self, module: ModuleContent) -> List[ReviewFeedback]:
-        """Perform async review of a module."""
-        system_prompt = self.generate_system_prompt()
-        prompt = self.generate_prompt(module)
+        """Perform async review of a module.
 
+        Raises:
+            CircuitOpenError: If the backend circuit is open (callers fall back
+                              to review_degraded)
+        """
         try:
-            response = await self.api_client.call_api_async(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
+            _, feedback = await self.review_raw_async(module)
+            return feedback
 
-            if self.api_client.validate_response(response):
-                return self.parse_response(response)
-            else:
-                return []
+        except CircuitOpenError:
+            raise
 
         except Exception as e:
             print(f"Error in reviewer {self.config.reviewer_id}: {str(e)}")
             return []
 
+    async def review_raw_async(self, module: ModuleContent) -> Tuple[Dict[str, Any], List[ReviewFeedback]]:
+        """Review a module and keep the raw response alongside the parsed feedback.
+
+        Unlike review_async, API errors are raised so callers can tell a
+        failed agent from one that found nothing.
+
+        Returns:
+            (raw API response, parsed feedback list)
+        """
+        system_prompt = self.generate_system_prompt()
+        prompt = self.generate_prompt(module)
+
+        response = await self.api_client.call_api_async(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            model=self.config.model
+        )
+
+        if self.api_client.validate_response(response):
+            return response, self.parse_response(response)
+        return response, []
+
+    def review_degraded(self, module: ModuleContent) -> List[ReviewFeedback]:
+        """Rule-based review used in place of the API while the circuit is open.
+
+        Style reviewers check contractions and imperatives; authoring reviewers
+        check the required structural components. Findings are deterministic,
+        so every degraded reviewer reports the same ones.
+        """
+        feedback_list = []
+        lines = module.content.split('\n')
+
+        def location_of(text: str) -> str:
+            for i, line in enumerate(lines, start=1):
+                if text in line:
+                    return f"Line {i}"
+            return "unspecified"
+
+        if self.config.role == ReviewerRole.STYLE:
+            for contraction in sorted(set(StyleReviewer.detect_contractions(module.content))):
+                feedback_list.append(ReviewFeedback(
+                    reviewer_id=self.config.reviewer_id,
+                    issue_type="contraction",
+                    severity=2,
+                    location=location_of(contraction),
+                    issue=f"Contraction '{contraction}' (rule-based check)",
+                    suggestion="Write the words out in full"
+                ))
+            for verb in sorted(set(StyleReviewer.detect_imperatives(module.content))):
+                feedback_list.append(ReviewFeedback(
+                    reviewer_id=self.config.reviewer_id,
+                    issue_type="imperative",
+                    severity=2,
+                    location=location_of(verb + " "),
+                    issue=f"Sentence starts with the imperative '{verb}' (rule-based check)",
+                    suggestion="Rephrase as a statement unless this is a question or procedure"
+                ))
+        else:
+            for issue in AuthoringReviewer.check_structural_requirements(module):
+                feedback_list.append(ReviewFeedback(
+                    reviewer_id=self.config.reviewer_id,
+                    issue_type="structure",
+                    severity=3,
+                    location="module",
+                    issue=f"{issue} (rule-based check)",
+                    suggestion="Add or resize the component to match the authoring guide"
+                ))
+
+        return feedback_list
+
     def parse_response(self, response: Dict[str, Any]) -> List[ReviewFeedback]:
         """Parse API response into ReviewFeedback objects."""
         feedback_list = []
@@ -693,7 +873,8 @@ IMPORTANT: As a generalist reviewer:
 class AuthoringReviewer(BaseReviewer):
     """Specialized reviewer for authoring guidelines."""
 
-    def check_structural_requirements(self, module: ModuleContent) -> List[str]:
+    @staticmethod
+    def check_structural_requirements(module: ModuleContent) -> List[str]:
         """Check if module has required structural components."""
         issues = []
 
@@ -752,7 +933,8 @@ Focus specifically on:
 class StyleReviewer(BaseReviewer):
     """Specialized reviewer for style guide compliance."""
 
-    def detect_contractions(self, content: str) -> List[str]:
+    @staticmethod
+    def detect_contractions(content: str) -> List[str]:
         """Detect contractions in content."""
         # Common contractions to check for
         contractions_pattern = r"\b(don't|doesn't|didn't|won't|wouldn't|can't|couldn't|shouldn't|isn't|aren't|wasn't|weren't|haven't|hasn't|hadn't|let's|that's|what's|it's|he's|she's|they're|we're|you're|I'm|they've|we've|you've|I've|they'd|we'd|you'd|I'd|they'll|we'll|you'll|I'll)\b"
@@ -760,7 +942,8 @@ class StyleReviewer(BaseReviewer):
         matches = re.finditer(contractions_pattern, content, re.IGNORECASE)
         return [match.group() for match in matches]
 
-    def detect_imperatives(self, content: str) -> List[str]:
+    @staticmethod
+    def detect_imperatives(content: str) -> List[str]:
         """Detect improper use of imperative voice."""
         # Common imperative verbs at the start of sentences
         imperative_pattern = r"(?:^|\. )([A-Z][a-z]*) (?:the |a |an )"
@@ -826,7 +1009,9 @@ class ReviewerPool:
 
     def __init__(self, review_pass: ReviewPass, num_reviewers: int,
                  api_client: Optional[APIClient] = None,
-                 config_mode: ConfigMode = ConfigMode.AUTO):
+                 config_mode: ConfigMode = ConfigMode.AUTO,
+                 model_router=None,
+                 xml_loader: Optional[XMLConfigLoader] = None):
         """Initialize a pool of reviewers.
 
         Args:
@@ -834,6 +1019,9 @@ class ReviewerPool:
             num_reviewers: Number of reviewers (ignored when using XML config)
             api_client: API client for OpenAI calls
             config_mode: Configuration mode (XML, TEXT, or AUTO)
+            model_router: ModelRouter choosing each reviewer's model and max_tokens
+            xml_loader: Loader shared with other pools (XML mode), so the
+                        configuration files are parsed once
         """
         self.review_pass = review_pass
         self.num_reviewers = num_reviewers
@@ -850,7 +1038,7 @@ class ReviewerPool:
 
         if self.config_mode == ConfigMode.XML:
             try:
-                self.xml_loader = XMLConfigLoader()
+                self.xml_loader = xml_loader or XMLConfigLoader()
             except Exception as e:
                 print(f"Warning: Could not initialize XML loader: {e}")
                 print("Falling back to text-based configuration")
@@ -859,6 +1047,30 @@ class ReviewerPool:
 
         self.reviewers = self._create_reviewers()
 
+        # Reviewers that ran rule-based checks because the backend circuit was open
+        self.degraded_reviewers: List[str] = []
+
+        if model_router is not None:
+            for reviewer in self.reviewers:
+                model_router.apply(reviewer.config)
+
+    def prepare_pass(self, api_client, model_router=None):
+        """Point a pool built ahead of time at the client stack for its pass.
+
+        Only the client and model routes change; reviewers, prompts and
+        configuration loaded when the pool was built are reused.
+
+        Args:
+            api_client: This pass's client (scheduler, hedging, ... wrappers)
+            model_router: ModelRouter whose current routes are re-applied
+        """
+        self.api_client = api_client
+        self.degraded_reviewers = []
+        for reviewer in self.reviewers:
+            reviewer.api_client = api_client
+            if model_router is not None:
+                model_router.apply(reviewer.config)
+
     def _create_reviewers_xml(self) -> List[BaseReviewer]:
         """Create reviewers based on XML configuration.
 
@@ -1107,9 +1319,32 @@ class ReviewerPool:
         else:
             return self._create_reviewers_text()
 
-    async def review_parallel(self, module: ModuleContent) -> List[ReviewFeedback]:
-        """Execute all reviewers in parallel and collect feedback."""
-        tasks = [reviewer.review_async(module) for reviewer in self.reviewers]
+    def get_reviewer(self, reviewer_id: str) -> Optional[BaseReviewer]:
+        """Look up a reviewer in this pool by its ID."""
+        for reviewer in self.reviewers:
+            if reviewer.config.reviewer_id == reviewer_id:
+                return reviewer
+        return None
+
+    def build_requests(self, module: ModuleContent) -> List[AgentRequest]:
+        """Build one detached request per reviewer for a module."""
+        return [reviewer.build_request(module) for reviewer in self.reviewers]
+
+    async def review_parallel(self, module: ModuleContent,
+                              journal=None) -> List[ReviewFeedback]:
+        """Execute all reviewers in parallel and collect feedback.
+
+        Args:
+            module: Module content to review
+            journal: Optional SessionJournal. Reviewers it already records for
+                     this pass are not called again; their journaled feedback
+                     is reused. Each newly finished reviewer is appended to it.
+        """
+        self.degraded_reviewers = []
+        if journal is not None:
+            return await self._review_parallel_journaled(module, journal)
+
+        tasks = [self._review_or_degrade(reviewer, module) for reviewer in self.reviewers]
 
         # Execute all reviews in parallel
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -1124,6 +1359,58 @@ class ReviewerPool:
 
         return all_feedback
 
+    async def _review_parallel_journaled(self, module: ModuleContent,
+                                         journal) -> List[ReviewFeedback]:
+        """Run only the reviewers missing from the journal, recording each as it finishes."""
+        completed = journal.completed_agents(self.review_pass)
+        pending = [r for r in self.reviewers if r.config.reviewer_id not in completed]
+
+        if completed:
+            print(f"   ↻ Reusing {len(self.reviewers) - len(pending)} journaled agents, "
+                  f"calling {len(pending)}")
+
+        async def review_and_record(reviewer: BaseReviewer) -> List[ReviewFeedback]:
+            try:
+                response, feedback = await reviewer.review_raw_async(module)
+            except CircuitOpenError:
+                # Not journaled, so a resumed session calls the real agent
+                return self._degrade(reviewer, module)
+            journal.record_agent(self.review_pass, reviewer.config.reviewer_id, response, feedback)
+            return feedback
+
+        results = await asyncio.gather(*(review_and_record(r) for r in pending),
+                                       return_exceptions=True)
+
+        all_feedback = []
+        for reviewer in self.reviewers:
+            all_feedback.extend(completed.get(reviewer.config.reviewer_id, []))
+        for reviewer, result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"Reviewer error: {reviewer.config.reviewer_id}: {result}")
+            else:
+                all_feedback.extend(result)
+
+        return all_feedback
+
+    async def _review_or_degrade(self, reviewer: BaseReviewer,
+                                 module: ModuleContent) -> List[ReviewFeedback]:
+        """Review through the API, or with rule-based checks while the circuit is open."""
+        try:
+            return await reviewer.review_async(module)
+        except CircuitOpenError:
+            return self._degrade(reviewer, module)
+
+    def _degrade(self, reviewer: BaseReviewer, module: ModuleContent) -> List[ReviewFeedback]:
+        """Run a reviewer's rule-based checks instead of the API and mark it degraded."""
+        self.degraded_reviewers.append(reviewer.config.reviewer_id)
+        return reviewer.review_degraded(module)
+
+    def agent_modes(self) -> Dict[str, str]:
+        """How each reviewer ran in the last review: "api" or "degraded" (rule-based)."""
+        degraded = set(self.degraded_reviewers)
+        return {r.config.reviewer_id: "degraded" if r.config.reviewer_id in degraded else "api"
+                for r in self.reviewers}
+
     def review(self, module: ModuleContent) -> List[ReviewFeedback]:
         """Synchronous wrapper for parallel review."""
         loop = asyncio.new_event_loop()
@@ -0,0 +1,294 @@
+"""
+Process-wide scheduler for agent calls across review sessions.
+Every ReviewSession submits its agent calls here instead of calling the API
+directly, so concurrent modules share one concurrency budget, take turns by
+weighted fair queuing and back off together when the provider rate-limits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Ticket:
+    """A queued agent call waiting for a concurrency slot."""
+
+    def __init__(self, module_id: str, finish_tag: float, start_tag: float,
+                 loop: asyncio.AbstractEventLoop):
+        self.module_id = module_id
+        self.finish_tag = finish_tag
+        self.start_tag = start_tag
+        self.loop = loop
+        self.future = loop.create_future()
+        self.dispatched = False
+        self.cancelled = False
+
+
+class GlobalAgentScheduler:
+    """Shares one concurrency budget across every module under review.
+
+    Scheduling is weighted fair queuing: each call gets a virtual finish tag
+    of max(virtual time, module's last tag) + cost / weight, and the smallest
+    tag runs next. A module with weight 2 gets twice the throughput of a
+    module with weight 1 while both have calls queued; an idle module does
+    not bank credit.
+
+    State is guarded by a thread lock and waiters are woken on their own
+    event loop, so sessions driven by the synchronous wrappers (one event
+    loop per thread) can share the scheduler too.
+    """
+
+    def __init__(self, max_concurrency: int = 16,
+                 max_queue_per_module: int = 64,
+                 rate_limit_cooldown: float = 2.0,
+                 max_cooldown: float = 60.0):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Agent calls in flight across all modules
+            max_queue_per_module: Queued calls per module before submitters wait (backpressure)
+            rate_limit_cooldown: Dispatch pause after a rate-limit error (doubles on repeats)
+            max_cooldown: Upper bound on the pause
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue_per_module = max_queue_per_module
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.max_cooldown = max_cooldown
+
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = defaultdict(float)
+        self._weights: Dict[str, float] = {}
+        self._queued: Dict[str, int] = defaultdict(int)
+        self._space_waiters: Dict[str, deque] = defaultdict(deque)
+        self._active = 0
+        self._paused_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._resume_timer: Optional[threading.Timer] = None
+
+        self.stats = {
+            "dispatched": 0,
+            "peak_active": 0,
+            "rate_limit_pauses": 0,
+            "backpressure_waits": 0,
+            "dispatched_by_module": defaultdict(int)
+        }
+
+    def set_weight(self, module_id: str, weight: float):
+        """Set a module's fair-share weight (default 1.0)."""
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        with self._lock:
+            self._weights[module_id] = weight
+
+    async def run(self, module_id: str, call: Callable[[], Awaitable[Any]],
+                  cost: float = 1.0) -> Any:
+        """Run an agent call once the scheduler grants it a slot.
+
+        Args:
+            module_id: Module the call belongs to (its fair-queuing flow)
+            call: Zero-argument coroutine function making the call
+            cost: Relative size of the call (e.g. estimated tokens)
+
+        Returns:
+            Whatever the call returns
+        """
+        await self._wait_for_queue_space(module_id)
+        ticket = self._enqueue(module_id, cost)
+
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket.dispatched:
+                    self._release_locked()
+                else:
+                    ticket.cancelled = True
+                    self._leave_queue_locked(module_id)
+            raise
+
+        try:
+            result = await call()
+            with self._lock:
+                self._consecutive_rate_limits = 0
+            return result
+        finally:
+            # Also runs when the call is cancelled (e.g. a losing hedge)
+            self._release()
+
+    def report_rate_limit(self):
+        """Pause dispatch for every module after a provider rate-limit error."""
+        with self._lock:
+            self._consecutive_rate_limits += 1
+            cooldown = min(self.max_cooldown,
+                           self.rate_limit_cooldown * 2 ** (self._consecutive_rate_limits - 1))
+            resume_at = time.monotonic() + cooldown
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                self.stats["rate_limit_pauses"] += 1
+                print(f"   🚦 Rate limited: pausing all agent dispatch for {cooldown:.1f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load and counters."""
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued": {m: n for m, n in self._queued.items() if n},
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                "dispatched": self.stats["dispatched"],
+                "peak_active": self.stats["peak_active"],
+                "rate_limit_pauses": self.stats["rate_limit_pauses"],
+                "backpressure_waits": self.stats["backpressure_waits"],
+                "dispatched_by_module": dict(self.stats["dispatched_by_module"])
+            }
+
+    async def _wait_for_queue_space(self, module_id: str):
+        """Block the submitter while its module's queue is full."""
+        while True:
+            with self._lock:
+                if self._queued[module_id] < self.max_queue_per_module:
+                    self._queued[module_id] += 1
+                    return
+                self.stats["backpressure_waits"] += 1
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._space_waiters[module_id].append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    waiters = self._space_waiters[module_id]
+                    if (loop, waiter) in waiters:
+                        waiters.remove((loop, waiter))
+                    else:
+                        # Woken for space this submitter will not use: pass it on
+                        self._wake_space_waiter_locked(module_id)
+                raise
+
+    def _enqueue(self, module_id: str, cost: float) -> _Ticket:
+        """Tag a call with its virtual finish time and queue it."""
+        with self._lock:
+            weight = self._weights.get(module_id, 1.0)
+            start_tag = max(self._virtual_time, self._last_finish[module_id])
+            finish_tag = start_tag + cost / weight
+            self._last_finish[module_id] = finish_tag
+
+            ticket = _Ticket(module_id, finish_tag, start_tag, asyncio.get_running_loop())
+            heapq.heappush(self._heap, (finish_tag, next(self._sequence), ticket))
+            self._dispatch_locked()
+        return ticket
+
+    def _release(self):
+        """Free a concurrency slot."""
+        with self._lock:
+            self._release_locked()
+
+    def _release_locked(self):
+        self._active -= 1
+        self._dispatch_locked()
+
+    def _leave_queue_locked(self, module_id: str):
+        """Account for a call leaving its module's queue and wake a blocked submitter."""
+        self._queued[module_id] -= 1
+        self._wake_space_waiter_locked(module_id)
+
+    def _wake_space_waiter_locked(self, module_id: str):
+        """Wake the longest-waiting submitter of a module (it re-checks for space)."""
+        waiters = self._space_waiters[module_id]
+        while waiters:
+            loop, waiter = waiters.popleft()
+            if not waiter.cancelled():
+                loop.call_soon_threadsafe(_resolve, waiter)
+                break
+
+    def _dispatch_locked(self):
+        """Start queued calls in finish-tag order while slots are free."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule_resume_locked(self._paused_until - now)
+            return
+
+        while self._heap and self._active < self.max_concurrency:
+            _, _, ticket = heapq.heappop(self._heap)
+            if ticket.cancelled:
+                continue
+
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            ticket.dispatched = True
+            self._active += 1
+            self.stats["dispatched"] += 1
+            self.stats["dispatched_by_module"][ticket.module_id] += 1
+            self.stats["peak_active"] = max(self.stats["peak_active"], self._active)
+            self._leave_queue_locked(ticket.module_id)
+            ticket.loop.call_soon_threadsafe(_resolve, ticket.future)
+
+    def _schedule_resume_locked(self, delay: float):
+        """Dispatch again once a rate-limit pause is over."""
+        if self._resume_timer and self._resume_timer.is_alive():
+            return
+        self._resume_timer = threading.Timer(delay, self._resume)
+        self._resume_timer.daemon = True
+        self._resume_timer.start()
+
+    def _resume(self):
+        with self._lock:
+            self._dispatch_locked()
+
+
+def _resolve(future: asyncio.Future):
+    """Complete a waiter future unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
+
+
+class ScheduledAPIClient:
+    """Routes an APIClient's calls through the global scheduler.
+
+    Exposes the same interface as APIClient; attributes it does not define
+    are read from the wrapped client.
+    """
+
+    def __init__(self, api_client, scheduler: GlobalAgentScheduler, module_id: str):
+        """Initialize the scheduled client.
+
+        Args:
+            api_client: Client that makes the actual calls
+            scheduler: Scheduler granting concurrency slots
+            module_id: Module whose fair-queuing flow the calls belong to
+        """
+        self.api_client = api_client
+        self.scheduler = scheduler
+        self.module_id = module_id
+
+    def __getattr__(self, name):
+        return getattr(self.api_client, name)
+
+    async def call_api_async(self, prompt: str, system_prompt: str,
+                             temperature: float = 0.7,
+                             max_tokens: int = 2000,
+                             model: Optional[str] = None) -> Dict[str, Any]:
+        """Make an API call once the scheduler grants a slot."""
+        return await self.scheduler.run(
+            self.module_id,
+            lambda: self.api_client.call_api_async(prompt, system_prompt, temperature,
+                                                   max_tokens, model=model)
+        )
+
+
+_global_scheduler: Optional[GlobalAgentScheduler] = None
+_global_scheduler_lock = threading.Lock()
+
+
+def get_global_scheduler() -> GlobalAgentScheduler:
+    """Return the process-wide scheduler, creating it on first use."""
+    global _global_scheduler
+    with _global_scheduler_lock:
+        if _global_scheduler is None:
+            _global_scheduler = GlobalAgentScheduler()
+        return _global_scheduler
@@ -0,0 +1,463 @@
+"""
+Durable SQLite work queue for agent tasks.
+The orchestrator enqueues one task per agent call; worker processes (on this
+machine or others sharing the filesystem) lease tasks, call the API and store
+the raw responses. The orchestrator only collects results and aggregates.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import AgentRequest, ModuleContent, ReviewFeedback, ReviewPass
+from .reviewers import APIClient, ReviewerPool, get_project_root
+
+
+class TaskStatus:
+    """Lifecycle states of an agent task."""
+    QUEUED = "queued"
+    LEASED = "leased"
+    DONE = "done"
+    DEAD = "dead"        # Exhausted its attempts (dead letter)
+
+    TERMINAL = (DONE, DEAD)
+
+
+def module_hash(module: ModuleContent) -> str:
+    """Content hash identifying the exact module text a task reviews."""
+    return hashlib.sha256(module.content.encode("utf-8")).hexdigest()
+
+
+class AgentTaskQueue:
+    """SQLite-backed agent task queue with leasing, retries and dead-lettering.
+
+    Tasks are claimed with a lease. A worker that dies without completing
+    its task lets the lease expire, and the task is handed out again. A task
+    that fails max_attempts times is moved to the dead-letter state.
+
+    The database uses the rollback journal rather than WAL, because WAL
+    needs shared memory and does not work across machines on a shared
+    filesystem.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            module_id TEXT NOT NULL,
+            module_hash TEXT NOT NULL,
+            review_pass TEXT NOT NULL,
+            reviewer_id TEXT NOT NULL,
+            request_json TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires REAL,
+            result_json TEXT,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (status, available_at);
+        CREATE INDEX IF NOT EXISTS idx_tasks_module ON tasks (module_id, review_pass);
+    """
+
+    def __init__(self, db_path: Optional[str] = None, retry_delay: float = 5.0):
+        """Open (or create) a task queue.
+
+        Args:
+            db_path: SQLite file (default: task_queue.db in project root)
+            retry_delay: Seconds before a failed task becomes available again
+                         (doubles with each attempt)
+        """
+        if db_path is None:
+            db_path = str(get_project_root() / "task_queue.db")
+        self.db_path = db_path
+        self.retry_delay = retry_delay
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Connection in autocommit mode; callers open transactions explicitly."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, requests: List[AgentRequest], content_hash: str,
+                max_attempts: int = 3) -> int:
+        """Add agent tasks. Tasks already queued or done for the same content are skipped;
+        dead-lettered ones get a fresh set of attempts, so a re-run retries them instead
+        of counting them as finished.
+
+        Args:
+            requests: Agent requests to run
+            content_hash: module_hash() of the module the requests review
+            max_attempts: Attempts before a task is dead-lettered
+
+        Returns:
+            Number of newly added or requeued tasks
+        """
+        now = time.time()
+        rows = [(
+            self.task_id(request, content_hash), request.module_id, content_hash,
+            request.review_pass.value, request.reviewer_id, json.dumps(request.to_dict()),
+            TaskStatus.QUEUED, max_attempts, now, now, now
+        ) for request in requests]
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (task_id, module_id, module_hash, review_pass, "
+                "reviewer_id, request_json, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.executemany(
+                "UPDATE tasks SET status = ?, attempts = 0, max_attempts = ?, available_at = ?, "
+                "updated_at = ? WHERE task_id = ? AND status = ?",
+                [(TaskStatus.QUEUED, max_attempts, now, now, row[0], TaskStatus.DEAD) for row in rows]
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        return added
+
+    @staticmethod
+    def task_id(request: AgentRequest, content_hash: str) -> str:
+        """Task ID: the agent request plus the content it reviews."""
+        return f"{request.request_id}::{content_hash[:16]}"
+
+    def lease(self, worker_id: str, lease_seconds: float = 300.0) -> Optional[Dict[str, Any]]:
+        """Claim the next available task for a worker.
+
+        Returns:
+            Task dict with task_id, attempts and the AgentRequest, or None if idle
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases on their last attempt are dead-lettered, not re-leased
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = 'lease expired', updated_at = ? "
+                "WHERE status = ? AND lease_expires <= ? AND attempts >= max_attempts",
+                (TaskStatus.DEAD, now, TaskStatus.LEASED, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE "
+                "(status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?) "
+                "ORDER BY available_at, created_at LIMIT 1",
+                (TaskStatus.QUEUED, now, TaskStatus.LEASED, now)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE task_id = ?",
+                (TaskStatus.LEASED, worker_id, now + lease_seconds, now, row["task_id"])
+            )
+            conn.execute("COMMIT")
+
+        return {
+            "task_id": row["task_id"],
+            "attempts": row["attempts"] + 1,
+            "max_attempts": row["max_attempts"],
+            "request": AgentRequest.from_dict(json.loads(row["request_json"]))
+        }
+
+    def complete(self, task_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store a task's raw response.
+
+        Returns:
+            False if the worker no longer holds the lease (the result is dropped)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result_json = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (TaskStatus.DONE, json.dumps(result), now, task_id, TaskStatus.LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> str:
+        """Record a failed attempt; retry later or dead-letter the task.
+
+        Returns:
+            The task's new status
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM tasks "
+                "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (task_id, TaskStatus.LEASED, worker_id)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return TaskStatus.QUEUED
+
+            if row["attempts"] >= row["max_attempts"]:
+                status, available_at = TaskStatus.DEAD, now
+            else:
+                status = TaskStatus.QUEUED
+                available_at = now + self.retry_delay * (2 ** (row["attempts"] - 1))
+
+            conn.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, lease_owner = NULL, "
+                "lease_expires = NULL, last_error = ?, updated_at = ? WHERE task_id = ?",
+                (status, available_at, error, now, task_id)
+            )
+            conn.execute("COMMIT")
+        return status
+
+    def status_counts(self, task_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """Count tasks by status (all tasks, or only the given IDs)."""
+        counts = {TaskStatus.QUEUED: 0, TaskStatus.LEASED: 0, TaskStatus.DONE: 0, TaskStatus.DEAD: 0}
+        with self._connect() as conn:
+            if task_ids is None:
+                rows = conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+                for row in rows:
+                    counts[row["status"]] = row["n"]
+            else:
+                for chunk in _chunks(task_ids, 500):
+                    rows = conn.execute(
+                        f"SELECT status, COUNT(*) AS n FROM tasks WHERE task_id IN "
+                        f"({','.join('?' * len(chunk))}) GROUP BY status", chunk
+                    ).fetchall()
+                    for row in rows:
+                        counts[row["status"]] += row["n"]
+        return counts
+
+    def results(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Status, result and last error of the given tasks, keyed by task ID."""
+        results = {}
+        with self._connect() as conn:
+            for chunk in _chunks(task_ids, 500):
+                rows = conn.execute(
+                    f"SELECT task_id, status, result_json, last_error FROM tasks WHERE task_id IN "
+                    f"({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    results[row["task_id"]] = {
+                        "status": row["status"],
+                        "result": json.loads(row["result_json"]) if row["result_json"] else None,
+                        "error": row["last_error"]
+                    }
+        return results
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Tasks that exhausted their attempts."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_id, module_id, review_pass, reviewer_id, attempts, last_error "
+                "FROM tasks WHERE status = ? ORDER BY updated_at", (TaskStatus.DEAD,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead(self) -> int:
+        """Give dead-lettered tasks a fresh set of attempts."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+                "WHERE status = ?", (TaskStatus.QUEUED, now, now, TaskStatus.DEAD)
+            )
+            return cursor.rowcount
+
+
+def _chunks(items: List[str], size: int):
+    """Split a list for SQLite's bound-parameter limit."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class QueueWorker:
+    """Pulls agent tasks from the queue and runs them against the API."""
+
+    def __init__(self, queue: AgentTaskQueue, api_client: Optional[APIClient] = None,
+                 worker_id: Optional[str] = None, concurrency: int = 4,
+                 lease_seconds: float = 300.0, idle_sleep: float = 2.0):
+        """Initialize a worker.
+
+        Args:
+            queue: Task queue to pull from
+            api_client: Client making the calls
+            worker_id: Lease owner name (default: host-pid-random)
+            concurrency: Tasks this worker runs at once
+            lease_seconds: Lease length; must exceed the slowest expected call
+            idle_sleep: Seconds to wait when the queue has nothing available
+        """
+        self.queue = queue
+        self.api_client = api_client or APIClient()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.idle_sleep = idle_sleep
+        self.completed = 0
+        self.failed = 0
+
+    async def run_async(self, max_tasks: Optional[int] = None,
+                        stop_when_idle: bool = False):
+        """Process tasks until max_tasks are done, or the queue is idle if stop_when_idle."""
+        claimed = 0
+
+        async def slot():
+            nonlocal claimed
+            while max_tasks is None or claimed < max_tasks:
+                task = await asyncio.get_event_loop().run_in_executor(
+                    None, self.queue.lease, self.worker_id, self.lease_seconds
+                )
+                if task is None:
+                    if stop_when_idle:
+                        return
+                    await asyncio.sleep(self.idle_sleep)
+                    continue
+                claimed += 1
+                await self._run_task(task)
+
+        await asyncio.gather(*(slot() for _ in range(self.concurrency)))
+
+    def run(self, max_tasks: Optional[int] = None, stop_when_idle: bool = False):
+        """Synchronous wrapper for the worker loop."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(self.run_async(max_tasks, stop_when_idle))
+        finally:
+            loop.close()
+
+    async def _run_task(self, task: Dict[str, Any]):
+        """Call the API for one task and record the outcome."""
+        request = task["request"]
+        try:
+            response = await self.api_client.call_api_async(
+                prompt=request.prompt,
+                system_prompt=request.system_prompt,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                model=request.model
+            )
+        except Exception as e:
+            status = self.queue.fail(task["task_id"], self.worker_id, str(e))
+            self.failed += 1
+            print(f"   ✗ {request.request_id} attempt {task['attempts']}/{task['max_attempts']} "
+                  f"failed ({status}): {e}")
+            return
+
+        self.queue.complete(task["task_id"], self.worker_id, response)
+        self.completed += 1
+
+
+class QueueRunner:
+    """Runs review passes by enqueuing agent tasks and collecting worker results."""
+
+    def __init__(self, queue: AgentTaskQueue, api_client: Optional[APIClient] = None,
+                 poll_interval: float = 2.0, max_wait_seconds: float = 3600.0,
+                 max_attempts: int = 3):
+        """Initialize the runner.
+
+        Args:
+            queue: Task queue shared with the workers
+            api_client: Client used to validate responses (calls are made by workers)
+            poll_interval: Seconds between result polls
+            max_wait_seconds: Stop waiting and use whatever finished by then
+            max_attempts: Attempts per task before dead-lettering
+        """
+        self.queue = queue
+        self.api_client = api_client or APIClient()
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.max_attempts = max_attempts
+        self.last_run: Dict[str, Any] = {}
+
+    async def run_pass_async(self, modules: List[ModuleContent],
+                             review_pass: ReviewPass,
+                             num_reviewers: int) -> Dict[str, List[ReviewFeedback]]:
+        """Enqueue one pass for every module and collect feedback once workers finish.
+
+        Returns:
+            Feedback lists keyed by module_id
+        """
+        pool = ReviewerPool(review_pass, num_reviewers, self.api_client)
+
+        task_requests = {}
+        added = 0
+        for module in modules:
+            content_hash = module_hash(module)
+            requests = pool.build_requests(module)
+            added += self.queue.enqueue(requests, content_hash, self.max_attempts)
+            for request in requests:
+                task_requests[AgentTaskQueue.task_id(request, content_hash)] = request
+
+        task_ids = list(task_requests)
+        print(f"   📥 Queued {added} new agent tasks ({len(task_ids)} total) "
+              f"for {len(modules)} modules")
+
+        waited = 0.0
+        while True:
+            counts = self.queue.status_counts(task_ids)
+            if counts[TaskStatus.DONE] + counts[TaskStatus.DEAD] == len(task_ids):
+                break
+            if waited >= self.max_wait_seconds:
+                print(f"   ⚠️  Stopped waiting after {waited:.0f}s: {counts}")
+                break
+            await asyncio.sleep(self.poll_interval)
+            waited += self.poll_interval
+
+        results = self.queue.results(task_ids)
+        feedback_by_module = defaultdict(list)
+        failed = []
+
+        for task_id, request in task_requests.items():
+            record = results.get(task_id, {})
+            if record.get("status") != TaskStatus.DONE:
+                failed.append(task_id)
+                continue
+            reviewer = pool.get_reviewer(request.reviewer_id)
+            if reviewer and self.api_client.validate_response(record["result"]):
+                feedback_by_module[request.module_id].extend(reviewer.parse_response(record["result"]))
+
+        self.last_run = {
+            "tasks": len(task_ids),
+            "added": added,
+            "failed_tasks": failed,
+            "status_counts": counts
+        }
+        print(f"   ✓ {len(task_ids) - len(failed)}/{len(task_ids)} agent tasks completed")
+
+        return dict(feedback_by_module)
+
+    def run_pass(self, modules: List[ModuleContent], review_pass: ReviewPass,
+                 num_reviewers: int) -> Dict[str, List[ReviewFeedback]]:
+        """Synchronous wrapper for a queued pass."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(
+                self.run_pass_async(modules, review_pass, num_reviewers)
+            )
+        finally:
+            loop.close()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Worker process for the durable agent task queue.
+
+Leases agent tasks from the SQLite queue, calls the API and stores the raw
+responses for the orchestrator to aggregate. Run several workers (on one
+machine, or on several machines sharing the queue file) for more throughput.
+
+Usage:
+  python queue_worker.py [--db path/to/task_queue.db] [--concurrency 4]
+  python queue_worker.py --dead-letters
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory (project root) to path so we can import src module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.task_queue import AgentTaskQueue, QueueWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run agent tasks from the durable task queue.")
+    parser.add_argument("--db", help="Queue database (default: task_queue.db in project root)")
+    parser.add_argument("--worker-id", help="Lease owner name (default: host-pid-random)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tasks run at once (default: 4)")
+    parser.add_argument("--lease-seconds", type=float, default=300.0,
+                        help="Lease length per task (default: 300)")
+    parser.add_argument("--max-tasks", type=int, help="Exit after this many tasks")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="Exit once no task is available instead of polling")
+    parser.add_argument("--dead-letters", action="store_true",
+                        help="List dead-lettered tasks and exit")
+    args = parser.parse_args()
+
+    queue = AgentTaskQueue(args.db)
+
+    if args.dead_letters:
+        for task in queue.dead_letters():
+            print(f"{task['task_id']}  attempts={task['attempts']}  {task['last_error']}")
+        return
+
+    worker = QueueWorker(queue, worker_id=args.worker_id, concurrency=args.concurrency,
+                         lease_seconds=args.lease_seconds)
+    print(f"👷 Worker {worker.worker_id} polling {queue.db_path}")
+    try:
+        worker.run(max_tasks=args.max_tasks, stop_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        pass
+    print(f"👷 Worker {worker.worker_id}: {worker.completed} completed, {worker.failed} failed")
+
+
+if __name__ == "__main__":
+    main()
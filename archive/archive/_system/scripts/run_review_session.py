@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Run the complete 4-pass review for a module, or resume an interrupted session.
+
+Every finished agent is checkpointed to sessions/<session_id>.jsonl, so a
+crashed session can be resumed without re-calling the agents it already ran.
+
+Usage:
+  python run_review_session.py <module_file> [--experience new|experienced] [--route-models]
+  python run_review_session.py --resume <session_id> [--route-models]
+
+With --route-models, agents are routed to model tiers from <model_routing> in
+agent_configuration.xml, and routes move a tier up or down at session start
+according to the disputes validated in feedback/.
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory (project root) to path so we can import src module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.orchestrator import RevisionOrchestrator, ModuleLoader
+from src.model_router import ModelRouter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run or resume a 4-pass module review.")
+    parser.add_argument("module_file", nargs="?", help="Module file (.txt or .json) to review")
+    parser.add_argument("--experience", default="new", help="Author experience level (default: new)")
+    parser.add_argument("--resume", metavar="SESSION_ID", help="Resume an interrupted session")
+    parser.add_argument("--route-models", action="store_true",
+                        help="Route agents to model tiers, adapted to validated disputes")
+    args = parser.parse_args()
+
+    if not args.module_file and not args.resume:
+        parser.error("give a module file or --resume <session_id>")
+
+    model_router = None
+    if args.route_models:
+        try:
+            model_router = ModelRouter()
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    orchestrator = RevisionOrchestrator(model_router=model_router)
+
+    if args.resume:
+        try:
+            session = orchestrator.resume_review(args.resume)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        if args.module_file.endswith('.json'):
+            module = ModuleLoader.load_from_json(args.module_file)
+        else:
+            module = ModuleLoader.load_from_file(args.module_file)
+        session = orchestrator.run_complete_review(module, args.experience)
+
+    print(f"Session {session.session_id} complete")
+
+
+if __name__ == "__main__":
+    main()
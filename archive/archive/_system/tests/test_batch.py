@@ -0,0 +1,165 @@
+"""
+Test suite for offline batch execution of review passes.
+Uses the file-based LocalBatchService so no provider calls are made.
+"""
+
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.batch import (
+    BatchRunner, BatchJobStatus, BatchService, LocalBatchService,
+    write_batch_file, read_batch_results
+)
+from src.models import ModuleContent, ReviewPass
+from src.reviewers import APIClient, ReviewerPool
+
+
+def make_responder(issues=None, fail_on=None):
+    """Build a responder that returns canned issues for every request."""
+    issues = issues if issues is not None else [{
+        "type": "contraction",
+        "severity": 2,
+        "location": "Line 3",
+        "issue": "Uses contraction 'don't'",
+        "suggestion": "Replace with 'do not'"
+    }]
+
+    def responder(body):
+        if fail_on and fail_on in body["messages"][0]["content"]:
+            raise Exception("Server error")
+        return MagicMock(
+            choices=[MagicMock(message=MagicMock(content=json.dumps({"issues": issues})))]
+        )
+
+    return responder
+
+
+class TestBatchFiles:
+    """Tests for writing and reading batch job files."""
+
+    def test_write_batch_file_one_line_per_request(self, tmp_path):
+        """Each agent request becomes one chat-completions line."""
+        client = APIClient(api_key="test_key")
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=client)
+        module = ModuleContent(content="Test content", module_id="m1")
+
+        path = write_batch_file(pool.build_requests(module), client, tmp_path / "job.jsonl")
+
+        lines = [json.loads(l) for l in path.read_text().splitlines()]
+        assert len(lines) == len(pool.reviewers)
+        assert lines[0]["url"] == "/v1/chat/completions"
+        assert lines[0]["body"]["model"] == client.model
+        assert lines[0]["custom_id"].startswith("m1::copy_pass_1::")
+
+
+class TestLocalBatchService:
+    """Tests for the file-based stand-in batch service."""
+
+    def test_job_stays_in_progress_until_due(self, tmp_path):
+        """Jobs are not processed before the processing delay elapses."""
+        service = LocalBatchService(str(tmp_path / "jobs"), make_responder(), processing_delay=3600)
+        input_path = tmp_path / "in.jsonl"
+        input_path.write_text(json.dumps({"custom_id": "a", "body": {"messages": []}}) + "\n")
+
+        job_id = service.submit(input_path)
+
+        assert service.retrieve(job_id)["status"] == BatchJobStatus.IN_PROGRESS
+
+    def test_pending_job_can_be_cancelled(self, tmp_path):
+        """A cancelled job is terminal and is never processed."""
+        service = LocalBatchService(str(tmp_path / "jobs"), make_responder(), processing_delay=3600)
+        input_path = tmp_path / "in.jsonl"
+        input_path.write_text(json.dumps({"custom_id": "a", "body": {"messages": []}}) + "\n")
+        job_id = service.submit(input_path)
+
+        status = service.cancel(job_id)
+        service.processing_delay = 0
+
+        assert status["status"] == BatchJobStatus.CANCELLED
+        assert BatchJobStatus.CANCELLED in BatchJobStatus.TERMINAL
+        assert BatchJobStatus.CANCELLING not in BatchJobStatus.TERMINAL
+        assert service.retrieve(job_id)["status"] == BatchJobStatus.CANCELLED
+        assert not service.output_path(job_id).exists()
+
+    def test_failed_requests_are_recorded(self, tmp_path):
+        """Responder errors become error lines instead of failing the job."""
+        service = LocalBatchService(str(tmp_path / "jobs"), make_responder(fail_on="bad"))
+        input_path = tmp_path / "in.jsonl"
+        input_path.write_text(
+            json.dumps({"custom_id": "ok", "body": {"messages": [{"content": "fine"}]}}) + "\n" +
+            json.dumps({"custom_id": "ko", "body": {"messages": [{"content": "bad"}]}}) + "\n"
+        )
+
+        job_id = service.submit(input_path)
+        status = service.retrieve(job_id)
+        results = read_batch_results(service.output_path(job_id))
+
+        assert status["status"] == BatchJobStatus.COMPLETED
+        assert status["request_counts"] == {"total": 2, "completed": 1, "failed": 1}
+        assert results["ko"]["error"]["message"] == "Server error"
+
+
+class TestBatchRunner:
+    """Tests for running a whole pass through a batch job."""
+
+    def test_results_fan_out_per_module(self, tmp_path):
+        """Feedback is returned per module with the original reviewer IDs."""
+        client = APIClient(api_key="test_key")
+        service = LocalBatchService(str(tmp_path / "jobs"), make_responder())
+        runner = BatchRunner(service, client, work_dir=str(tmp_path / "work"), poll_interval=0)
+        modules = [
+            ModuleContent(content="First module", module_id="m1"),
+            ModuleContent(content="Second module", module_id="m2")
+        ]
+
+        feedback = runner.run_pass(modules, ReviewPass.COPY_PASS_1, 10)
+
+        assert set(feedback) == {"m1", "m2"}
+        assert len(feedback["m1"]) == len(feedback["m2"]) == 10
+        assert all(f.reviewer_id.startswith("copy_p1_") for f in feedback["m1"])
+        assert runner.last_job["requests"] == 20
+        assert runner.last_job["failed_requests"] == []
+
+    def test_invalid_responses_are_recorded_as_failed(self, tmp_path):
+        """A response without an issues list counts as a failed request."""
+        client = APIClient(api_key="test_key")
+
+        def responder(body):
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps({"issues": "none"})))])
+
+        service = LocalBatchService(str(tmp_path / "jobs"), responder)
+        runner = BatchRunner(service, client, work_dir=str(tmp_path / "work"), poll_interval=0)
+
+        feedback = runner.run_pass([ModuleContent(content="Module", module_id="m1")],
+                                   ReviewPass.COPY_PASS_1, 10)
+
+        assert feedback == {}
+        assert len(runner.last_job["failed_requests"]) == 10
+
+    def test_cancelled_job_fails_the_pass(self, tmp_path):
+        """Polling waits through "cancelling" (off the event loop thread) and stops at "cancelled"."""
+        statuses = [BatchJobStatus.IN_PROGRESS, BatchJobStatus.CANCELLING, BatchJobStatus.CANCELLED]
+        polled_from = []
+
+        class CancelledService(LocalBatchService):
+            def retrieve(self, job_id):
+                polled_from.append(threading.current_thread())
+                return {"id": job_id, "status": statuses.pop(0)}
+
+        service = CancelledService(str(tmp_path / "jobs"), make_responder())
+        runner = BatchRunner(service, APIClient(api_key="test_key"), work_dir=str(tmp_path / "work"),
+                             poll_interval=0)
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            runner.run_pass([ModuleContent(content="Module", module_id="m1")], ReviewPass.COPY_PASS_1, 10)
+
+        assert statuses == []
+        assert threading.main_thread() not in polled_from
+
+    def test_batch_service_is_abstract(self):
+        """BatchService cannot be instantiated without its job methods."""
+        with pytest.raises(TypeError):
+            BatchService()
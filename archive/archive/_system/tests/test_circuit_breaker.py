@@ -0,0 +1,96 @@
+"""
+Test suite for the agent backend circuit breaker.
+Tests tripping on error rate, half-open probing and rule-based degradation.
+"""
+
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from src.models import ModuleContent, ReviewPass
+from src.reviewers import APIClient, ReviewerPool, openai
+
+
+def failing_breaker(**kwargs):
+    """Breaker that has just tripped."""
+    breaker = CircuitBreaker(min_calls=4, **kwargs)
+    for _ in range(4):
+        breaker.record_failure()
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker state transitions."""
+
+    def test_trips_on_error_rate(self):
+        """The circuit opens once the failure rate over the window reaches the threshold."""
+        breaker = CircuitBreaker(failure_threshold=0.5, min_calls=4)
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_half_open_probe_success_closes(self):
+        """After open_seconds one probe is let through; its success closes the circuit."""
+        breaker = failing_breaker(open_seconds=0.05)
+        time.sleep(0.06)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()  # Only one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_failure_reopens(self):
+        """A failed probe opens the circuit again."""
+        breaker = failing_breaker(open_seconds=0.05)
+        time.sleep(0.06)
+
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.snapshot()["trips"] == 2
+
+    def test_rate_limits_leave_circuit_closed(self):
+        """Repeated 429s are throttling, not failures: the breaker stays closed."""
+        breaker = CircuitBreaker(failure_threshold=0.5, min_calls=2)
+        client = APIClient(api_key="test_key", max_retries=3, retry_delay=0)
+        client.circuit_breaker = breaker
+
+        with patch.object(openai.ChatCompletion, "create",
+                          side_effect=openai.error.RateLimitError("429")) as create:
+            for _ in range(3):
+                with pytest.raises(openai.error.RateLimitError):
+                    client.call_api("Test prompt", "Test system prompt")
+
+        assert create.call_count == 9
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.snapshot()["throttled"] == 9
+        assert breaker.snapshot()["recent_failures"] == 0
+
+
+class TestDegradedReview:
+    """Tests for falling back to rule-based agents."""
+
+    def test_open_circuit_degrades_every_agent(self):
+        """Agents refused by the breaker run rule-based checks and are marked degraded."""
+        api_client = MagicMock()
+        api_client.call_api_async = AsyncMock(side_effect=CircuitOpenError("open"))
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=api_client)
+        module = ModuleContent(content="We don't skip steps.\nFind the limit.", module_id="m1")
+
+        feedback = pool.review(module)
+
+        modes = pool.agent_modes()
+        assert set(modes.values()) == {"degraded"}
+        assert len(modes) == len(pool.reviewers)
+        assert any(f.issue_type == "contraction" and f.location == "Line 1" for f in feedback)
+        assert all("rule-based" in f.issue for f in feedback)
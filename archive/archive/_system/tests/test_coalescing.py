@@ -0,0 +1,127 @@
+"""
+Test suite for in-flight request coalescing.
+Tests sharing calls across sessions, per-pass independence, exemptions and leader cancellation.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.coalescing import CoalescingAPIClient, RequestCoalescer
+
+
+class CountingClient:
+    """Backend stub that counts calls and answers after a short delay."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.model = "gpt-4"
+
+    async def call_api_async(self, prompt, system_prompt, temperature=0.7,
+                             max_tokens=2000, model=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"issues": [{"issue": prompt}]}
+
+
+def run_sessions(coalescer, backend, prompts_per_session, sessions=2):
+    """Run each session's calls on its own thread and event loop, like the sync wrappers."""
+    results = [None] * sessions
+    barrier = threading.Barrier(sessions)
+
+    def session(index):
+        client = CoalescingAPIClient(backend, coalescer)
+
+        async def run():
+            barrier.wait()
+            return await asyncio.gather(*[
+                client.call_api_async(prompt, "system") for prompt in prompts_per_session
+            ])
+
+        results[index] = (asyncio.run(run()), client.coalesced_calls)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestRequestCoalescer:
+    """Tests for RequestCoalescer and CoalescingAPIClient."""
+
+    def test_concurrent_sessions_share_one_call(self):
+        """Identical requests from two sessions on different event loops make one backend call."""
+        backend = CountingClient()
+        coalescer = RequestCoalescer()
+
+        results = run_sessions(coalescer, backend, ["module text"])
+
+        assert backend.calls == 1
+        assert results[0][0] == results[1][0]
+        assert results[0][0][0] is not results[1][0][0]  # Each caller gets its own copy
+        assert sorted(r[1] for r in results) == [0, 1]
+        assert coalescer.stats == {"calls": 1, "coalesced": 1, "exempt": 0}
+
+    def test_identical_requests_within_a_pass_stay_independent(self):
+        """Reviewers in one pass sending the same prompt each get their own sample."""
+        backend = CountingClient()
+
+        results = run_sessions(RequestCoalescer(), backend, ["same", "same", "other"])
+
+        # Each session makes 3 calls; the second session joins all of them
+        assert backend.calls == 3
+        assert sorted(r[1] for r in results) == [0, 3]
+
+    def test_exempt_agents_always_call(self):
+        """Requests matching an exempt pattern are never shared."""
+        backend = CountingClient()
+        coalescer = RequestCoalescer(exempt_patterns=[r"^sys"])
+
+        run_sessions(coalescer, backend, ["module text"])
+
+        assert backend.calls == 2
+        assert coalescer.stats["exempt"] == 2
+
+    def test_errors_are_shared(self):
+        """A failed call fails every caller waiting on it."""
+        backend = CountingClient(error=ValueError("backend down"))
+        coalescer = RequestCoalescer()
+        client_a = CoalescingAPIClient(backend, coalescer)
+        client_b = CoalescingAPIClient(backend, coalescer)
+
+        async def run():
+            return await asyncio.gather(client_a.call_api_async("p", "s"),
+                                        client_b.call_api_async("p", "s"),
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert backend.calls == 1
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_leader_hands_over(self):
+        """If the leading call is cancelled, a waiter makes the call instead."""
+        backend = CountingClient(delay=0.1)
+        coalescer = RequestCoalescer()
+        client_a = CoalescingAPIClient(backend, coalescer)
+        client_b = CoalescingAPIClient(backend, coalescer)
+
+        async def run():
+            leader = asyncio.ensure_future(client_a.call_api_async("p", "s"))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(client_b.call_api_async("p", "s"))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await waiter
+
+        assert asyncio.run(run()) == {"issues": [{"issue": "p"}]}
+        assert backend.calls == 2
+        assert client_b.coalesced_calls == 0
@@ -0,0 +1,122 @@
+"""
+Test suite for deadline-aware hedged requests.
+Uses a fake client whose latency is scripted per call.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import hedging
+from src.hedging import HedgedAPIClient, PassLatencyTracker, percentile
+from src.scheduler import GlobalAgentScheduler, ScheduledAPIClient
+
+
+class ScriptedClient:
+    """API client stand-in that sleeps for scripted latencies."""
+
+    def __init__(self, latencies):
+        self.latencies = list(latencies)
+        self.calls = 0
+        self.model = "gpt-4"
+
+    async def call_api_async(self, prompt, system_prompt, temperature=0.7, max_tokens=2000,
+                             model=None):
+        latency = self.latencies[min(self.calls, len(self.latencies) - 1)]
+        self.calls += 1
+        await asyncio.sleep(latency)
+        return {"issues": [], "latency": latency}
+
+
+class TestPercentile:
+    """Tests for the latency percentile helper."""
+
+    def test_nearest_rank(self):
+        """Percentiles use the nearest-rank method."""
+        values = [0.1 * i for i in range(1, 11)]
+        assert percentile(values, 50) == pytest.approx(0.5)
+        assert percentile(values, 90) == pytest.approx(0.9)
+        assert percentile(values, 99) == pytest.approx(1.0)
+        assert percentile([], 50) is None
+
+
+class TestHedgedAPIClient:
+    """Tests for hedging and deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_and_hedge_wins(self):
+        """A call past the running p90 gets a duplicate and the faster one wins."""
+        tracker = PassLatencyTracker()
+        tracker.latencies = [0.01, 0.01, 0.01]
+        client = HedgedAPIClient(ScriptedClient([1.0, 0.01]), tracker, poll_interval=0.005)
+
+        response = await client.call_api_async("prompt " * 40, "system")
+
+        assert response["latency"] == 0.01
+        summary = tracker.summary()
+        assert summary["hedges_sent"] == 1
+        assert summary["hedge_wins"] == 1
+        assert summary["hedge_rate"] == 1.0
+        assert summary["wasted_tokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_before_min_samples(self):
+        """Without enough completed agents there is no p90 to hedge against."""
+        tracker = PassLatencyTracker()
+        inner = ScriptedClient([0.05])
+        client = HedgedAPIClient(inner, tracker, poll_interval=0.005)
+
+        await client.call_api_async("prompt", "system")
+
+        assert inner.calls == 1
+        assert tracker.summary()["hedges_sent"] == 0
+        assert len(tracker.latencies) == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_raises_timeout(self):
+        """No response before the pass SLO is a timeout, counted as a miss."""
+        tracker = PassLatencyTracker(slo_seconds=0.05)
+        client = HedgedAPIClient(ScriptedClient([1.0]), tracker, poll_interval=0.005)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call_api_async("prompt", "system")
+
+        assert tracker.summary()["deadline_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsent_hedge_is_not_wasted(self, monkeypatch):
+        """A hedge cancelled before it was sent costs no tokens and is not counted as sent."""
+        clock = iter([0.0, 0.0, 1.0, 20.0])
+        monkeypatch.setattr(hedging, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+        tracker = PassLatencyTracker(slo_seconds=10.0)
+        tracker.latencies = [0.5, 0.5, 0.5]
+        inner = ScriptedClient([1.0])
+        client = HedgedAPIClient(inner, tracker, poll_interval=0.005)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call_api_async("prompt " * 40, "system")
+
+        summary = tracker.summary()
+        assert inner.calls == 1
+        assert summary["hedge_rate"] == 1.0
+        assert summary["hedges_sent"] == 0
+        assert summary["wasted_tokens"] == 0
+
+    @pytest.mark.asyncio
+    async def test_scheduler_queue_time_is_not_latency(self):
+        """Inside the scheduler slot, a call queued behind another keeps its own latency and deadline."""
+        tracker = PassLatencyTracker(slo_seconds=0.15)
+        hedged = HedgedAPIClient(ScriptedClient([0.1]), tracker, poll_interval=0.005)
+        client = ScheduledAPIClient(hedged, GlobalAgentScheduler(max_concurrency=1), "m1")
+
+        await asyncio.gather(client.call_api_async("first", "system"),
+                             client.call_api_async("second", "system"))
+
+        assert tracker.summary()["deadline_misses"] == 0
+        assert all(latency < 0.15 for latency in tracker.latencies)
+
+    def test_forwards_client_attributes(self):
+        """Attributes of the wrapped client stay reachable."""
+        client = HedgedAPIClient(ScriptedClient([0.0]), PassLatencyTracker())
+        assert client.model == "gpt-4"
@@ -0,0 +1,117 @@
+"""
+Test suite for session checkpoint journals.
+Tests that finished agents are recorded and not re-called on resume.
+"""
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.journal import SessionJournal
+from src.models import ModuleContent, ReviewFeedback, ReviewPass
+from src.reviewers import ReviewerPool
+
+
+ISSUE_RESPONSE = {
+    "issues": [{
+        "type": "contraction",
+        "severity": 2,
+        "location": "Line 3",
+        "issue": "Uses contraction 'don't'",
+        "suggestion": "Replace with 'do not'"
+    }]
+}
+
+
+def make_client(side_effect=None):
+    """API client mock returning one issue per call."""
+    client = MagicMock()
+    client.call_api_async = AsyncMock(return_value=ISSUE_RESPONSE, side_effect=side_effect)
+    client.validate_response = MagicMock(return_value=True)
+    return client
+
+
+class TestSessionJournal:
+    """Tests for reading and writing journal records."""
+
+    def test_agent_feedback_round_trips(self, tmp_path):
+        """Journaled feedback is rebuilt as ReviewFeedback per reviewer."""
+        journal = SessionJournal("s1", str(tmp_path))
+        feedback = ReviewFeedback(
+            reviewer_id="copy_p1_01", issue_type="contraction", severity=2,
+            location="Line 3", issue="Uses contraction", suggestion="Expand it"
+        )
+
+        journal.record_agent(ReviewPass.COPY_PASS_1, "copy_p1_01", ISSUE_RESPONSE, [feedback])
+
+        completed = journal.completed_agents(ReviewPass.COPY_PASS_1)
+        assert list(completed) == ["copy_p1_01"]
+        assert completed["copy_p1_01"][0].to_dict() == feedback.to_dict()
+        assert journal.completed_agents(ReviewPass.COPY_PASS_2) == {}
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        """A record cut short by a crash does not break reading the journal."""
+        journal = SessionJournal("s1", str(tmp_path))
+        journal.record_start(ModuleContent(content="Text", module_id="m1"), "new")
+        with open(journal.path, 'a') as f:
+            f.write('{"event": "agent_done", "review_pa')
+
+        assert journal.load_start()["module"].module_id == "m1"
+        assert journal.completed_agents(ReviewPass.COPY_PASS_1) == {}
+
+    def test_reopened_journal_drops_truncated_record(self, tmp_path):
+        """Records appended after reopening a crashed journal are not merged into the cut line."""
+        journal = SessionJournal("s1", str(tmp_path))
+        journal.record_start(ModuleContent(content="Text", module_id="m1"), "new")
+        with open(journal.path, 'a') as f:
+            f.write('{"event": "agent_done", "review_pa')
+
+        resumed = SessionJournal("s1", str(tmp_path))
+        resumed.record_agent(ReviewPass.COPY_PASS_1, "copy_p1_01", ISSUE_RESPONSE, [])
+
+        assert [r["event"] for r in resumed.read()] == ["session_start", "agent_done"]
+        assert list(resumed.completed_agents(ReviewPass.COPY_PASS_1)) == ["copy_p1_01"]
+        assert journal.path.read_text().count("\n") == 2
+
+    def test_journal_without_complete_record_is_emptied(self, tmp_path):
+        """A crash during the very first write leaves nothing to keep."""
+        (tmp_path / "s1.jsonl").write_text('{"event": "session_st')
+
+        journal = SessionJournal("s1", str(tmp_path))
+
+        assert journal.path.read_text() == ""
+        assert journal.read() == []
+
+
+class TestJournaledReview:
+    """Tests for ReviewerPool runs backed by a journal."""
+
+    @pytest.mark.asyncio
+    async def test_resume_only_calls_missing_agents(self, tmp_path):
+        """Agents already in the journal are reused instead of called."""
+        module = ModuleContent(content="Test content", module_id="m1")
+        journal = SessionJournal("s1", str(tmp_path))
+
+        first_client = make_client()
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=first_client)
+        first = await pool.review_parallel(module, journal=journal)
+
+        second_client = make_client()
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=second_client)
+        second = await pool.review_parallel(module, journal=journal)
+
+        assert first_client.call_api_async.call_count == len(pool.reviewers)
+        assert second_client.call_api_async.call_count == 0
+        assert len(second) == len(first)
+
+    @pytest.mark.asyncio
+    async def test_failed_agents_are_not_journaled(self, tmp_path):
+        """A failed agent is left out of the journal so resume re-runs it."""
+        module = ModuleContent(content="Test content", module_id="m1")
+        journal = SessionJournal("s1", str(tmp_path))
+        client = make_client(side_effect=Exception("API Error"))
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=client)
+
+        feedback = await pool.review_parallel(module, journal=journal)
+
+        assert feedback == []
+        assert journal.completed_agents(ReviewPass.COPY_PASS_1) == {}
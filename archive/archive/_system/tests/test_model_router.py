@@ -0,0 +1,138 @@
+"""
+Test suite for cost-aware model routing.
+Tests route resolution, per-tier usage tracking and precision-driven tier changes.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.model_router import ModelRouter
+from src.models import ReviewerConfig, ReviewerRole, ReviewPass
+from src.orchestrator import RevisionOrchestrator
+from src.reviewers import XMLConfigLoader
+
+
+ROUTING_XML = """<learnvia_configuration>
+  <model_routing>
+    <tiers>
+      <tier name="economy" model="cheap-model" input_cost_per_1k="0.001" output_cost_per_1k="0.002"/>
+      <tier name="premium" model="big-model" input_cost_per_1k="0.03" output_cost_per_1k="0.06"/>
+    </tiers>
+    <routes default_tier="premium" default_max_tokens="2000">
+      <route role="style" competency="Mechanical Compliance" tier="economy" max_tokens="1200"
+             focus_areas="contractions" issue_types="contraction"/>
+      <route role="authoring" competency="*" tier="premium" max_tokens="2000"/>
+    </routes>
+    <adaptation>
+      <min_samples>4</min_samples>
+      <downgrade_precision>0.95</downgrade_precision>
+      <upgrade_precision>0.80</upgrade_precision>
+    </adaptation>
+  </model_routing>
+</learnvia_configuration>
+"""
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Router over a two-tier routing table."""
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "agent_configuration.xml").write_text(ROUTING_XML)
+    return ModelRouter(XMLConfigLoader(str(config_dir)), state_path=str(tmp_path / "routing.json"))
+
+
+def make_validations(issue_type, confirmed, false_positives, when=None):
+    """Validated disputes in the shape FeedbackLoop keeps them."""
+    when = when or datetime.now()
+    judgments = ["invalid"] * confirmed + ["valid"] * false_positives
+    return SimpleNamespace(validations={
+        f"dispute_{i}": SimpleNamespace(
+            reviewer_judgment=judgment,
+            original_issue={"issue_type": issue_type},
+            validation_timestamp=when
+        )
+        for i, judgment in enumerate(judgments)
+    })
+
+
+class TestModelRouter:
+    """Tests for ModelRouter."""
+
+    def test_routes_by_role_and_competency(self, router):
+        """Exact rules win, then text-mode focus areas, role wildcards and the table default."""
+        assert router.route("style", "Mechanical Compliance").model == "cheap-model"
+        assert router.route("style", "Mechanical Compliance").max_tokens == 1200
+        assert router.route("style", "contractions").rule_key == "style:Mechanical Compliance"
+        assert router.route("authoring", "Pedagogical Flow").model == "big-model"
+        assert router.route("style", "Accessibility").rule_key == "default"
+
+    def test_apply_sets_reviewer_model(self, router):
+        """Applying a route sets the reviewer's model and max_tokens."""
+        config = ReviewerConfig(
+            reviewer_id="copy_1_reviewer_01",
+            role=ReviewerRole.STYLE,
+            review_pass=ReviewPass.COPY_PASS_1,
+            focus_area="Mechanical Compliance"
+        )
+        router.apply(config)
+        assert config.model == "cheap-model"
+        assert config.max_tokens == 1200
+
+    def test_usage_and_cost_per_tier(self, router):
+        """Calls are costed at their tier's token prices."""
+        router.record_call("cheap-model", 0.5, input_tokens=1000, output_tokens=500)
+        router.record_call("big-model", 2.0, input_tokens=1000, output_tokens=500)
+
+        summary = router.summary()
+        assert summary["tiers"]["economy"]["estimated_cost"] == pytest.approx(0.002)
+        assert summary["tiers"]["premium"]["estimated_cost"] == pytest.approx(0.06)
+        assert summary["tiers"]["premium"]["p50_seconds"] == 2.0
+
+    def test_low_precision_upgrades_and_persists(self, router, tmp_path):
+        """A cheap route with too many false positives moves up a tier, across restarts."""
+        assert router.load_feedback(make_validations("contraction", 2, 3)) == 5
+
+        changes = router.adapt()
+        assert changes[0]["to_tier"] == "premium"
+        assert router.route("style", "Mechanical Compliance").model == "big-model"
+
+        reloaded = ModelRouter(XMLConfigLoader(str(tmp_path / "config")),
+                               state_path=str(tmp_path / "routing.json"))
+        assert reloaded.current_tier("style:Mechanical Compliance") == "premium"
+
+        # Feedback validated before the change does not count against the new tier
+        stale = make_validations("contraction", 10, 0, when=datetime.now() - timedelta(days=1))
+        assert reloaded.load_feedback(stale) == 0
+
+    def test_high_precision_downgrades(self, router):
+        """A route that is almost always right moves one tier cheaper."""
+        for _ in range(4):
+            router.record_outcome("authoring:*", confirmed=True)
+
+        changes = router.adapt()
+        assert changes == [{
+            "route": "authoring:*", "from_tier": "premium", "to_tier": "economy",
+            "precision": 1.0, "samples": 4
+        }]
+
+    def test_too_few_samples_keep_tier(self, router):
+        """Routes do not move before min_samples outcomes."""
+        router.record_outcome("authoring:*", confirmed=True)
+        assert router.adapt() == []
+
+    def test_orchestrator_adapts_routes_at_session_start(self, router, tmp_path):
+        """Validated disputes move routes before the session's first pass."""
+        orchestrator = RevisionOrchestrator(
+            api_key="test_key", output_dir=str(tmp_path / "reports"),
+            journal_dir=str(tmp_path / "sessions"), model_router=router,
+            feedback_loop=make_validations("contraction", 2, 3)
+        )
+
+        changes = orchestrator._adapt_model_routes()
+
+        assert [change["route"] for change in changes] == ["style:Mechanical Compliance"]
+        assert router.current_tier("style:Mechanical Compliance") == "premium"
+        assert orchestrator._adapt_model_routes() == []
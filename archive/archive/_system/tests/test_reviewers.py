@@ -230,6 +230,19 @@ class TestReviewerPool:
         assert "examples" in focus_areas
         assert "quiz_questions" in focus_areas
 
+    def test_prepare_pass_reuses_reviewers(self):
+        """A pool built ahead of time keeps its reviewers and only swaps the client."""
+        pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=MagicMock())
+        reviewers = list(pool.reviewers)
+        pool.degraded_reviewers = ["copy_p1_00"]
+
+        pass_client = MagicMock()
+        pool.prepare_pass(pass_client)
+
+        assert pool.reviewers == reviewers
+        assert all(r.api_client is pass_client for r in pool.reviewers)
+        assert pool.degraded_reviewers == []
+
     @pytest.mark.asyncio
     @patch('src.reviewers.APIClient')
     async def test_pool_parallel_review(self, mock_api_client):
@@ -0,0 +1,102 @@
+"""
+Test suite for the process-wide agent scheduler.
+Tests the shared concurrency budget, weighted fair queuing and rate-limit pauses.
+"""
+
+import asyncio
+import time
+import pytest
+
+from src.scheduler import GlobalAgentScheduler
+
+
+def make_call(log, name, duration=0.01, state=None):
+    """Coroutine function that records its start and tracks concurrency."""
+    async def call():
+        log.append(name)
+        if state is not None:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(duration)
+        if state is not None:
+            state["active"] -= 1
+        return name
+    return call
+
+
+class TestGlobalAgentScheduler:
+    """Tests for GlobalAgentScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_budget_is_shared(self):
+        """Calls from every module together never exceed max_concurrency."""
+        scheduler = GlobalAgentScheduler(max_concurrency=3)
+        log, state = [], {"active": 0, "peak": 0}
+
+        calls = [scheduler.run(f"m{i % 4}", make_call(log, i, state=state)) for i in range(20)]
+        results = await asyncio.gather(*calls)
+
+        assert sorted(results) == list(range(20))
+        assert state["peak"] == 3
+        assert scheduler.snapshot()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_weighted_fair_queuing(self):
+        """A module with twice the weight is served twice as often while both are queued."""
+        scheduler = GlobalAgentScheduler(max_concurrency=1)
+        scheduler.set_weight("heavy", 2.0)
+        log = []
+
+        calls = [scheduler.run("light", make_call(log, "light", 0)) for _ in range(10)]
+        calls += [scheduler.run("heavy", make_call(log, "heavy", 0)) for _ in range(10)]
+        await asyncio.gather(*calls)
+
+        first_nine = log[:9]
+        assert first_nine.count("heavy") == 6
+        assert first_nine.count("light") == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_dispatch(self):
+        """After a rate-limit report no new call starts until the cooldown ends."""
+        scheduler = GlobalAgentScheduler(max_concurrency=2, rate_limit_cooldown=0.1)
+        log = []
+
+        scheduler.report_rate_limit()
+        start = time.monotonic()
+        await scheduler.run("m1", make_call(log, "a", 0))
+
+        assert time.monotonic() - start >= 0.09
+        assert scheduler.snapshot()["rate_limit_pauses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_frees_its_slot(self):
+        """Cancelling a running call (e.g. a losing hedge) releases its slot."""
+        scheduler = GlobalAgentScheduler(max_concurrency=1)
+        log = []
+
+        slow = asyncio.ensure_future(scheduler.run("m1", make_call(log, "slow", 10)))
+        await asyncio.sleep(0.01)
+        slow.cancel()
+
+        assert await scheduler.run("m1", make_call(log, "next", 0)) == "next"
+        assert scheduler.snapshot()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_submitter_passes_on_its_wakeup(self):
+        """A submitter cancelled right after being woken for queue space wakes the next one."""
+        scheduler = GlobalAgentScheduler(max_concurrency=1, max_queue_per_module=1)
+        log = []
+        running = asyncio.ensure_future(scheduler.run("m1", make_call(log, "running", 10)))
+        queued = asyncio.ensure_future(scheduler.run("m1", make_call(log, "queued", 0)))
+        await asyncio.sleep(0.01)
+        first = asyncio.ensure_future(scheduler.run("m1", make_call(log, "first", 0)))
+        second = asyncio.ensure_future(scheduler.run("m1", make_call(log, "second", 0)))
+        await asyncio.sleep(0.01)
+
+        queued.cancel()      # Leaves the queue and wakes the first submitter...
+        await asyncio.sleep(0)
+        first.cancel()       # ...which is cancelled before it runs again
+        running.cancel()
+
+        assert await asyncio.wait_for(second, 1) == "second"
+        assert log == ["running", "second"]
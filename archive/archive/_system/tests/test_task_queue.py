@@ -0,0 +1,137 @@
+"""
+Test suite for the durable SQLite agent task queue.
+Tests leasing, retries, dead-lettering and collecting worker results.
+"""
+
+import threading
+from unittest.mock import MagicMock, AsyncMock
+
+from src.task_queue import AgentTaskQueue, QueueRunner, QueueWorker, TaskStatus, module_hash
+from src.models import ModuleContent, ReviewPass
+from src.reviewers import APIClient, ReviewerPool
+
+
+ISSUE_RESPONSE = {
+    "issues": [{
+        "type": "contraction",
+        "severity": 2,
+        "location": "Line 3",
+        "issue": "Uses contraction 'don't'",
+        "suggestion": "Replace with 'do not'"
+    }]
+}
+
+
+def make_requests(module_id="m1"):
+    """Agent requests for one copy-edit pass over a small module."""
+    module = ModuleContent(content=f"Content of {module_id}", module_id=module_id)
+    pool = ReviewerPool(ReviewPass.COPY_PASS_1, num_reviewers=10, api_client=APIClient(api_key="test_key"))
+    return module, pool.build_requests(module)
+
+
+class TestAgentTaskQueue:
+    """Tests for queue state transitions."""
+
+    def test_enqueue_is_idempotent_per_content(self, tmp_path):
+        """Re-enqueuing the same module content adds nothing."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"))
+        module, requests = make_requests()
+
+        assert queue.enqueue(requests, module_hash(module)) == len(requests)
+        assert queue.enqueue(requests, module_hash(module)) == 0
+
+    def test_lease_is_exclusive(self, tmp_path):
+        """Concurrent workers never lease the same task."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"))
+        module, requests = make_requests()
+        queue.enqueue(requests, module_hash(module))
+
+        leased = []
+
+        def worker(name):
+            while True:
+                task = queue.lease(name)
+                if task is None:
+                    return
+                leased.append(task["task_id"])
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(leased) == sorted(set(leased))
+        assert len(leased) == len(requests)
+
+    def test_expired_lease_is_handed_out_again(self, tmp_path):
+        """A task whose worker died is leased to another worker."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"))
+        module, requests = make_requests()
+        queue.enqueue(requests[:1], module_hash(module))
+
+        first = queue.lease("dead-worker", lease_seconds=0)
+        second = queue.lease("live-worker")
+
+        assert second["task_id"] == first["task_id"]
+        assert not queue.complete(first["task_id"], "dead-worker", ISSUE_RESPONSE)
+        assert queue.complete(second["task_id"], "live-worker", ISSUE_RESPONSE)
+
+    def test_failures_retry_then_dead_letter(self, tmp_path):
+        """A task is retried until max_attempts, then dead-lettered."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"), retry_delay=0)
+        module, requests = make_requests()
+        queue.enqueue(requests[:1], module_hash(module), max_attempts=2)
+
+        task = queue.lease("w1")
+        assert queue.fail(task["task_id"], "w1", "Server error") == TaskStatus.QUEUED
+        task = queue.lease("w1")
+        assert queue.fail(task["task_id"], "w1", "Server error") == TaskStatus.DEAD
+
+        assert queue.lease("w1") is None
+        assert queue.dead_letters()[0]["last_error"] == "Server error"
+
+    def test_reenqueue_requeues_dead_letters(self, tmp_path):
+        """Re-enqueuing content retries its dead-lettered tasks; done tasks stay done."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"), retry_delay=0)
+        module, requests = make_requests()
+        content_hash = module_hash(module)
+        queue.enqueue(requests[:2], content_hash, max_attempts=1)
+
+        task = queue.lease("w1")
+        queue.complete(task["task_id"], "w1", ISSUE_RESPONSE)
+        task = queue.lease("w1")
+        assert queue.fail(task["task_id"], "w1", "Server error") == TaskStatus.DEAD
+
+        assert queue.enqueue(requests[:2], content_hash, max_attempts=1) == 1
+        assert queue.status_counts()[TaskStatus.QUEUED] == 1
+        retried = queue.lease("w1")
+        assert retried["task_id"] == task["task_id"]
+        assert retried["attempts"] == 1
+        assert queue.lease("w1") is None
+
+
+class TestQueueRunner:
+    """Tests for running a pass through queue workers."""
+
+    def test_worker_results_fan_out_per_module(self, tmp_path):
+        """Worker responses become per-module feedback with original reviewer IDs."""
+        queue = AgentTaskQueue(str(tmp_path / "q.db"))
+        client = APIClient(api_key="test_key")
+        worker_client = MagicMock()
+        worker_client.call_api_async = AsyncMock(return_value=ISSUE_RESPONSE)
+
+        modules = [ModuleContent(content="First module", module_id="m1"),
+                   ModuleContent(content="Second module", module_id="m2")]
+        runner = QueueRunner(queue, client, poll_interval=0.01, max_wait_seconds=10)
+        worker = QueueWorker(queue, worker_client, worker_id="w1", idle_sleep=0.01)
+
+        thread = threading.Thread(target=worker.run, kwargs={"max_tasks": 20})
+        thread.start()
+        feedback = runner.run_pass(modules, ReviewPass.COPY_PASS_1, 10)
+        thread.join()
+
+        assert set(feedback) == {"m1", "m2"}
+        assert len(feedback["m1"]) == 10
+        assert all(f.reviewer_id.startswith("copy_p1_") for f in feedback["m1"])
+        assert runner.last_run["failed_tasks"] == []